@@ -0,0 +1 @@
+"""Offline benchmarks run against a local stub of the Danbooru api. Run with `python -m benchmarks`."""
@@ -0,0 +1,191 @@
+"""Deterministic api fixtures for the benchmark stub server."""
+
+from __future__ import annotations
+
+import datetime
+import json
+import random
+from pathlib import Path
+
+BASE_DATE = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone(datetime.timedelta(hours=-5)))
+
+_GENERAL = [f"general_tag_{n}" for n in range(2_000)]
+_CHARACTERS = [f"character_{n}_(series_{n % 50})" for n in range(500)]
+_COPYRIGHTS = [f"series_{n}" for n in range(50)]
+_ARTISTS = [f"artist_{n}" for n in range(1_000)]
+
+
+def _timestamp(rng: random.Random, offset: int) -> str:
+    moment = BASE_DATE + datetime.timedelta(seconds=offset * 97 + rng.randint(0, 60))
+    return moment.isoformat(timespec="milliseconds")
+
+
+def make_posts(count: int, seed: int = 0) -> list[dict]:
+    """Generate `/posts` rows with realistic tag counts and payload size."""
+    rng = random.Random(seed)
+    posts = []
+    for post_id in range(1, count + 1):
+        general = rng.sample(_GENERAL, rng.randint(10, 40))
+        character = rng.sample(_CHARACTERS, rng.randint(0, 3))
+        copyright_ = rng.sample(_COPYRIGHTS, rng.randint(0, 2))
+        artist = rng.sample(_ARTISTS, 1)
+        tags = sorted(general + character + copyright_ + artist)
+        md5 = f"{rng.getrandbits(128):032x}"
+        created_at = _timestamp(rng, post_id)
+        posts.append({
+            "id": post_id,
+            "created_at": created_at,
+            "updated_at": created_at,
+            "uploader_id": rng.randint(1, 5_000),
+            "approver_id": rng.choice([None, rng.randint(1, 100)]),
+            "score": rng.randint(-5, 500),
+            "up_score": rng.randint(0, 500),
+            "down_score": -rng.randint(0, 5),
+            "fav_count": rng.randint(0, 800),
+            "source": f"https://example.com/{md5}",
+            "md5": md5,
+            "rating": rng.choice("gsqe"),
+            "image_width": rng.choice([800, 1200, 2048, 4096]),
+            "image_height": rng.choice([600, 1000, 2048, 3000]),
+            "tag_string": " ".join(tags),
+            "tag_string_general": " ".join(sorted(general)),
+            "tag_string_character": " ".join(sorted(character)),
+            "tag_string_copyright": " ".join(sorted(copyright_)),
+            "tag_string_artist": " ".join(artist),
+            "tag_string_meta": "",
+            "tag_count": len(tags),
+            "tag_count_general": len(general),
+            "file_ext": "jpg",
+            "file_size": rng.randint(100_000, 5_000_000),
+            "parent_id": None,
+            "has_children": False,
+            "is_pending": False,
+            "is_flagged": False,
+            "is_deleted": rng.random() < 0.05,
+            "is_banned": False,
+            "pixiv_id": None,
+            "last_comment_bumped_at": None,
+            "last_noted_at": None,
+            "has_large": True,
+            "has_visible_children": False,
+            "bit_flags": 0,
+            "file_url": f"https://cdn.example.com/original/{md5[:2]}/{md5[2:4]}/{md5}.jpg",
+            "large_file_url": f"https://cdn.example.com/sample/{md5[:2]}/{md5[2:4]}/sample-{md5}.jpg",
+            "preview_file_url": f"https://cdn.example.com/180x180/{md5[:2]}/{md5[2:4]}/{md5}.jpg",
+        })
+    return posts
+
+
+def make_post_versions(count: int, seed: int = 0) -> list[dict]:
+    """Generate `/post_versions` rows."""
+    rng = random.Random(seed)
+    versions = []
+    for version_id in range(1, count + 1):
+        added = rng.sample(_GENERAL, rng.randint(0, 8))
+        removed = rng.sample(_GENERAL, rng.randint(0, 4))
+        obsolete_added = " ".join(rng.sample(added, rng.randint(0, len(added)))) if added else ""
+        versions.append({
+            "id": version_id,
+            "post_id": rng.randint(1, count // 3 + 1),
+            "updated_at": _timestamp(rng, version_id),
+            "updater_id": rng.randint(1, 5_000),
+            "version": rng.randint(1, 20),
+            "rating": rng.choice("gsqe"),
+            "rating_changed": False,
+            "parent_id": None,
+            "parent_changed": False,
+            "source": "",
+            "source_changed": False,
+            "tags": " ".join(added),
+            "added_tags": added,
+            "removed_tags": removed,
+            "obsolete_added_tags": obsolete_added,
+            "obsolete_removed_tags": "",
+            "unchanged_tags": "",
+        })
+    return versions
+
+
+def make_tags(count: int, seed: int = 0) -> list[dict]:
+    """Generate `/tags` rows."""
+    rng = random.Random(seed)
+    names = (_GENERAL + _CHARACTERS + _COPYRIGHTS + _ARTISTS) * (count // 3_550 + 1)
+    tags = []
+    for tag_id in range(1, count + 1):
+        name = names[tag_id - 1] if tag_id <= 3_550 else f"{names[tag_id - 1]}_{tag_id}"
+        created_at = _timestamp(rng, tag_id)
+        tags.append({
+            "id": tag_id,
+            "name": name,
+            "post_count": rng.randint(0, 100_000),
+            "category": rng.choice([0, 0, 0, 1, 3, 4]),
+            "is_deprecated": rng.random() < 0.01,
+            "words": name.split("_"),
+            "created_at": created_at,
+            "updated_at": created_at,
+        })
+    return tags
+
+
+def make_related_tag(tags: list[dict], query: str = "general_tag_1", count: int = 100) -> dict:
+    """Generate a `/related_tag` response for a query."""
+    rng = random.Random(query)
+    query_tag = next((tag for tag in tags if tag["name"] == query), tags[0])
+    return {
+        "query": query,
+        "post_count": query_tag["post_count"],
+        "tag": query_tag,
+        "related_tags": [{
+            "tag": tag,
+            "cosine_similarity": rng.random(),
+            "jaccard_similarity": rng.random(),
+            "overlap_coefficient": rng.random(),
+            "frequency": rng.random(),
+        } for tag in rng.sample(tags, min(count, len(tags)))],
+    }
+
+
+def make_users(count: int, seed: int = 0) -> list[dict]:
+    """Generate `/users` rows with a realistic spread of levels."""
+    rng = random.Random(seed)
+    levels = [20] * 80 + [10] * 5 + [30] * 8 + [31] * 3 + [32] * 2 + [35, 37, 40, 50]
+    return [{
+        "id": user_id,
+        "name": f"user_{user_id}",
+        "level": rng.choice(levels),
+        "post_upload_count": rng.randint(0, 10_000),
+        "post_update_count": rng.randint(0, 100_000),
+        "note_update_count": rng.randint(0, 1_000),
+        "is_deleted": False,
+        "is_banned": rng.random() < 0.01,
+        "created_at": _timestamp(rng, user_id),
+        "updated_at": _timestamp(rng, user_id),
+    } for user_id in range(1, count + 1)]
+
+
+def make_post_report(count: int, seed: int = 0) -> list[dict]:
+    """Generate `/reports/posts` rows grouped by uploader."""
+    rng = random.Random(seed)
+    return [{"date": _timestamp(rng, n), "posts": rng.randint(1, 1_000), "uploader": f"user_{n}"} for n in range(count)]
+
+
+def default_fixtures(rows: int = 5_000) -> dict[str, list[dict] | dict]:
+    """Build the synthetic fixture set served by the stub server, keyed by endpoint."""
+    tags = make_tags(rows)
+    return {
+        "posts": make_posts(rows),
+        "post_versions": make_post_versions(rows),
+        "tags": tags,
+        "users": make_users(rows),
+        "related_tag": make_related_tag(tags),
+        "reports/posts": make_post_report(rows // 10),
+    }
+
+
+def load_fixtures(directory: Path) -> dict[str, list[dict] | dict]:
+    """
+    Load recorded fixtures from a directory of json files.
+
+    The file name maps to the endpoint, with `__` standing for `/`: `reports__posts.json` is served on `/reports/posts`.
+    """
+    return {path.stem.replace("__", "/"): json.loads(path.read_text()) for path in sorted(directory.glob("*.json"))}
@@ -0,0 +1,54 @@
+"""Run the benchmark suite and emit the results as json for regression tracking."""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import platform
+import sys
+from pathlib import Path
+
+from benchmarks.fixtures import default_fixtures, load_fixtures
+from benchmarks.stub_server import StubServer
+from benchmarks.suite import BENCHMARKS, BenchmarkContext
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Parse the command line, run the selected benchmarks and write the json report."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("names", nargs="*", help=f"Benchmarks to run (default: all). Available: {', '.join(BENCHMARKS)}.")
+    parser.add_argument("--fixtures", type=Path, help="Directory of recorded json fixtures. Defaults to synthetic data.")
+    parser.add_argument("--rows", type=int, default=5_000, help="Rows per endpoint for the synthetic fixtures.")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per timing; the best one is kept.")
+    parser.add_argument("--output", type=Path, help="Write the json report here instead of stdout.")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    fixtures = load_fixtures(args.fixtures) if args.fixtures else default_fixtures(args.rows)
+
+    report = {
+        "timestamp": datetime.datetime.now(datetime.UTC).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": {},
+    }
+
+    with StubServer(fixtures) as server:
+        context = BenchmarkContext(server=server, repeat=args.repeat)
+        for name in args.names or BENCHMARKS:
+            print(f"Running {name}...", file=sys.stderr)  # noqa: T201
+            report["results"][name] = BENCHMARKS[name](context)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    else:
+        print(output)  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""A local HTTP server imitating the Danbooru api over static fixtures."""
+
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Self
+from urllib.parse import parse_qs, urlparse
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: StubServer
+
+    def do_GET(self) -> None:  # noqa: N802
+        url = urlparse(self.path)
+        endpoint = url.path.strip("/").removesuffix(".json")
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        status, body = self.server.respond(endpoint, params)
+
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args) -> None:
+        """Silence the default per-request stderr logging."""
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, fixtures: dict[str, list[dict] | dict], host: str = "127.0.0.1", port: int = 0):
+        """Serve `fixtures` (endpoint => rows) on a local port, with id-descending pagination like Danbooru."""
+        super().__init__((host, port), _Handler)
+        self.fixtures = {
+            endpoint: sorted(rows, key=lambda row: -row["id"]) if isinstance(rows, list) and rows and "id" in rows[0] else rows
+            for endpoint, rows in fixtures.items()
+        }
+        self.by_id = {
+            endpoint: {row["id"]: row for row in rows}
+            for endpoint, rows in self.fixtures.items()
+            if isinstance(rows, list) and rows and "id" in rows[0]
+        }
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        """The url to pass to `Danbooru(base_url=...)`."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def respond(self, endpoint: str, params: dict[str, str]) -> tuple[int, list | dict]:
+        """Return the status code and body for a request."""
+        if endpoint in self.fixtures:
+            rows = self.fixtures[endpoint]
+            if isinstance(rows, dict):
+                return 200, rows
+            return 200, self._paginate(self._search(rows, params), params)
+
+        collection, _, instance_id = endpoint.rpartition("/")
+        if instance_id.isdigit() and collection in self.by_id:
+            if (row := self.by_id[collection].get(int(instance_id))) is not None:
+                return 200, row
+
+        return 404, {"success": False, "error": "ActiveRecord::RecordNotFound", "message": "That record was not found.", "backtrace": []}
+
+    @staticmethod
+    def _search(rows: list[dict], params: dict[str, str]) -> list[dict]:
+        """Apply the `id:1,2,3` or `id:1..3` tag search and the `search[id]` param, the only filters the stub understands."""
+        id_lists = [tag.removeprefix("id:") for tag in params.get("tags", "").split() if tag.startswith("id:")]
+        if "search[id]" in params:
+            id_lists.append(params["search[id]"])
+        for id_list in id_lists:
+            if ".." in id_list:
+                low, high = (int(bound) for bound in id_list.split(".."))
+                rows = [row for row in rows if low <= row["id"] <= high]
+                continue
+            ids = {int(post_id) for post_id in id_list.split(",") if post_id.isdigit()}
+            rows = [row for row in rows if row["id"] in ids]
+        return rows
+
+    @staticmethod
+    def _paginate(rows: list[dict], params: dict[str, str]) -> list[dict]:
+        limit = int(params.get("limit", 20))
+        page = params.get("page", "1")
+
+        if page.startswith("b"):
+            before = int(page[1:])
+            rows = [row for row in rows if row["id"] < before]
+            return rows[:limit]
+        if page.startswith("a"):
+            after = int(page[1:])
+            rows = [row for row in rows if row["id"] > after]
+            return rows[-limit:]
+
+        offset = (int(page) - 1) * limit
+        return rows[offset:offset + limit]
+
+    def start(self) -> Self:
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc: BaseException | None, tb: TracebackType | None) -> None:
+        self.stop()
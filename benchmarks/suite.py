@@ -0,0 +1,200 @@
+"""Benchmark registry and the request/parsing benchmarks run against the stub server."""
+
+from __future__ import annotations
+
+import gc
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from pyrate_limiter import Duration, Limiter, Rate
+
+from benchmarks.stub_server import StubServer
+from danbooru.danbooru import Danbooru
+from danbooru.models import DanbooruPost, DanbooruPostVersion, DanbooruRelatedTag, DanbooruTag, DanbooruUser
+from danbooru.reports import DanbooruPostReport
+from danbooru.user_level import UserLevel
+
+Benchmark = Callable[["BenchmarkContext"], dict[str, Any]]
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str) -> Callable[[Benchmark], Benchmark]:
+    """Register a benchmark under a name."""
+    def decorator(func: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+@dataclass
+class BenchmarkContext:
+    server: StubServer
+    repeat: int = 5
+    _session: Danbooru | None = field(default=None, repr=False)
+
+    @property
+    def session(self) -> Danbooru:
+        """A session pointed at the stub server, with a rate limit high enough to never throttle."""
+        if self._session is None:
+            limiter = Limiter(Rate(1_000_000, Duration.SECOND))
+            self._session = Danbooru(base_url=self.server.base_url, danbooru_username=None, danbooru_api_key=None, limiter=limiter)
+        return self._session
+
+
+def best_of(repeat: int, func: Callable[[], Any]) -> float:
+    """Return the fastest wall time of `repeat` runs."""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started_at = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started_at)
+    return min(timings)
+
+
+@benchmark("requests_per_second")
+def requests_per_second(ctx: BenchmarkContext) -> dict[str, Any]:
+    """Raw request throughput through `_do_request`, without parsing."""
+    n_requests = 200
+
+    def run() -> None:
+        for _ in range(n_requests):
+            ctx.session._do_request("GET", "tags", False, params={"limit": 20})  # noqa: SLF001
+
+    elapsed = best_of(ctx.repeat, run)
+    return {"requests": n_requests, "seconds": elapsed, "requests_per_second": n_requests / elapsed}
+
+
+_PARSE_TARGETS = {
+    "posts": (DanbooruPost, {"limit": 200}),
+    "post_versions": (DanbooruPostVersion, {"limit": 1000}),
+    "tags": (DanbooruTag, {"limit": 1000}),
+    "related_tag": (DanbooruRelatedTag, {}),
+    "reports/posts": (DanbooruPostReport, {"limit": 1000}),
+    "users": (DanbooruUser, {"limit": 1000}),
+}
+
+
+@benchmark("parse_per_row")
+def parse_per_row(ctx: BenchmarkContext) -> dict[str, Any]:
+    """Cost of json decoding plus model validation in `_parse_response`, per row."""
+    results = {}
+    for endpoint, (model, params) in _PARSE_TARGETS.items():
+        response = ctx.session._do_request("GET", endpoint, False, params=params)  # noqa: SLF001
+        parsed = ctx.session._parse_response(response, model.generic_endpoint)  # noqa: SLF001
+        rows = len(parsed) if isinstance(parsed, list) else 1
+        elapsed = best_of(ctx.repeat, lambda response=response, model=model: ctx.session._parse_response(response, model.generic_endpoint))  # noqa: SLF001
+        results[endpoint] = {"rows": rows, "seconds": elapsed, "microseconds_per_row": elapsed / rows * 1e6}
+    return results
+
+
+@benchmark("memory_per_1000_models")
+def memory_per_1000_models(ctx: BenchmarkContext) -> dict[str, Any]:
+    """Bytes retained by 1000 parsed models, measured with tracemalloc."""
+    results = {}
+    for endpoint, model in (("posts", DanbooruPost), ("post_versions", DanbooruPostVersion), ("tags", DanbooruTag)):
+        pages = [ctx.session._do_request("GET", endpoint, False, params={"limit": 200, "page": page}) for page in range(1, 6)]  # noqa: SLF001
+
+        gc.collect()
+        tracemalloc.start()
+        baseline, _ = tracemalloc.get_traced_memory()
+        parsed = [ctx.session._parse_response(response, model.generic_endpoint) for response in pages]  # noqa: SLF001
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        rows = sum(len(page) for page in parsed)
+        results[endpoint] = {"rows": rows, "bytes_per_1000": (current - baseline) / rows * 1000, "peak_bytes": peak - baseline}
+        del parsed
+    return results
+
+
+@benchmark("pagination_throughput")
+def pagination_throughput(ctx: BenchmarkContext) -> dict[str, Any]:
+    """Rows per second through `all_pages`, including requests and parsing."""
+    results = {}
+    for model in (DanbooruPost, DanbooruPostVersion, DanbooruTag):
+        rows = len(model.get_all(session=ctx.session))
+        elapsed = best_of(max(1, ctx.repeat // 2), lambda model=model: model.get_all(session=ctx.session))
+        results[model.generic_endpoint] = {"rows": rows, "seconds": elapsed, "rows_per_second": rows / elapsed}
+    return results
+
+
+@benchmark("pipelined_pagination_throughput")
+def pipelined_pagination_throughput(ctx: BenchmarkContext) -> dict[str, Any]:
+    """Rows per second through `pipelined_pages`, with parsing in a process pool."""
+    results = {}
+    for model in (DanbooruPost, DanbooruPostVersion, DanbooruTag):
+        def crawl(model: type = model) -> int:
+            return sum(len(page) for page in model.pipelined_pages(processes=4, session=ctx.session))
+        rows = crawl()
+        elapsed = best_of(max(1, ctx.repeat // 2), crawl)
+        results[model.generic_endpoint] = {"rows": rows, "seconds": elapsed, "rows_per_second": rows / elapsed}
+    return results
+
+
+@benchmark("import_time")
+def import_time(ctx: BenchmarkContext) -> dict[str, Any]:
+    """Wall time of fresh interpreters importing the package, its models and its session class."""
+    statements = {
+        "import danbooru": "import danbooru",
+        "from danbooru import DanbooruPost": "from danbooru import DanbooruPost",
+        "from danbooru import Danbooru": "from danbooru import Danbooru",
+        "python startup": "pass",
+    }
+    results = {}
+    for label, statement in statements.items():
+        elapsed = best_of(ctx.repeat, lambda statement=statement: subprocess.run([sys.executable, "-c", statement], check=True))
+        results[label] = {"seconds": elapsed}
+
+    startup = results["python startup"]["seconds"]
+    for label, result in results.items():
+        result["seconds_over_startup"] = result["seconds"] - startup
+    return results
+
+
+@benchmark("user_level")
+def user_level(ctx: BenchmarkContext) -> dict[str, Any]:
+    """Level parsing and comparisons over a large user dump."""
+    users = DanbooruUser.get_all(session=ctx.session)
+    levels = [user.level for user in users] * max(1, 200_000 // len(users))
+    numbers = [level.number for level in levels]
+
+    parse = best_of(ctx.repeat, lambda: [UserLevel(number) for number in numbers])
+    filter_by_level = best_of(ctx.repeat, lambda: [level for level in levels if level >= UserLevel.BUILDER])
+    filter_by_name = best_of(ctx.repeat, lambda: [level for level in levels if level >= "builder"])
+    filter_by_number = best_of(ctx.repeat, lambda: [level for level in levels if level >= 32])
+    distinct = best_of(ctx.repeat, lambda: set(levels))
+
+    return {
+        "levels": len(levels),
+        "parse_ns_per_level": parse / len(levels) * 1e9,
+        "compare_level_ns": filter_by_level / len(levels) * 1e9,
+        "compare_name_ns": filter_by_name / len(levels) * 1e9,
+        "compare_number_ns": filter_by_number / len(levels) * 1e9,
+        "hash_ns": distinct / len(levels) * 1e9,
+    }
+
+
+@benchmark("model_dedup")
+def model_dedup(ctx: BenchmarkContext) -> dict[str, Any]:
+    """Set-based deduplication of parsed models, and class metadata lookups."""
+    posts = DanbooruPost.get_all(session=ctx.session)
+    rows = list(posts) * max(1, 200_000 // len(posts))
+
+    distinct = best_of(ctx.repeat, lambda: set(rows))
+    by_id = best_of(ctx.repeat, lambda: {post.id: post for post in rows})
+    endpoint = best_of(ctx.repeat, lambda: [DanbooruPost.generic_endpoint for _ in range(100_000)])
+
+    return {
+        "rows": len(rows),
+        "distinct": len(set(rows)),
+        "set_ns_per_row": distinct / len(rows) * 1e9,
+        "dict_by_id_ns_per_row": by_id / len(rows) * 1e9,
+        "generic_endpoint_ns": endpoint / 100_000 * 1e9,
+    }
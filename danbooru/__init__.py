@@ -1,10 +1,42 @@
-"""The Danbooru package provides a model-based interface to the Danbooru API."""
+"""
+The Danbooru package provides a model-based interface to the Danbooru API.
 
+`Danbooru`, the models and the reports are loaded lazily on first access, which keeps `import danbooru` cheap
+for short-lived processes: the http, cache and validation stacks are only imported once they're actually used.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
 
 from loguru import logger
 
-from danbooru.danbooru import Danbooru  # noqa: F401
-from danbooru.models import *  # noqa: F403
-from danbooru.reports import *  # noqa: F403
+from danbooru import models, reports
+
+if TYPE_CHECKING:
+    from danbooru.danbooru import Danbooru
+    from danbooru.models import *  # noqa: F403
+    from danbooru.reports import *  # noqa: F403
 
 logger = logger.opt(colors=True)
+
+__all__ = ["Danbooru", "logger", *models.__all__, *reports.__all__]
+
+
+def __getattr__(name: str) -> Any:
+    if name == "Danbooru":
+        from danbooru.danbooru import Danbooru
+        value = Danbooru
+    elif name in models.__all__:
+        value = getattr(models, name)
+    elif name in reports.__all__:
+        value = getattr(reports, name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
@@ -0,0 +1,3 @@
+from danbooru.cli import main
+
+main()
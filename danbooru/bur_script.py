@@ -0,0 +1,234 @@
+"""
+A parser for the bulk update request script language, and a batched impact estimator for queues of requests.
+
+    burs = DanbooruBulkUpdateRequest.get(status="pending")
+    for impact in BURImpactEstimator().estimate(burs).values():
+        print(impact.bur_id, impact.affected_posts, impact.issues)
+"""
+
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from itertools import batched
+from typing import TYPE_CHECKING, Literal
+
+from danbooru import logger
+from danbooru.model import get_default_session
+from danbooru.post_counter import PostCounter
+from danbooru.utils import ContextThreadPoolExecutor
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from danbooru.danbooru import Danbooru
+    from danbooru.models.bulk_update_request import DanbooruBulkUpdateRequest
+    from danbooru.models.tag import DanbooruTag
+
+Action = Literal[
+    "create_alias", "remove_alias", "create_implication", "remove_implication", "rename",
+    "mass_update", "change_category", "nuke", "deprecate", "undeprecate",
+]
+
+# category names accepted by scripts, with the short forms Danbooru also takes, mapped to the full name
+TAG_CATEGORIES = {
+    "general": "general", "gen": "general",
+    "artist": "artist", "art": "artist",
+    "copyright": "copyright", "copy": "copyright",
+    "character": "character", "char": "character",
+    "meta": "meta",
+}
+
+# mirrors the command syntax accepted by Danbooru's BulkUpdateRequestProcessor
+_COMMANDS: list[tuple[re.Pattern, Action]] = [
+    (re.compile(r"(?:create alias|aliasing|alias) (\S+) -> (\S+)", re.IGNORECASE), "create_alias"),
+    (re.compile(r"(?:create implication|implicating|implicate|imply) (\S+) -> (\S+)", re.IGNORECASE), "create_implication"),
+    (re.compile(r"(?:remove alias|unaliasing|unalias) (\S+) -> (\S+)", re.IGNORECASE), "remove_alias"),
+    (re.compile(r"(?:remove implication|unimplicating|unimplicate|unimply) (\S+) -> (\S+)", re.IGNORECASE), "remove_implication"),
+    (re.compile(r"(?:rename|moving|move) (\S+) -> (\S+)", re.IGNORECASE), "rename"),
+    (re.compile(r"(?:mass update|updating|update|change) (.+?) -> (.*)", re.IGNORECASE), "mass_update"),
+    (re.compile(rf"category (\S+) -> ({'|'.join(TAG_CATEGORIES)})", re.IGNORECASE), "change_category"),
+    (re.compile(r"nuke (\S+)", re.IGNORECASE), "nuke"),
+    (re.compile(r"deprecate (\S+)", re.IGNORECASE), "deprecate"),
+    (re.compile(r"undeprecate (\S+)", re.IGNORECASE), "undeprecate"),
+]
+
+
+class BURScriptError(ValueError):
+    def __init__(self, line_number: int, line: str):
+        """Raise an exception when a line of a bulk update request script can't be parsed."""
+        self.line_number = line_number
+        self.line = line
+        super().__init__(f"Unparseable script line {line_number}: {line!r}")
+
+
+@dataclass(frozen=True, slots=True)
+class BURCommand:
+    action: Action
+    antecedent: str
+    consequent: str | None = None
+    line_number: int = 0
+
+    @property
+    def tags(self) -> list[str]:
+        """The plain tags this command reads or writes. Mass updates contribute their non-metatag search terms."""
+        if self.action == "mass_update":
+            terms = f"{self.antecedent} {self.consequent or ''}".split()
+            return [term.lstrip("-~") for term in terms if ":" not in term and term.lstrip("-~")]
+        if self.action == "change_category":
+            return [self.antecedent]
+        return [tag for tag in (self.antecedent, self.consequent) if tag]
+
+
+def parse_script(script: str) -> list[BURCommand]:
+    """Parse a bulk update request script into commands. Blank lines are skipped; tags are lowercased and categories spelled in full."""
+    commands = []
+    for line_number, raw_line in enumerate(script.splitlines(), start=1):
+        line = raw_line.strip()
+        if not line:
+            continue
+
+        for pattern, action in _COMMANDS:
+            if match := pattern.fullmatch(line):
+                antecedent, *rest = match.groups()
+                consequent = rest[0] if rest else None
+                if action != "mass_update":
+                    antecedent = antecedent.lower()
+                    consequent = consequent.lower() if consequent else consequent
+                if action == "change_category":
+                    consequent = TAG_CATEGORIES[consequent]
+                commands.append(BURCommand(action, antecedent, consequent, line_number))
+                break
+        else:
+            raise BURScriptError(line_number, line)
+    return commands
+
+
+@dataclass
+class CommandImpact:
+    command: BURCommand
+    affected_posts: int
+
+
+@dataclass
+class BURImpact:
+    bur_id: int
+    commands: list[CommandImpact] = field(default_factory=list)
+    issues: list[str] = field(default_factory=list)
+
+    @property
+    def affected_posts(self) -> int:
+        """Upper bound of posts touched by the request: the sum over its commands."""
+        return sum(impact.affected_posts for impact in self.commands)
+
+
+class BURImpactEstimator:
+    def __init__(self, session: Danbooru | None = None, max_workers: int = 4, cache: bool = True):
+        """Estimate bulk update request impact, resolving all referenced tags and searches in batched, cached requests."""
+        self.session = session or get_default_session()
+        self.max_workers = max_workers
+        self.cache = cache
+        self.tags: dict[str, DanbooruTag] = {}
+        self.counts: dict[str, int] = {}
+        self.counter = PostCounter(self.session, max_workers=max_workers, http_cache=cache)
+
+    def resolve(self, tag_names: Iterable[str], queries: Iterable[str] = ()) -> None:
+        """Fetch the tags and search counts not resolved yet."""
+        missing_tags = [name for name in dict.fromkeys(tag_names) if name not in self.tags]
+        missing_queries = [query for query in dict.fromkeys(queries) if query not in self.counts]
+        logger.trace(f"Resolving {len(missing_tags)} tags and {len(missing_queries)} post counts.")
+
+        with ContextThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            chunks = batched(missing_tags, self.counter.TAG_CHUNK_SIZE)
+            for tags in executor.map(self.counter._fetch_tag_chunk, chunks):  # noqa: SLF001
+                self.tags.update((tag.name, tag) for tag in tags)
+                self.counter.add_tags(tags)
+        self.counts.update(self.counter.counts(missing_queries))
+
+    def post_count(self, tag_name: str) -> int:
+        """The resolved post count of a tag, or 0 if it doesn't exist."""
+        tag = self.tags.get(tag_name)
+        return tag.post_count if tag else 0
+
+    def estimate(self, burs: Iterable[DanbooruBulkUpdateRequest]) -> dict[int, BURImpact]:
+        """Return the impact of each request, keyed by request id."""
+        parsed: dict[int, list[BURCommand]] = {}
+        impacts: dict[int, BURImpact] = {}
+        for bur in burs:
+            impacts[bur.id] = BURImpact(bur.id)
+            try:
+                parsed[bur.id] = parse_script(bur.script)
+            except BURScriptError as e:
+                parsed[bur.id] = []
+                impacts[bur.id].issues.append(str(e))
+
+        commands = [command for bur_commands in parsed.values() for command in bur_commands]
+        self.resolve(
+            tag_names=(tag for command in commands for tag in command.tags),
+            queries=(command.antecedent for command in commands if command.action == "mass_update"),
+        )
+
+        for bur_id, bur_commands in parsed.items():
+            impact = impacts[bur_id]
+            for command in bur_commands:
+                impact.commands.append(CommandImpact(command, self._affected_posts(command)))
+                impact.issues += self._command_issues(command)
+
+        self._cross_request_issues(parsed, impacts)
+        return impacts
+
+    def _affected_posts(self, command: BURCommand) -> int:
+        if command.action == "mass_update":
+            return self.counts.get(command.antecedent, 0)
+        if command.action in ("remove_alias", "remove_implication", "undeprecate"):
+            return 0
+        return self.post_count(command.antecedent)
+
+    def _command_issues(self, command: BURCommand) -> list[str]:
+        issues = []
+        line = f"line {command.line_number} ({command.action})"
+
+        if command.action in ("create_alias", "create_implication", "rename") and command.antecedent == command.consequent:
+            issues.append(f"{line}: '{command.antecedent}' points to itself.")
+
+        if command.action in ("create_alias", "create_implication", "rename", "nuke", "change_category", "deprecate"):
+            if command.antecedent not in self.tags:
+                issues.append(f"{line}: '{command.antecedent}' does not exist.")
+
+        if command.action in ("create_alias", "create_implication", "rename") and command.consequent:
+            consequent = self.tags.get(command.consequent)
+            if consequent and consequent.is_deprecated:
+                issues.append(f"{line}: '{command.consequent}' is deprecated.")
+
+        if command.action == "create_implication":
+            antecedent, consequent = self.tags.get(command.antecedent), self.tags.get(command.consequent or "")
+            if antecedent and consequent and antecedent.category != consequent.category:
+                issues.append(f"{line}: '{command.antecedent}' and '{command.consequent}' are in different categories.")
+
+        return issues
+
+    @staticmethod
+    def _cross_request_issues(parsed: dict[int, list[BURCommand]], impacts: dict[int, BURImpact]) -> None:
+        """Flag requests that alias the same tag differently, or alias away a tag another request builds on."""
+        aliased: defaultdict[str, dict[int, str]] = defaultdict(dict)
+        used: defaultdict[str, set[int]] = defaultdict(set)
+
+        for bur_id, commands in parsed.items():
+            for command in commands:
+                if command.action in ("create_alias", "rename"):
+                    aliased[command.antecedent][bur_id] = command.consequent or ""
+                if command.action in ("create_alias", "create_implication", "rename") and command.consequent:
+                    used[command.consequent].add(bur_id)
+                if command.action == "create_implication":
+                    used[command.antecedent].add(bur_id)
+
+        for tag, targets in aliased.items():
+            if len(set(targets.values())) > 1:
+                for bur_id in targets:
+                    others = ", ".join(f"#{other} -> {target}" for other, target in targets.items() if other != bur_id)
+                    impacts[bur_id].issues.append(f"'{tag}' is aliased differently by other requests: {others}.")
+
+            for bur_id in used.get(tag, set()) - set(targets):
+                aliasing = ", ".join(f"#{other}" for other in targets)
+                impacts[bur_id].issues.append(f"'{tag}' is aliased away by {aliasing}.")
@@ -0,0 +1,146 @@
+"""
+A session-wide circuit breaker for site outages.
+
+When Danbooru is down for maintenance, behind a Cloudflare error page or rate limiting us, every request
+would fail and back off on its own. The breaker instead opens after a few such failures: callers then
+park until it's time to probe (or fail fast with `CircuitOpenError`), a single half-open request probes
+the site, and its outcome closes the circuit for everyone or opens it again.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from enum import StrEnum
+
+from danbooru import logger
+from danbooru.deadline import check_deadline, time_left
+from danbooru.exceptions import CircuitOpenError, CloudflareError, DanbooruRateLimitError, DeadlineExceededError, DownbooruError
+
+TRIPPING_ERRORS = (DownbooruError, CloudflareError, DanbooruRateLimitError)
+"""Errors meaning the whole site is unavailable to us, as opposed to a problem with one query."""
+
+
+class CircuitState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self,
+                 failure_threshold: int = 3,
+                 reset_timeout: float = 30.0,
+                 rate_limit_timeout: float = 60.0,
+                 block: bool = True,
+                 on_state_change: Callable[[CircuitState, CircuitState], None] | None = None,
+                 ):
+        """
+        Open after `failure_threshold` consecutive outage errors, or right away on a rate limit error.
+
+        The circuit stays open for `reset_timeout` seconds (`rate_limit_timeout` after a rate limit), then lets
+        one probe through. With `block=True`, callers wait while the circuit is open; otherwise they raise `CircuitOpenError`.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.rate_limit_timeout = rate_limit_timeout
+        self.block = block
+        self.on_state_change = on_state_change
+
+        self._condition = threading.Condition()
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._reopen_at = 0.0
+        self._probing = False
+        self.last_error: BaseException | None = None
+
+    @property
+    def state(self) -> CircuitState:
+        """The current state, moving from open to half-open once the timeout has passed."""
+        with self._condition:
+            if self._state == CircuitState.OPEN and time.monotonic() >= self._reopen_at:
+                self._set_state(CircuitState.HALF_OPEN)
+            return self._state
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until the circuit lets a probe through, 0 if it's not open."""
+        with self._condition:
+            if self._state != CircuitState.OPEN:
+                return 0.0
+            return max(0.0, self._reopen_at - time.monotonic())
+
+    def _set_state(self, state: CircuitState) -> None:
+        previous, self._state = self._state, state
+        if previous != state:
+            logger.warning(f"Circuit breaker: {previous} -> {state}")
+            self._condition.notify_all()
+            if self.on_state_change:
+                self.on_state_change(previous, state)
+
+    def before_request(self) -> None:
+        """
+        Wait or raise while the circuit is open. In half-open state, only one caller at a time goes through as the probe.
+
+        Callers with a deadline that would pass before the next probe raise `DeadlineExceededError` right away.
+        """
+        with self._condition:
+            while True:
+                if self._state == CircuitState.CLOSED:
+                    return
+                check_deadline(self.last_error)
+
+                if self._state == CircuitState.OPEN:
+                    remaining = self._reopen_at - time.monotonic()
+                    if remaining <= 0:
+                        self._set_state(CircuitState.HALF_OPEN)
+                        continue
+                    if not self.block:
+                        raise CircuitOpenError(remaining, self.last_error)
+                    if (left := time_left()) is not None and left < remaining:
+                        raise DeadlineExceededError(self.last_error)
+                    self._condition.wait(remaining)
+                    continue
+
+                if not self._probing:
+                    self._probing = True
+                    return
+                if not self.block:
+                    raise CircuitOpenError(0.0, self.last_error)
+                self._condition.wait(time_left())
+
+    def record_success(self) -> None:
+        """The site answered: close the circuit."""
+        with self._condition:
+            self._failures = 0
+            self._probing = False
+            self._set_state(CircuitState.CLOSED)
+
+    def record_failure(self, error: BaseException) -> None:
+        """Count an outage error, opening the circuit if needed. Other errors only release a pending probe."""
+        with self._condition:
+            if not isinstance(error, TRIPPING_ERRORS):
+                if self._probing:
+                    self._probing = False
+                    self._condition.notify_all()
+                return
+
+            self.last_error = error
+            self._failures += 1
+            self._probing = False
+
+            if isinstance(error, DanbooruRateLimitError):
+                self._open(self.rate_limit_timeout)
+            elif self._state == CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._open(self.reset_timeout)
+
+    def _open(self, timeout: float) -> None:
+        self._reopen_at = max(self._reopen_at, time.monotonic() + timeout)
+        if self._state == CircuitState.OPEN:
+            return
+        self._set_state(CircuitState.OPEN)
+
+    def reset(self) -> None:
+        """Force the circuit closed."""
+        self.record_success()
@@ -0,0 +1,79 @@
+"""
+The `danbooru` command line.
+
+    danbooru export posts tags="kantai_collection rating:g" --output dump/ --format parquet
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from danbooru import logger
+
+
+def _parse_params(pairs: list[str], parser: argparse.ArgumentParser) -> dict[str, str]:
+    params = {}
+    for pair in pairs:
+        key, separator, value = pair.partition("=")
+        if not separator or not key:
+            parser.error(f"Search params must look like key=value, got '{pair}'.")
+        params[key] = value
+    return params
+
+
+def _export(args: argparse.Namespace, parser: argparse.ArgumentParser) -> None:
+    from danbooru.danbooru import Danbooru
+    from danbooru.exceptions import ExportMismatchError
+    from danbooru.export import Exporter
+    from danbooru.model import DanbooruInstancedModel, DanbooruModel
+
+    model = DanbooruModel.model_for_endpoint(args.model)
+    if model is DanbooruModel:
+        model = DanbooruModel.model_for_name(args.model)
+    if not issubclass(model, DanbooruInstancedModel):
+        parser.error(f"Can't export '{args.model}'. Use the endpoint or name of a model, such as 'posts' or 'post_version'.")
+
+    params = _parse_params(args.params, parser)
+    if args.only:
+        params["only"] = args.only
+
+    exporter = Exporter(model,
+                        output=args.output,
+                        params=params,
+                        file_format=args.format,
+                        rows_per_file=args.rows_per_file,
+                        session=Danbooru(base_url=args.base_url))
+    try:
+        exporter.run()
+    except ExportMismatchError as e:
+        parser.error(str(e))
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Parse the command line and run the selected command."""
+    parser = argparse.ArgumentParser(prog="danbooru", description="Command line tools for the Danbooru api.")
+    parser.add_argument("--base-url", help="Site to use. Defaults to the DANBOORU_BASE_URL environment variable.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log every request.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Export every row of a search to compressed files, resumably.")
+    export.add_argument("model", help="Endpoint or model name, such as 'posts' or 'post_versions'.")
+    export.add_argument("params", nargs="*", help="Search params as key=value, such as tags=touhou or updater_id=1.")
+    export.add_argument("-o", "--output", type=Path, required=True, help="Directory for the files and the checkpoint.")
+    export.add_argument("-f", "--format", choices=("ndjson", "parquet"), default="ndjson", help="File format (default: ndjson).")
+    export.add_argument("--rows-per-file", type=int, default=100_000, help="Rows per file before rotating (default: 100000).")
+    export.add_argument("--only", help="Fields to export, as in the api's only= param. Defaults to every field.")
+
+    args = parser.parse_args(argv)
+
+    logger.remove()
+    logger.add(sys.stderr, level="TRACE" if args.verbose else "INFO")
+
+    if args.command == "export":
+        _export(args, export)
+
+
+if __name__ == "__main__":
+    main()
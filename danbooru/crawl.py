@@ -0,0 +1,298 @@
+"""
+Crawls split across many workers and machines through a shared work queue and a shared rate budget.
+
+    queue = SQLiteWorkQueue("crawl.sqlite")
+    session = Danbooru(limiter=SharedRateBudget("crawl.sqlite", requests=10))
+    coordinator = CrawlCoordinator(DanbooruPost, queue, params={"tags": "kantai_collection"}, session=session)
+    coordinator.plan()  # idempotent, every node can call it
+    for page in coordinator.pages():
+        ...
+
+The search is partitioned into id ranges, newest first. Each worker leases one range at a time and walks it
+with `b<id>` cursors, checkpointing the cursor after every page it hands out; a range whose worker dies is
+picked up by another once its lease expires, from the last checkpoint. Rows are delivered at least once.
+
+The SQLite queue and budget work for workers on one host or on a filesystem with working locks. Other
+backends, such as Redis, only need to implement the `WorkQueue` protocol and a blocking `try_acquire`.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Protocol
+
+from danbooru import logger
+from danbooru.model import get_default_session
+from danbooru.results import DanbooruResults
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Iterable
+    from typing import Any
+
+    from danbooru.danbooru import Danbooru
+    from danbooru.model import DanbooruInstancedModel
+
+
+@contextmanager
+def _transaction(path: Path) -> Generator[sqlite3.Connection, None, None]:
+    """An immediate (write-locked) transaction, so that concurrent workers never lease the same task."""
+    connection = sqlite3.connect(path, timeout=60, isolation_level=None)
+    try:
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+    finally:
+        connection.close()
+
+
+def default_worker_name() -> str:
+    """A name unique to this process, used to tell leases apart."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+@dataclass(frozen=True)
+class CrawlTask:
+    job: str
+    id: int
+    low: int
+    high: int
+    """Inclusive bounds of the id range."""
+    cursor: str | None = None
+    """The `b<id>` cursor of the last checkpoint, if the range was started before."""
+    rows: int = 0
+
+
+class WorkQueue(Protocol):
+    def put(self, job: str, ranges: Iterable[tuple[int, int]]) -> int: ...
+    def lease(self, job: str, worker: str, seconds: float) -> CrawlTask | None: ...
+    def checkpoint(self, task: CrawlTask, worker: str, cursor: str, rows: int, seconds: float) -> bool: ...
+    def complete(self, task: CrawlTask, worker: str, rows: int) -> None: ...
+    def fail(self, task: CrawlTask, worker: str, error: str) -> None: ...
+    def release(self, task: CrawlTask, worker: str) -> None: ...
+    def progress(self, job: str) -> dict[str, int]: ...
+
+
+class SQLiteWorkQueue:
+    def __init__(self, path: str | Path, max_attempts: int = 5):
+        """A work queue in a SQLite file. Tasks that failed `max_attempts` times are left out of further leases."""
+        self.path = Path(path)
+        self.max_attempts = max_attempts
+
+        with _transaction(self.path) as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS crawl_tasks (
+                    job TEXT NOT NULL,
+                    id INTEGER NOT NULL,
+                    low INTEGER NOT NULL,
+                    high INTEGER NOT NULL,
+                    state TEXT NOT NULL DEFAULT 'pending',
+                    worker TEXT,
+                    lease_until REAL,
+                    cursor TEXT,
+                    rows INTEGER NOT NULL DEFAULT 0,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    PRIMARY KEY (job, id)
+                )
+            """)
+        sqlite3.connect(self.path).execute("PRAGMA journal_mode=WAL").connection.close()
+
+    def put(self, job: str, ranges: Iterable[tuple[int, int]]) -> int:
+        """Add the tasks of a job, unless it was already planned. Return how many tasks were added."""
+        with _transaction(self.path) as db:
+            if db.execute("SELECT 1 FROM crawl_tasks WHERE job = ? LIMIT 1", (job,)).fetchone():
+                return 0
+            rows = [(job, task_id, low, high) for task_id, (low, high) in enumerate(ranges)]
+            db.executemany("INSERT INTO crawl_tasks (job, id, low, high) VALUES (?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def lease(self, job: str, worker: str, seconds: float) -> CrawlTask | None:
+        """Take the next pending task, or one whose lease expired, for `seconds`."""
+        now = time.time()
+        with _transaction(self.path) as db:
+            # a worker that died on its last attempt never called `fail`
+            db.execute("""
+                UPDATE crawl_tasks SET state = 'failed', lease_until = NULL, error = COALESCE(error, 'The lease expired.')
+                WHERE job = ? AND state = 'leased' AND lease_until < ? AND attempts >= ?
+            """, (job, now, self.max_attempts))
+            row = db.execute("""
+                SELECT id, low, high, cursor, rows FROM crawl_tasks
+                WHERE job = ? AND attempts < ? AND (state = 'pending' OR (state = 'leased' AND lease_until < ?))
+                ORDER BY id LIMIT 1
+            """, (job, self.max_attempts, now)).fetchone()
+            if not row:
+                return None
+            db.execute("""
+                UPDATE crawl_tasks SET state = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1
+                WHERE job = ? AND id = ?
+            """, (worker, now + seconds, job, row[0]))
+        task_id, low, high, cursor, rows = row
+        return CrawlTask(job, task_id, low, high, cursor, rows)
+
+    def checkpoint(self, task: CrawlTask, worker: str, cursor: str, rows: int, seconds: float) -> bool:
+        """Save the progress of a task and renew its lease. Return False if the lease was lost to another worker."""
+        with _transaction(self.path) as db:
+            updated = db.execute("""
+                UPDATE crawl_tasks SET cursor = ?, rows = ?, lease_until = ?
+                WHERE job = ? AND id = ? AND state = 'leased' AND worker = ?
+            """, (cursor, rows, time.time() + seconds, task.job, task.id, worker)).rowcount
+        return bool(updated)
+
+    def complete(self, task: CrawlTask, worker: str, rows: int) -> None:
+        """Mark a task as done."""
+        with _transaction(self.path) as db:
+            db.execute("""
+                UPDATE crawl_tasks SET state = 'done', rows = ?, lease_until = NULL, error = NULL
+                WHERE job = ? AND id = ? AND worker = ?
+            """, (rows, task.job, task.id, worker))
+
+    def fail(self, task: CrawlTask, worker: str, error: str) -> None:
+        """Return a task to the queue after an error, or mark it failed after too many attempts."""
+        with _transaction(self.path) as db:
+            db.execute("""
+                UPDATE crawl_tasks SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                                       lease_until = NULL, error = ?
+                WHERE job = ? AND id = ? AND worker = ?
+            """, (self.max_attempts, error, task.job, task.id, worker))
+
+    def release(self, task: CrawlTask, worker: str) -> None:
+        """Return an unfinished task to the queue without counting the attempt, as when a worker is stopped."""
+        with _transaction(self.path) as db:
+            db.execute("""
+                UPDATE crawl_tasks SET state = 'pending', lease_until = NULL, attempts = attempts - 1
+                WHERE job = ? AND id = ? AND state = 'leased' AND worker = ?
+            """, (task.job, task.id, worker))
+
+    def progress(self, job: str) -> dict[str, int]:
+        """Count the tasks of a job by state, plus the rows crawled so far."""
+        with _transaction(self.path) as db:
+            counts = dict(db.execute("SELECT state, COUNT(*) FROM crawl_tasks WHERE job = ? GROUP BY state", (job,)).fetchall())
+            (rows,) = db.execute("SELECT COALESCE(SUM(rows), 0) FROM crawl_tasks WHERE job = ?", (job,)).fetchone()
+        return {state: counts.get(state, 0) for state in ("pending", "leased", "done", "failed")} | {"rows": rows}
+
+
+class SharedRateBudget:
+    def __init__(self, path: str | Path, requests: int, per: float = 1.0):
+        """
+        A rate limit of `requests` every `per` seconds shared by every process using the same SQLite file.
+
+        Pass it as the `limiter` of each worker's session, so that adding workers splits the quota instead of exceeding it.
+        """
+        self.path = Path(path)
+        self.requests = requests
+        self.per = per
+
+        with _transaction(self.path) as db:
+            db.execute("CREATE TABLE IF NOT EXISTS rate_budget (name TEXT NOT NULL, at REAL NOT NULL)")
+            db.execute("CREATE INDEX IF NOT EXISTS rate_budget_at ON rate_budget (name, at)")
+
+    def try_acquire(self, name: str = "request", weight: int = 1) -> bool:
+        """Block until the shared budget allows `weight` more requests."""
+        while (wait := self._reserve(name, weight)) > 0:
+            time.sleep(wait)
+        return True
+
+    def _reserve(self, name: str, weight: int) -> float:
+        now = time.time()
+        with _transaction(self.path) as db:
+            db.execute("DELETE FROM rate_budget WHERE name = ? AND at <= ?", (name, now - self.per))
+            used, oldest = db.execute("SELECT COUNT(*), MIN(at) FROM rate_budget WHERE name = ?", (name,)).fetchone()
+            if used + weight <= self.requests:
+                db.executemany("INSERT INTO rate_budget (name, at) VALUES (?, ?)", [(name, now)] * weight)
+                return 0.0
+        return max(oldest + self.per - now, 0.001)
+
+
+def split_id_range(low: int, high: int, chunk_size: int) -> list[tuple[int, int]]:
+    """Split `low..high` into inclusive ranges of `chunk_size` ids, newest first."""
+    return [(max(low, top - chunk_size + 1), top) for top in range(high, low - 1, -chunk_size)]
+
+
+class CrawlCoordinator:
+    def __init__(self,
+                 model: type[DanbooruInstancedModel],
+                 queue: WorkQueue,
+                 params: dict[str, Any] | None = None,
+                 chunk_size: int = 100_000,
+                 job: str | None = None,
+                 session: Danbooru | None = None,
+                 ):
+        """
+        Split a search on `model`, filtered by `params`, into ranges of `chunk_size` ids crawled through `queue`.
+
+        The job name defaults to the endpoint and params, so nodes started with the same arguments join the same crawl.
+        """
+        if not model._paginates_by_id(params or {}):  # noqa: SLF001
+            raise ValueError("Only searches in the default id order can be split into id ranges.")
+
+        self.model = model
+        self.queue = queue
+        self.params = params or {}
+        self.chunk_size = chunk_size
+        self.job = job or f"{model.generic_endpoint}:{json.dumps(self.params, sort_keys=True, default=str)}"
+        self.session = session or get_default_session()
+
+    def plan(self) -> int:
+        """Partition the ids up to the current newest row into tasks, unless the job was planned already. Return the tasks added."""
+        latest = self.model.get(session=self.session, **self.params | {"limit": 1})
+        if not latest:
+            return 0
+        added = self.queue.put(self.job, split_id_range(1, latest[0].id, self.chunk_size))
+        if added:
+            logger.info(f"Planned {added} tasks for {self.job}, up to #{latest[0].id}.")
+        return added
+
+    def pages(self, worker: str | None = None, lease_seconds: float = 300.0) -> Generator[DanbooruResults, None, None]:
+        """
+        Lease tasks until the queue is drained, yielding the pages of each range.
+
+        A page is checkpointed once the caller asks for the next one, so a crash re-delivers at most the page in hand.
+        """
+        worker = worker or default_worker_name()
+        while task := self.queue.lease(self.job, worker, lease_seconds):
+            logger.trace(f"{worker} leased task {task.id}: ids {task.low}..{task.high}.")
+            try:
+                rows = yield from self._crawl(task, worker, lease_seconds)
+            except Exception as e:  # noqa: BLE001
+                logger.error(f"Task {task.id} of {self.job} failed: {e}")
+                self.queue.fail(task, worker, str(e))
+                continue
+            except BaseException:
+                # the caller stopped iterating, or the worker is being interrupted
+                self.queue.release(task, worker)
+                raise
+            if rows is not None:
+                self.queue.complete(task, worker, rows)
+
+    def _crawl(self, task: CrawlTask, worker: str, lease_seconds: float) -> Generator[DanbooruResults, None, int | None]:
+        rows = task.rows
+        start = task.cursor or f"b{task.high + 1}"
+        for page in self.model.all_pages(page=start, session=self.session, **self._range_params(task)):
+            yield page
+            rows += len(page)
+            if not self.queue.checkpoint(task, worker, f"b{page[-1].id}", rows, lease_seconds):
+                logger.warning(f"{worker} lost the lease on task {task.id}, moving on.")
+                return None
+        return rows
+
+    def _range_params(self, task: CrawlTask) -> dict[str, Any]:
+        """Restrict the search to the ids of a task, so that its last page is short instead of spilling into the next range."""
+        id_range = f"{task.low}..{task.high}"
+        if self.model.generic_endpoint == "posts":
+            return self.params | {"tags": f"{self.params.get('tags') or ''} id:{id_range}".strip()}
+        return self.params | {"id": id_range}
+
+    def progress(self) -> dict[str, int]:
+        """Count the tasks of this crawl by state, plus the rows crawled so far."""
+        return self.queue.progress(self.job)
@@ -1,30 +1,49 @@
 """Base session used throughout the module."""
 
+from __future__ import annotations
 
 import logging
 import os
+import time
 from datetime import timedelta
+from functools import cache, cached_property
+from typing import TYPE_CHECKING
 
 from backoff import constant, expo, on_exception
-from dotenv import load_dotenv
 from pyrate_limiter import Duration, Limiter, Rate
 from requests import Response, Session
-from requests.exceptions import JSONDecodeError, ReadTimeout
-from requests_cache import CachedSession
+from requests.exceptions import JSONDecodeError, Timeout
 
 from danbooru import logger
 from danbooru.__version__ import package_version
+from danbooru.circuit_breaker import CircuitBreaker
+from danbooru.deadline import cap_timeout, check_deadline, enforce_deadline, record_error, time_left
+from danbooru.deadline import deadline as deadline_context
 from danbooru.exceptions import DanbooruRateLimitError, EmptyResponseError, RetriableDanbooruError, raise_http_exception
-from danbooru.model import DanbooruInstancedModel, DanbooruModel, DanbooruModelType
+from danbooru.instrumentation import Hooks, MetricsCollector
+from danbooru.model import DanbooruInstancedModel, DanbooruModel, DanbooruModelType, split_only
+from danbooru.paging import give_up_on_timeout
 from danbooru.report_model import DanbooruReportModel
+from danbooru.results import DanbooruResults
+from danbooru.scheduler import Priority, RequestScheduler, request_priority
 
-load_dotenv()
+if TYPE_CHECKING:
+    from collections.abc import Hashable
+    from contextlib import AbstractContextManager
+
+    from requests_cache import CachedSession
+
+    from danbooru.http2 import HTTP2Adapter
 
 logging.getLogger("backoff").addHandler(logging.StreamHandler())
 logging.getLogger("backoff").setLevel(logging.ERROR)
 
 request_rate = Rate(1, Duration.SECOND)
 request_limiter = Limiter(request_rate, max_delay=10_000)
+request_scheduler = RequestScheduler(request_limiter)
+
+DEFAULT_TIMEOUT = (10.0, 60.0)
+"""Default (connect, read) timeouts of each request, in seconds."""
 
 
 def backoff_handler(details: dict) -> None:
@@ -32,90 +51,228 @@ def backoff_handler(details: dict) -> None:
     logger.error("Backing off {wait:0.1f} seconds after {tries} tries "
                  "calling function {target} with args {args} and kwargs "
                  "{kwargs}".format(**details))
+    record_error(details.get("exception"))
+
+    session = details["args"][0]
+    session.hooks.emit("retry",
+                       target=details["target"].__name__,
+                       tries=details["tries"],
+                       wait=details.get("wait"),
+                       exception=details.get("exception"))
+
+
+@cache
+def load_environment() -> None:
+    """Load the `.env` file into the environment. Deferred to the first session so that importing the package stays cheap."""
+    from dotenv import load_dotenv
+    load_dotenv()
 
 
 class Danbooru:
     def __init__(self,
-                 base_url: str = os.getenv("DANBOORU_BASE_URL", "https://testbooru.donmai.us"),
-                 danbooru_username: str | None = os.getenv("DANBOORU_USERNAME"),
-                 danbooru_api_key: str | None = os.getenv("DANBOORU_API_KEY"),
+                 base_url: str | None = None,
+                 danbooru_username: str | None = None,
+                 danbooru_api_key: str | None = None,
+                 limiter: Limiter | None = None,
+                 circuit_breaker: CircuitBreaker | None = None,
+                 http2: bool = False,
+                 timeout: float | tuple[float, float] | None = DEFAULT_TIMEOUT,
                  ) -> None:
-        """Initialize a Danbooru session with base URL and optional authentication."""
+        """
+        Initialize a Danbooru session with base URL and optional authentication.
+
+        Missing arguments are read from the `DANBOORU_BASE_URL`, `DANBOORU_USERNAME` and `DANBOORU_API_KEY` environment variables.
+        All sessions share the module-level `request_limiter` and its scheduler unless a different `limiter` is passed.
+        Each session gets its own `circuit_breaker`, which stops hammering the site during outages.
+        With `http2=True`, requests are multiplexed over a single HTTP/2 connection (requires `danbooru[http2]`).
+        `timeout` is the default (connect, read) timeout of each request, or a single value for both; `None` waits forever.
+        """
+        load_environment()
+        base_url = base_url or os.getenv("DANBOORU_BASE_URL", "https://testbooru.donmai.us")
+        danbooru_username = danbooru_username or os.getenv("DANBOORU_USERNAME")
+        danbooru_api_key = danbooru_api_key or os.getenv("DANBOORU_API_KEY")
+
         self.logger = logger
+        self.scheduler = RequestScheduler(limiter) if limiter else request_scheduler
+        self.timeout = timeout
 
         self.base_url = base_url.strip("/")
         self.logger.trace(f"Setting base url: {base_url}")
 
-        self._session = Session()
-        self._cache_session = CachedSession(
-            allowable_codes=range(200, 300),
-            allowable_methods=["GET", "HEAD"],
-            expire_after=timedelta(hours=1),
-        )
+        self.hooks = Hooks()
+        self.metrics = MetricsCollector()
+        self.metrics.attach(self.hooks)
+
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.circuit_breaker.on_state_change = lambda previous, state: self.hooks.emit("circuit_state", previous=previous, state=state)
+
+        self._transport: HTTP2Adapter | None = None
+        if http2:
+            from danbooru.http2 import HTTP2Adapter
+            self._transport = HTTP2Adapter()
+
+        self._session = self._new_session(Session)
+        self._auth: tuple[str, str] | None = None
 
         if danbooru_username and danbooru_api_key:
             self.logger.trace(f"Setting username: {danbooru_username}")
-            self._session.auth = (danbooru_username, danbooru_api_key)
-            self._cache_session.auth = (danbooru_username, danbooru_api_key)
+            self._auth = (danbooru_username, danbooru_api_key)
+            self._session.auth = self._auth
         else:
             self.logger.trace("No username was configured. All requests will be anonymous.")
 
-        headers = {
+        self._headers = {
             "User-Agent": f"DanbooruTools/{package_version} <username='{danbooru_username or ""}'>",
             "Accept": "application/json",
         }
-        self.logger.trace(f"Setting User Agent: {headers["User-Agent"]}.")
-        self._session.headers = headers
-        self._cache_session.headers = headers
+        self.logger.trace(f"Setting User Agent: {self._headers["User-Agent"]}.")
+        self._session.headers = self._headers
+
+    @property
+    def limiter(self) -> Limiter:
+        """The rate limiter behind this session's request scheduler."""
+        return self.scheduler.limiter
+
+    @limiter.setter
+    def limiter(self, limiter: Limiter) -> None:
+        self.scheduler = RequestScheduler(limiter)
+
+    def priority(self, priority: Priority, flow: Hashable = None) -> AbstractContextManager[None]:
+        """
+        Schedule the requests made inside the block with a priority class, ahead of or behind other callers.
+
+        `flow` names a fairness group: within a priority class, different flows are served in turn.
+        """
+        return request_priority(priority, flow)
+
+    @cached_property
+    def _cache_session(self) -> CachedSession:
+        """The cached session, built on first use to keep `requests_cache` and its backend off the import path."""
+        from requests_cache import CachedSession
+
+        cache_session = self._new_session(CachedSession,
+                                          allowable_codes=range(200, 300),
+                                          allowable_methods=["GET", "HEAD"],
+                                          expire_after=timedelta(hours=1))
+        cache_session.auth = self._auth
+        cache_session.headers = self._headers
+        return cache_session
+
+    def _new_session[S: Session](self, session_class: type[S], **kwargs) -> S:
+        """Build an underlying `requests` session, mounted on the HTTP/2 transport if enabled."""
+        session = session_class(**kwargs)
+        if self._transport:
+            session.mount("https://", self._transport)
+            session.mount("http://", self._transport)
+        return session
 
     def danbooru_request(self,
                          method: str,
                          endpoint: str,
                          cache: bool = False,
+                         timeout: float | tuple[float, float] | None = None,
+                         deadline: float | None = None,
                          **kwargs,
                          ) -> list[DanbooruModelType] | list[DanbooruModel] | DanbooruModelType:
         """
         Send a request to the Danbooru api. The **kwargs are automatically parsed to be compatible with Rails parameters.
 
         For example, `danbooru_request("GET", "comments", id=1)` automatically converts the query params to ?search[id]=1.`
+        `timeout` overrides the session's timeouts for this call. `deadline` bounds the whole call, retries and rate-limit
+        waits included, to that many seconds, after which `DeadlineExceededError` is raised.
         """
         endpoint = endpoint.strip("/").removesuffix(".json")
         if method == "GET":
-            kwargs["only"] = self._get_include(endpoint=endpoint, include=kwargs.pop("include", []), only=kwargs.pop("only", ""))
-            kwargs = self._kwargs_to_rails_params(endpoint=endpoint, **kwargs)
-            kwargs = {"params": kwargs}
+            kwargs = {"params": self._get_params(endpoint, **kwargs)}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
 
-        response = self._do_request(method, endpoint, cache, **kwargs)
+        with deadline_context(deadline):
+            response = self._do_request(method, endpoint, cache, **kwargs)
         return self._parse_response(response, endpoint)
 
-    @on_exception(expo, (ReadTimeout, RetriableDanbooruError), max_tries=5, jitter=None, on_backoff=backoff_handler)
-    @on_exception(constant, (DanbooruRateLimitError), max_tries=5, jitter=None, interval=60, on_backoff=backoff_handler)
+    def _get_params(self, endpoint: str, **kwargs) -> dict:
+        """Build the query params of a GET request from model-level kwargs."""
+        kwargs["only"] = self._get_include(endpoint=endpoint, include=kwargs.pop("include", []), only=kwargs.pop("only", ""))
+        return self._kwargs_to_rails_params(endpoint=endpoint, **kwargs)
+
+    @enforce_deadline
+    @on_exception(expo, (Timeout, RetriableDanbooruError), max_tries=5, max_time=time_left, jitter=None, giveup=give_up_on_timeout,
+                  on_backoff=backoff_handler)
+    @on_exception(constant, (DanbooruRateLimitError), max_tries=5, max_time=time_left, jitter=None, interval=60, on_backoff=backoff_handler)
     def _do_request(self, method: str, endpoint: str, cache: bool, **kwargs) -> Response:
+        check_deadline()
+        kwargs["timeout"] = cap_timeout(kwargs.get("timeout", self.timeout))
 
         if  endpoint.startswith("http"):  # noqa: SIM108
             endpoint_url = endpoint
         else:
             endpoint_url = f"{self.base_url}/{endpoint}".strip("/")
 
-        if cache:
-            response = self._cache_session.request(method, endpoint_url, only_if_cached=True, **kwargs)
+        self.hooks.emit("request_start", method=method, endpoint=endpoint)
+        started_at = time.perf_counter()
 
-        if not cache or (cache and response.status_code == 504):
-            request_limiter.try_acquire("request")
+        try:
             if cache:
-                response = self._cache_session.request(method, endpoint_url, **kwargs)
+                response = self._cache_session.request(method, endpoint_url, only_if_cached=True, **kwargs)
+
+            if not cache or (cache and response.status_code == 504):
+                if cache:
+                    self.hooks.emit("cache_miss", method=method, endpoint=endpoint)
+
+                self.circuit_breaker.before_request()
+                try:
+                    wait_started_at = time.perf_counter()
+                    self.scheduler.acquire()
+                    self.hooks.emit("rate_limit_wait", method=method, endpoint=endpoint, duration=time.perf_counter() - wait_started_at)
+                    check_deadline()
+                    kwargs["timeout"] = cap_timeout(kwargs["timeout"])
+
+                    if cache:
+                        response = self._cache_session.request(method, endpoint_url, **kwargs)
+                    else:
+                        response = self._session.request(method, endpoint_url, **kwargs)
+                except BaseException as e:
+                    self.circuit_breaker.record_failure(e)
+                    raise
+                self.logger.trace(f"Performed {method} request for {response.request.url}")
+                sent = True
             else:
-                response = self._session.request(method, endpoint_url, **kwargs)
-            self.logger.trace(f"Performed {method} request for {response.request.url}")
-        else:
-            self.logger.trace(f"Retrieved cached {method} request for {response.request.url}")
+                self.hooks.emit("cache_hit", method=method, endpoint=endpoint)
+                self.logger.trace(f"Retrieved cached {method} request for {response.request.url}")
+                sent = False
+        except BaseException:
+            self.hooks.emit("request_end",
+                            method=method,
+                            endpoint=endpoint,
+                            status_code=None,
+                            duration=time.perf_counter() - started_at,
+                            cached=False,
+                            error=True)
+            raise
+
+        self.hooks.emit("request_end",
+                        method=method,
+                        endpoint=endpoint,
+                        status_code=response.status_code,
+                        duration=time.perf_counter() - started_at,
+                        cached=getattr(response, "from_cache", False),
+                        error=not response.ok)
 
-        if not response.ok:
-            raise_http_exception(response)
+        try:
+            if not response.ok:
+                raise_http_exception(response)
+        except BaseException as e:
+            if sent:
+                self.circuit_breaker.record_failure(e)
+            raise
+        if sent:
+            self.circuit_breaker.record_success()
 
         return response
 
     def _parse_response(self, response: Response, endpoint: str) -> list[DanbooruModelType] | list[DanbooruModel] | DanbooruModelType:
+        started_at = time.perf_counter()
         try:
             data = response.json()
         except JSONDecodeError as e:
@@ -125,35 +282,46 @@ class Danbooru:
                                          error_message="The response was successful but nothing was returned.") from e
             raise NotImplementedError(response.content) from e
 
-        model = DanbooruModel.model_for_endpoint(endpoint)
+        model = DanbooruModel.model_for_endpoint(endpoint).projected(response.request.url)
         if not issubclass(model, (DanbooruInstancedModel, DanbooruReportModel)) or response.request.method != "GET":
             if not isinstance(data, dict):
                 msg = f"API returned unexpected type: {type(data)} => {data}"
                 raise TypeError(msg, model)
 
-            return model(**data, session=self, response=response)
+            parsed = model(**data, session=self, response=response)
+            self.hooks.emit("parse", endpoint=endpoint, duration=time.perf_counter() - started_at, rows=1)
+            return parsed
         else:
             if not isinstance(data, list):
                 msg = f"API returned unexpected type: {type(data)} => {data}"
                 raise TypeError(msg, model)
 
-            return [model(**obj, session=self, response=response) for obj in data]
+            parsed = DanbooruResults(model(**obj, session=self, response=response) for obj in data)
+            self.hooks.emit("parse", endpoint=endpoint, duration=time.perf_counter() - started_at, rows=len(parsed))
+            return parsed
 
-    def _get_include(self, endpoint: str, include: list[str] | str | None = None, only: list[str] | str | None = None) -> str | None:
-        if only:
-            err = "Usage of only= is not supported. Use include= instead to include extra fields."
-            raise ValueError(err)
-
-        if not include:
-            return None
+    def _get_include(self,
+                     endpoint: str,
+                     include: list[str] | str | None = None,
+                     only: list[str] | str | bool | None = None,
+                     ) -> str | None:
+        """
+        Build the `only=` param of a request.
 
+        `include` adds fields, usually relations, to the model's required ones. `only` projects the objects to the
+        listed fields instead, or with `only=True` to just the required fields, which shrinks large payloads.
+        """
         if isinstance(include, str):
             include = include.split(",")
+        if isinstance(only, str):
+            only = split_only(only)
 
-        model = DanbooruModel.model_for_endpoint(endpoint)
-        include = model.default_includes() + (include or [])
+        if not include and not only:
+            return None
 
-        include_str = ",".join(dict.fromkeys(include))
+        model = DanbooruModel.model_for_endpoint(endpoint)
+        fields = model.default_includes() if only is True or not only else only
+        include_str = ",".join(dict.fromkeys([*fields, *(include or [])]))
         return include_str
 
     @classmethod
@@ -0,0 +1,101 @@
+"""
+End-to-end deadlines: one time budget for every attempt, backoff sleep and rate-limit wait of a call.
+
+    posts = DanbooruPost.get_all(tags="kantai_collection", deadline=60)
+
+    with deadline(5):
+        post = DanbooruPost.get_by_id(1234)
+        comments = DanbooruComment.get(post_id=1234)
+
+When the budget is spent, the call raises `DeadlineExceededError` with the last error it ran into. Socket
+timeouts are shortened so that no single read outlives the deadline, and nested deadlines never extend an
+outer one.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import TYPE_CHECKING
+
+from danbooru.exceptions import DeadlineExceededError
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator
+
+Timeout = float | tuple[float | None, float | None] | None
+
+_deadline_at: ContextVar[float | None] = ContextVar("_deadline_at", default=None)
+_last_error: ContextVar[BaseException | None] = ContextVar("_last_error", default=None)
+
+
+@contextmanager
+def deadline(seconds: float | None) -> Generator[None, None, None]:
+    """Bound the requests made inside the block to `seconds` in total. With `None`, keep the current deadline, if any."""
+    with deadline_at(None if seconds is None else time.monotonic() + seconds):
+        yield
+
+
+@contextmanager
+def deadline_at(at: float | None) -> Generator[None, None, None]:
+    """Like `deadline`, with an absolute `time.monotonic()` time."""
+    current = _deadline_at.get()
+    if at is None or (current is not None and current <= at):
+        yield
+        return
+
+    token = _deadline_at.set(at)
+    error_token = _last_error.set(None)
+    try:
+        yield
+    finally:
+        _last_error.reset(error_token)
+        _deadline_at.reset(token)
+
+
+def time_left() -> float | None:
+    """Seconds until the current deadline, or None without one. Also used as the `max_time` of the retry decorators."""
+    at = _deadline_at.get()
+    return None if at is None else at - time.monotonic()
+
+
+def record_error(error: BaseException | None) -> None:
+    """Remember an error that is about to be retried, to report it if the deadline passes during the backoff."""
+    if _deadline_at.get() is not None:
+        _last_error.set(error)
+
+
+def check_deadline(last_error: BaseException | None = None) -> None:
+    """Raise `DeadlineExceededError` if the current deadline has passed."""
+    left = time_left()
+    if left is not None and left <= 0:
+        raise DeadlineExceededError(last_error or _last_error.get())
+
+
+def cap_timeout(timeout: Timeout) -> Timeout:
+    """Shorten a `requests` (connect, read) timeout so that a request doesn't wait past the current deadline."""
+    left = time_left()
+    if left is None:
+        return timeout
+
+    left = max(left, 0.001)
+    connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+    return (left if connect is None else min(connect, left), left if read is None else min(read, left))
+
+
+def enforce_deadline[**P, R](function: Callable[P, R]) -> Callable[P, R]:
+    """Report the errors raised once the deadline has passed, such as the last retried timeout, as `DeadlineExceededError`."""
+    @wraps(function)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        try:
+            return function(*args, **kwargs)
+        except DeadlineExceededError:
+            raise
+        except Exception as e:
+            left = time_left()
+            if left is not None and left <= 0:
+                raise DeadlineExceededError(e) from e
+            raise
+    return wrapper
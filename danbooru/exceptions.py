@@ -1,10 +1,17 @@
 """Defines common exceptions."""
 
-import requests
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import requests
 
 
 def raise_http_exception(response: requests.Response) -> None:
     """Raise the appropriate exception for a bad request."""
+    import requests
+
     try:
         json_response = response.json()
     except requests.exceptions.JSONDecodeError:
@@ -88,3 +95,32 @@ class DanbooruRateLimitError(RetriableDanbooruError):
 
 class CloudflareError(RetriableDanbooruError):
     """Generic Cloudflare error."""
+
+
+class ReplayMissError(Exception):
+    def __init__(self, key: str):
+        """Raise an exception when a replayed session sends a request that was never recorded."""
+        super().__init__(f"No recorded response for request: {key}")
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, retry_after: float, last_error: BaseException | None = None):
+        """Raise an exception when the session's circuit breaker is open and not blocking callers."""
+        self.retry_after = retry_after
+        self.last_error = last_error
+        super().__init__(f"The circuit breaker is open after repeated outage errors. Retry in {retry_after:.0f} seconds. "
+                         f"Last error: {last_error!r}")
+
+
+class DeadlineExceededError(TimeoutError):
+    def __init__(self, last_error: BaseException | None = None):
+        """Raise an exception when a call runs out of its `deadline`, retries and rate-limit waits included."""
+        self.last_error = last_error
+        super().__init__(f"The deadline ran out before the request could complete. Last error: {last_error!r}")
+
+
+class ExportMismatchError(ValueError):
+    def __init__(self, output: object):
+        """Raise an exception when an export directory holds a checkpoint written with different arguments."""
+        self.output = output
+        super().__init__(f"{output} holds an export with different arguments. Use another directory.")
@@ -0,0 +1,245 @@
+"""
+Streaming exports of whole searches to rotating NDJSON.gz or Parquet files.
+
+    Exporter(DanbooruPost, "dump/", params={"tags": "kantai_collection"}).run()
+
+Pages are written as they arrive, so memory stays flat however many rows there are. Each finished file is
+renamed into place and recorded in `checkpoint.json` with the cursor of its last row; an interrupted export
+started again with the same arguments resumes after the last finished file.
+"""
+
+from __future__ import annotations
+
+import datetime
+import gzip
+import json
+import time
+import types
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Literal, Protocol, Union, get_args, get_origin
+
+from danbooru import logger
+from danbooru.exceptions import ExportMismatchError
+from danbooru.model import get_default_session
+from danbooru.results import _SKIPPED_KEYS, raw_data
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    import pyarrow as pa
+
+    from danbooru.danbooru import Danbooru
+    from danbooru.model import DanbooruInstancedModel, DanbooruModel
+
+Format = Literal["ndjson", "parquet"]
+
+CHECKPOINT_NAME = "checkpoint.json"
+
+
+def _require_pyarrow():  # noqa: ANN202
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        e.add_note(">[danbooru-api]: Parquet exports require pyarrow. Install with `pip install danbooru[parquet]`.")
+        raise
+    return pa, pq
+
+
+def export_row(model: DanbooruModel) -> dict[str, Any]:
+    """The api data of a model, as written to the export files."""
+    return {key: value for key, value in raw_data(model).items() if key not in _SKIPPED_KEYS}
+
+
+def _arrow_type(pa, annotation: Any) -> pa.DataType | None:  # noqa: ANN001
+    """The Arrow type of a model field, or None if it should be inferred. Timestamps stay the api's strings."""
+    origin, args = get_origin(annotation), get_args(annotation)
+    if origin in (Union, types.UnionType):
+        members = [arg for arg in args if arg is not type(None)]
+        return _arrow_type(pa, members[0]) if len(members) == 1 else None
+    if origin is Literal:
+        return _arrow_type(pa, type(args[0]))
+    if origin is list:
+        item_type = _arrow_type(pa, args[0]) if args else None
+        return pa.list_(item_type) if item_type else None
+    scalar_types = {bool: pa.bool_(), int: pa.int64(), float: pa.float64(), str: pa.string(),
+                    datetime.datetime: pa.string(), datetime.date: pa.string()}
+    return scalar_types.get(annotation)
+
+
+def _conventional_type(pa, column: str) -> pa.DataType:  # noqa: ANN001
+    """The Arrow type of a column by Danbooru's naming conventions, for columns that are null wherever they were seen."""
+    if column == "id" or column.endswith(("_id", "_count", "_score")):
+        return pa.int64()
+    if column.startswith(("is_", "has_")):
+        return pa.bool_()
+    return pa.string()
+
+
+def parquet_schema(model: type[DanbooruModel], rows: list[dict[str, Any]]) -> pa.Schema:
+    """
+    The schema of a Parquet export, for the columns of `rows`.
+
+    Columns take the type of the model field they match, else the type inferred from `rows`. Columns that are null
+    in every row, such as `approver_id` on a page of unapproved posts, get their type from their name instead of
+    Arrow's `null` type, which would reject the values of later pages.
+    """
+    pa, _ = _require_pyarrow()
+    fields = []
+    for column in pa.Table.from_pylist(rows).schema:
+        declared = model.model_fields.get(column.name)
+        data_type = _arrow_type(pa, declared.annotation) if declared else None
+        if data_type is None:
+            data_type = _conventional_type(pa, column.name) if pa.types.is_null(column.type) else column.type
+        fields.append(pa.field(column.name, data_type))
+    return pa.schema(fields)
+
+
+class _PartWriter(Protocol):
+    def write(self, rows: list[dict[str, Any]]) -> None: ...
+    def close(self) -> None: ...
+
+
+class _NDJSONWriter:
+    def __init__(self, path: Path):
+        self._file = gzip.open(path, "wt", encoding="utf-8")  # noqa: SIM115
+
+    def write(self, rows: list[dict[str, Any]]) -> None:
+        self._file.writelines(json.dumps(row, separators=(",", ":"), default=str) + "\n" for row in rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path: Path, schema: Callable[[list[dict[str, Any]]], pa.Schema]):
+        """Write a part with the schema of the export, which `schema` settles from the first rows written."""
+        self.path = path
+        self.schema = schema
+        self._writer = None
+
+    def write(self, rows: list[dict[str, Any]]) -> None:
+        pa, pq = _require_pyarrow()
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, self.schema(rows), compression="zstd")
+        self._writer.write_table(pa.Table.from_pylist(rows, schema=self._writer.schema))
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+class Exporter:
+    def __init__(self,
+                 model: type[DanbooruInstancedModel],
+                 output: str | Path,
+                 params: dict[str, Any] | None = None,
+                 file_format: Format = "ndjson",
+                 rows_per_file: int = 100_000,
+                 session: Danbooru | None = None,
+                 ):
+        """Export every row of a search on `model`, filtered by `params`, to numbered files in the `output` directory."""
+        self.model = model
+        self.output = Path(output)
+        self.params = params or {}
+        self.file_format = file_format
+        self.rows_per_file = rows_per_file
+        self.session = session or get_default_session()
+
+        self.extension = "ndjson.gz" if file_format == "ndjson" else "parquet"
+        self.resumable = model._paginates_by_id(self.params)  # noqa: SLF001
+        self._schema: pa.Schema | None = None
+
+    @property
+    def checkpoint_path(self) -> Path:
+        """Where the progress of the export is saved."""
+        return self.output / CHECKPOINT_NAME
+
+    def _load_checkpoint(self) -> dict[str, Any]:
+        identity = {"endpoint": self.model.generic_endpoint, "params": self.params, "format": self.file_format}
+        blank = {**identity, "cursor": None, "files": 0, "rows": 0, "done": False}
+        if not self.checkpoint_path.exists():
+            return blank
+
+        checkpoint = json.loads(self.checkpoint_path.read_text())
+        if {key: checkpoint.get(key) for key in identity} != identity:
+            raise ExportMismatchError(self.output)
+        if not self.resumable and checkpoint["files"]:
+            logger.warning("This search is not in id order and can't be resumed; starting over.")
+            return blank
+        return checkpoint
+
+    def _save_checkpoint(self, checkpoint: dict[str, Any]) -> None:
+        temporary = self.checkpoint_path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(checkpoint, indent=2, default=str))
+        temporary.replace(self.checkpoint_path)
+
+    def _open_part(self, number: int) -> tuple[_PartWriter, Path]:
+        path = self.output / f"part-{number:05d}.{self.extension}"
+        temporary = path.with_name(path.name + ".tmp")
+        writer = _NDJSONWriter(temporary) if self.file_format == "ndjson" else _ParquetWriter(temporary, self._parquet_schema)
+        return writer, path
+
+    def _parquet_schema(self, rows: list[dict[str, Any]]) -> pa.Schema:
+        # settled once, so that every part of the export has the same columns and types
+        if self._schema is None:
+            self._schema = parquet_schema(self.model, rows)
+        return self._schema
+
+    def run(self) -> dict[str, Any]:
+        """Run or resume the export, returning the final checkpoint."""
+        self.output.mkdir(parents=True, exist_ok=True)
+        checkpoint = self._load_checkpoint()
+        if checkpoint["done"]:
+            logger.info(f"The export in {self.output} is already complete: {checkpoint['rows']} rows.")
+            return checkpoint
+        if checkpoint["cursor"]:
+            logger.info(f"Resuming after {checkpoint['files']} files and {checkpoint['rows']} rows, from page {checkpoint['cursor']}.")
+
+        started_at = time.perf_counter()
+        exported = 0
+        writer, path = self._open_part(checkpoint["files"])
+        in_part = 0
+
+        page = checkpoint["cursor"] or 1
+        for results in self.model.all_pages(page=page, session=self.session, **self.params):
+            rows = [export_row(model) for model in results]
+            while rows:
+                taken, rows = rows[:self.rows_per_file - in_part], rows[self.rows_per_file - in_part:]
+                writer.write(taken)
+                in_part += len(taken)
+                exported += len(taken)
+
+                if in_part == self.rows_per_file:
+                    checkpoint = self._finish_part(writer, path, checkpoint, in_part, taken[-1])
+                    writer, path = self._open_part(checkpoint["files"])
+                    in_part = 0
+
+            elapsed = time.perf_counter() - started_at
+            logger.info(f"Exported {checkpoint['rows'] + in_part} {self.model.generic_endpoint} "
+                        f"({exported / elapsed:,.0f} rows/s this run).")
+
+        if in_part:
+            checkpoint = self._finish_part(writer, path, checkpoint, in_part, None)
+        else:
+            writer.close()
+            path.with_name(path.name + ".tmp").unlink(missing_ok=True)
+
+        checkpoint["done"] = True
+        self._save_checkpoint(checkpoint)
+
+        elapsed = time.perf_counter() - started_at
+        logger.info(f"Export complete: {checkpoint['rows']} rows in {checkpoint['files']} files, "
+                    f"{exported} this run in {elapsed:.1f}s ({exported / max(elapsed, 1e-9):,.0f} rows/s).")
+        return checkpoint
+
+    def _finish_part(self, writer: _PartWriter, path: Path, checkpoint: dict[str, Any], rows: int, last_row: dict | None) -> dict[str, Any]:
+        writer.close()
+        path.with_name(path.name + ".tmp").replace(path)
+
+        checkpoint = {**checkpoint, "files": checkpoint["files"] + 1, "rows": checkpoint["rows"] + rows}
+        if self.resumable and last_row is not None:
+            checkpoint["cursor"] = f"b{last_row['id']}"
+        self._save_checkpoint(checkpoint)
+        logger.trace(f"Wrote {path.name} with {rows} rows.")
+        return checkpoint
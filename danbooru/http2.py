@@ -0,0 +1,121 @@
+"""
+An HTTP/2 transport for sessions, backed by `httpx`.
+
+The adapter plugs into the `requests` sessions behind `Danbooru`, so caching, rate limiting, retries and
+`raise_http_exception` work unchanged, while every request travels over a single multiplexed connection
+instead of one TCP+TLS connection per concurrent worker.
+
+    session = Danbooru(http2=True)
+"""
+
+from __future__ import annotations
+
+import io
+from http.client import HTTPMessage
+from typing import TYPE_CHECKING
+
+from requests import Response
+from requests.adapters import BaseAdapter
+from requests.cookies import extract_cookies_to_jar
+from requests.exceptions import ConnectionError, ConnectTimeout, ReadTimeout  # noqa: A004
+from requests.structures import CaseInsensitiveDict
+from urllib3 import HTTPResponse
+
+if TYPE_CHECKING:
+    import httpx
+    from requests import PreparedRequest
+
+_DROPPED_HEADERS = frozenset(("content-encoding", "content-length", "transfer-encoding"))
+"""Headers describing the wire encoding, which no longer apply to the body httpx already decoded."""
+
+
+def _require_httpx():  # noqa: ANN202
+    try:
+        import httpx
+    except ImportError as e:
+        e.add_note(">[danbooru-api]: The HTTP/2 transport requires httpx. Install with `pip install danbooru[http2]`.")
+        raise
+    return httpx
+
+
+class _OriginalResponse:
+    def __init__(self, headers: httpx.Headers, method: str):
+        """Stand in for the `http.client.HTTPResponse` urllib3 wraps, which is where `requests` reads `Set-Cookie` from."""
+        self.msg = HTTPMessage()
+        for name, value in headers.multi_items():
+            self.msg[name] = value
+        self._method = method
+
+    def isclosed(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        """The body was read by httpx already."""
+
+
+class HTTP2Adapter(BaseAdapter):
+    def __init__(self, client: httpx.Client | None = None, max_connections: int = 10):
+        """Send requests through an HTTP/2 `httpx.Client`, shared by every session the adapter is mounted on."""
+        super().__init__()
+        httpx = _require_httpx()
+        self.client = client or httpx.Client(http2=True, limits=httpx.Limits(max_connections=max_connections))
+
+    def send(self,
+             request: PreparedRequest,
+             stream: bool = False,  # noqa: ARG002
+             timeout: float | tuple[float, float] | None = None,
+             verify: bool | str = True,  # noqa: ARG002
+             cert: str | tuple[str, str] | None = None,  # noqa: ARG002
+             proxies: dict[str, str] | None = None,  # noqa: ARG002
+             ) -> Response:
+        """Send the request and convert the reply into a `requests.Response`. TLS and proxy settings are the client's."""
+        httpx = _require_httpx()
+
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            timeout = httpx.Timeout(read, connect=connect)
+
+        try:
+            reply = self.client.request(request.method or "GET",
+                                        request.url or "",
+                                        headers=dict(request.headers),
+                                        content=request.body,
+                                        timeout=timeout)
+        except httpx.ConnectTimeout as e:
+            raise ConnectTimeout(e, request=request) from e
+        except httpx.TimeoutException as e:
+            raise ReadTimeout(e, request=request) from e
+        except httpx.TransportError as e:
+            raise ConnectionError(e, request=request) from e
+
+        return self.build_response(request, reply)
+
+    def build_response(self, request: PreparedRequest, reply: httpx.Response) -> Response:
+        """Build a `requests.Response`, with a `raw` body that `requests_cache` can copy into the cache."""
+        content = reply.content
+        headers = CaseInsensitiveDict((name, value) for name, value in reply.headers.multi_items() if name not in _DROPPED_HEADERS)
+        headers["Content-Length"] = str(len(content))
+
+        response = Response()
+        response.status_code = reply.status_code
+        response.reason = reply.reason_phrase
+        response.headers = headers
+        response.raw = HTTPResponse(body=io.BytesIO(content),
+                                    headers=dict(headers),
+                                    status=reply.status_code,
+                                    reason=reply.reason_phrase,
+                                    preload_content=False,
+                                    decode_content=False,
+                                    original_response=_OriginalResponse(reply.headers, request.method or "GET"),
+                                    request_url=request.url)
+        response._content = content  # noqa: SLF001
+        response.encoding = reply.encoding
+        response.url = str(reply.url)
+        response.request = request
+        response.connection = self
+        extract_cookies_to_jar(response.cookies, request, response.raw)
+        return response
+
+    def close(self) -> None:
+        """Close the client and its connections."""
+        self.client.close()
@@ -0,0 +1,132 @@
+"""Batch resolution of post id lists, such as pool and favorite group members, into posts."""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future
+from itertools import batched
+from typing import TYPE_CHECKING
+
+from danbooru import logger
+from danbooru.model import get_default_session
+from danbooru.utils import ContextThreadPoolExecutor
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Iterable, Mapping
+
+    from danbooru.danbooru import Danbooru
+    from danbooru.models.post import DanbooruPost
+
+POST_CHUNK_SIZE = 200
+"""Maximum number of ids per `id:` search, matching the `/posts` page limit."""
+
+
+def _fetch_chunk(chunk: tuple[int, ...], session: Danbooru) -> list[DanbooruPost]:
+    from danbooru.models.post import DanbooruPost
+
+    tags = f"id:{','.join(map(str, chunk))} status:any"
+    return DanbooruPost.get(tags=tags, limit=POST_CHUNK_SIZE, session=session)
+
+
+def _missing_ids(post_ids: Iterable[int], known: Mapping[int, DanbooruPost]) -> list[int]:
+    return [post_id for post_id in dict.fromkeys(post_ids) if post_id not in known]
+
+
+def _iter_chunks(post_ids: Iterable[int],
+                 session: Danbooru | None,
+                 known: Mapping[int, DanbooruPost],
+                 max_workers: int,
+                 ) -> Generator[tuple[tuple[int, ...], dict[int, DanbooruPost]], None, None]:
+    session = session or get_default_session()
+    missing = _missing_ids(post_ids, known)
+    if not missing:
+        return
+
+    logger.trace(f"Fetching {len(missing)} posts in chunks of {POST_CHUNK_SIZE}.")
+    with ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending: deque[tuple[tuple[int, ...], Future[list[DanbooruPost]]]] = deque()
+        for chunk in batched(missing, POST_CHUNK_SIZE):
+            pending.append((chunk, executor.submit(_fetch_chunk, chunk, session)))
+            if len(pending) >= max_workers:
+                chunk_ids, future = pending.popleft()
+                yield chunk_ids, {post.id: post for post in future.result()}
+        while pending:
+            chunk_ids, future = pending.popleft()
+            yield chunk_ids, {post.id: post for post in future.result()}
+
+
+def iter_post_chunks(post_ids: Iterable[int],
+                     session: Danbooru | None = None,
+                     known: Mapping[int, DanbooruPost] | None = None,
+                     max_workers: int = 4,
+                     ) -> Generator[dict[int, DanbooruPost], None, None]:
+    """
+    Fetch posts by id in chunks of 200, with up to `max_workers` chunks in flight, yielding `{id: post}` per chunk in order.
+
+    Ids already present in `known` and duplicate ids are skipped. Ids that don't exist are silently missing from the results.
+    """
+    for _, posts in _iter_chunks(post_ids, session, known or {}, max_workers):
+        yield posts
+
+
+def fetch_posts(post_ids: Iterable[int],
+                session: Danbooru | None = None,
+                known: Mapping[int, DanbooruPost] | None = None,
+                max_workers: int = 4,
+                ) -> dict[int, DanbooruPost]:
+    """Fetch many posts by id, returning `{id: post}` for the fetched posts plus any reused from `known`."""
+    post_ids = list(post_ids)
+    known = known or {}
+    posts = {post_id: known[post_id] for post_id in dict.fromkeys(post_ids) if post_id in known}
+    for chunk in iter_post_chunks(post_ids, session=session, known=known, max_workers=max_workers):
+        posts.update(chunk)
+    return posts
+
+
+def hydrate_post_collections(collections: Iterable[PostCollectionMixin],
+                             session: Danbooru | None = None,
+                             known: Mapping[int, DanbooruPost] | None = None,
+                             max_workers: int = 4,
+                             ) -> dict[int, DanbooruPost]:
+    """
+    Fetch the posts of many pools or favorite groups at once, deduplicating ids across them.
+
+    Returns `{id: post}`, which can be passed back as `collection.posts(known=...)` to resolve each collection without requests.
+    """
+    collections = list(collections)
+    if session is None and collections:
+        session = collections[0]._session  # noqa: SLF001
+    all_ids = (post_id for collection in collections for post_id in collection.post_ids)
+    return fetch_posts(all_ids, session=session, known=known, max_workers=max_workers)
+
+
+class PostCollectionMixin:
+    """Adds batch post resolution to models exposing a `post_ids` list."""
+
+    if TYPE_CHECKING:
+        post_ids: list[int]
+        _session: Danbooru
+
+    def posts(self, known: Mapping[int, DanbooruPost] | None = None, max_workers: int = 4) -> list[DanbooruPost]:
+        """Return the member posts in order, fetched in concurrent chunks of 200 and reusing the ones in `known`."""
+        posts = fetch_posts(self.post_ids, session=self._session, known=known, max_workers=max_workers)
+        return [posts[post_id] for post_id in self.post_ids if post_id in posts]
+
+    def iter_posts(self, known: Mapping[int, DanbooruPost] | None = None, max_workers: int = 4) -> Generator[DanbooruPost, None, None]:
+        """Yield the member posts in order as their chunks arrive, reusing the ones in `known`."""
+        known = known or {}
+        chunks = _iter_chunks(self.post_ids, self._session, known, max_workers)
+        requested: set[int] = set()
+        fetched: dict[int, DanbooruPost] = {}
+
+        for post_id in self.post_ids:
+            if post_id in known:
+                yield known[post_id]
+                continue
+            # chunks are requested in member order, so an id is either covered already or by a chunk still to come
+            while post_id not in requested:
+                chunk_ids, posts = next(chunks)
+                requested.update(chunk_ids)
+                fetched.update(posts)
+            if post_id in fetched:
+                yield fetched[post_id]
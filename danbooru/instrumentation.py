@@ -0,0 +1,195 @@
+"""Request lifecycle hooks and an in-memory metrics collector for Danbooru sessions."""
+
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from collections.abc import Callable
+from typing import Any
+
+from danbooru import logger
+
+HookCallback = Callable[..., None]
+
+EVENTS = (
+    "request_start",    # method, endpoint
+    "request_end",      # method, endpoint, status_code, duration, cached, error
+    "cache_hit",        # method, endpoint
+    "cache_miss",       # method, endpoint
+    "rate_limit_wait",  # method, endpoint, duration
+    "retry",            # target, tries, wait, exception
+    "parse",            # endpoint, duration, rows
+    "circuit_state",    # previous, state
+)
+
+
+class Hooks:
+    def __init__(self):
+        """A registry of callbacks for the request lifecycle events listed in `EVENTS`."""
+        self._callbacks: dict[str, list[HookCallback]] = {event: [] for event in EVENTS}
+
+    def register(self, event: str, callback: HookCallback) -> HookCallback:
+        """Register a callback for an event. Callbacks receive the event data as keyword arguments."""
+        if event not in self._callbacks:
+            raise ValueError(f"Unknown event '{event}'. Valid events: {', '.join(EVENTS)}.")
+        self._callbacks[event].append(callback)
+        return callback
+
+    def unregister(self, event: str, callback: HookCallback) -> None:
+        """Remove a previously registered callback."""
+        self._callbacks[event].remove(callback)
+
+    def emit(self, event: str, **data) -> None:
+        """Call every callback registered for an event. A failing callback never breaks the request."""
+        for callback in self._callbacks[event]:
+            try:
+                callback(**data)
+            except Exception as e:  # noqa: BLE001
+                logger.error(f"Hook {callback!r} failed on event '{event}': {e!r}")
+
+
+class _Timing:
+    __slots__ = ("count", "max", "total")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, duration: float) -> None:
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+
+    def as_dict(self) -> dict[str, float]:
+        return {"count": self.count, "total": self.total, "max": self.max}
+
+
+class MetricsCollector:
+    def __init__(self):
+        """Aggregate request counts and timings from session hooks. Thread-safe."""
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all collected metrics."""
+        with self._lock:
+            self.requests: defaultdict[tuple[str, str, int | None], int] = defaultdict(int)
+            self.cache_hits = 0
+            self.cache_misses = 0
+            self.retries: defaultdict[str, int] = defaultdict(int)
+            self.request_time: defaultdict[str, _Timing] = defaultdict(_Timing)
+            self.rate_limit_wait = _Timing()
+            self.parse_time: defaultdict[str, _Timing] = defaultdict(_Timing)
+            self.parsed_rows = 0
+
+    def attach(self, hooks: Hooks) -> None:
+        """Subscribe the collector to a session's hooks."""
+        hooks.register("request_end", self._on_request_end)
+        hooks.register("cache_hit", self._on_cache_hit)
+        hooks.register("cache_miss", self._on_cache_miss)
+        hooks.register("rate_limit_wait", self._on_rate_limit_wait)
+        hooks.register("retry", self._on_retry)
+        hooks.register("parse", self._on_parse)
+
+    def _on_request_end(self, method: str, endpoint: str, status_code: int | None, duration: float, **_) -> None:
+        with self._lock:
+            self.requests[method, _endpoint_label(endpoint), status_code] += 1
+            self.request_time[_endpoint_label(endpoint)].add(duration)
+
+    def _on_cache_hit(self, **_) -> None:
+        with self._lock:
+            self.cache_hits += 1
+
+    def _on_cache_miss(self, **_) -> None:
+        with self._lock:
+            self.cache_misses += 1
+
+    def _on_rate_limit_wait(self, duration: float, **_) -> None:
+        with self._lock:
+            self.rate_limit_wait.add(duration)
+
+    def _on_retry(self, exception: BaseException | None = None, **_) -> None:
+        with self._lock:
+            self.retries[type(exception).__name__ if exception else "unknown"] += 1
+
+    def _on_parse(self, endpoint: str, duration: float, rows: int, **_) -> None:
+        with self._lock:
+            self.parse_time[_endpoint_label(endpoint)].add(duration)
+            self.parsed_rows += rows
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return a copy of the current metrics as plain data."""
+        with self._lock:
+            return {
+                "requests": [{"method": method, "endpoint": endpoint, "status_code": status, "count": count}
+                             for (method, endpoint, status), count in self.requests.items()],
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses,
+                "retries": dict(self.retries),
+                "request_time": {endpoint: timing.as_dict() for endpoint, timing in self.request_time.items()},
+                "rate_limit_wait": self.rate_limit_wait.as_dict(),
+                "parse_time": {endpoint: timing.as_dict() for endpoint, timing in self.parse_time.items()},
+                "parsed_rows": self.parsed_rows,
+            }
+
+    def to_prometheus(self, prefix: str = "danbooru") -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        data = self.snapshot()
+        lines = [f"# TYPE {prefix}_requests_total counter"]
+        # requests that raised before a response, like connection errors, have no status code
+        lines += [f'{prefix}_requests_total{{method="{r["method"]}",endpoint="{r["endpoint"]}",status="{r["status_code"] or "error"}"}} '
+                  f'{r["count"]}' for r in data["requests"]]
+
+        lines += [f"# TYPE {prefix}_cache_hits_total counter", f"{prefix}_cache_hits_total {data["cache_hits"]}"]
+        lines += [f"# TYPE {prefix}_cache_misses_total counter", f"{prefix}_cache_misses_total {data["cache_misses"]}"]
+
+        lines += [f"# TYPE {prefix}_retries_total counter"]
+        lines += [f'{prefix}_retries_total{{error="{error}"}} {count}' for error, count in data["retries"].items()]
+
+        for name, timings in (("request", data["request_time"]), ("parse", data["parse_time"])):
+            lines += [f"# TYPE {prefix}_{name}_seconds summary"]
+            for endpoint, timing in timings.items():
+                lines += [f'{prefix}_{name}_seconds_count{{endpoint="{endpoint}"}} {timing["count"]}',
+                          f'{prefix}_{name}_seconds_sum{{endpoint="{endpoint}"}} {timing["total"]}']
+
+        wait = data["rate_limit_wait"]
+        lines += [f"# TYPE {prefix}_rate_limit_wait_seconds summary",
+                  f"{prefix}_rate_limit_wait_seconds_count {wait["count"]}",
+                  f"{prefix}_rate_limit_wait_seconds_sum {wait["total"]}"]
+
+        lines += [f"# TYPE {prefix}_parsed_rows_total counter", f"{prefix}_parsed_rows_total {data["parsed_rows"]}"]
+        return "\n".join(lines) + "\n"
+
+
+class OpenTelemetryExporter:
+    def __init__(self, meter: Any, prefix: str = "danbooru"):
+        """Forward session hook events to OpenTelemetry instruments created from `meter` (an `opentelemetry.metrics.Meter`)."""
+        self._requests = meter.create_counter(f"{prefix}.requests")
+        self._cache = meter.create_counter(f"{prefix}.cache")
+        self._retries = meter.create_counter(f"{prefix}.retries")
+        self._request_time = meter.create_histogram(f"{prefix}.request.duration", unit="s")
+        self._rate_limit_wait = meter.create_histogram(f"{prefix}.rate_limit.wait", unit="s")
+        self._parse_time = meter.create_histogram(f"{prefix}.parse.duration", unit="s")
+
+    def attach(self, hooks: Hooks) -> None:
+        """Subscribe the exporter to a session's hooks."""
+        hooks.register("request_end", self._on_request_end)
+        hooks.register("cache_hit", lambda **_: self._cache.add(1, {"result": "hit"}))
+        hooks.register("cache_miss", lambda **_: self._cache.add(1, {"result": "miss"}))
+        hooks.register("rate_limit_wait", lambda duration, **_: self._rate_limit_wait.record(duration))
+        hooks.register("retry", lambda exception=None, **_: self._retries.add(1, {"error": type(exception).__name__}))
+        hooks.register("parse", lambda endpoint, duration, **_: self._parse_time.record(duration, {"endpoint": _endpoint_label(endpoint)}))
+
+    def _on_request_end(self, method: str, endpoint: str, status_code: int | None, duration: float, **_) -> None:
+        attributes = {"method": method, "endpoint": _endpoint_label(endpoint), "status_code": status_code or 0}
+        self._requests.add(1, attributes)
+        self._request_time.record(duration, attributes)
+
+
+def _endpoint_label(endpoint: str) -> str:
+    """Collapse instance endpoints like `posts/123` into `posts/:id` to keep label cardinality low."""
+    if endpoint.startswith("http"):
+        endpoint = endpoint.split("/", 3)[-1]
+    endpoint = endpoint.split("?", 1)[0]
+    return "/".join(":id" if part.isdigit() else part for part in endpoint.split("/"))
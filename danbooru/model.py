@@ -7,28 +7,73 @@ from __future__ import annotations
 
 import datetime
 import re
-from contextlib import contextmanager
+import time
+from contextlib import contextmanager, nullcontext
 from contextvars import ContextVar
-from typing import TYPE_CHECKING, Self, TypeVar, overload
+from functools import cache
+from typing import TYPE_CHECKING, Any, Self, TypeVar, overload
 from urllib.parse import parse_qs, urlencode, urlparse
 
 import inflection
+from pydantic import create_model
 
 from danbooru import logger
-from danbooru.exceptions import EmptyResponseError
-from danbooru.utils import BaseModel, classproperty
+from danbooru.exceptions import DanbooruTimeoutError, EmptyResponseError
+from danbooru.results import DanbooruResults
+from danbooru.utils import BaseModel, cached_classproperty, classproperty
 
 if TYPE_CHECKING:
-    from collections.abc import Generator
+    from collections.abc import Generator, Iterable
 
     from pydantic.fields import FieldInfo
     from requests import PreparedRequest, Response
 
     from danbooru.danbooru import Danbooru
+    from danbooru.watch import ChangeFeed
 
 DanbooruModelType = TypeVar("DanbooruModelType", bound="DanbooruModel")
 
 
+_ONLY_SEPARATOR = re.compile(r",(?![^\[]*\])")
+
+
+def split_only(only: str) -> list[str]:
+    """Split an `only=` param into its top-level entries, such as `id` and `uploader[id,name]` in `id,uploader[id,name]`."""
+    return [entry.strip() for entry in _ONLY_SEPARATOR.split(only) if entry.strip()]
+
+
+def parse_only(only: str) -> list[str]:
+    """Return the top-level field names of an `only=` param, such as `id` and `uploader` in `id,uploader[id,name]`."""
+    return [entry.partition("[")[0] for entry in split_only(only)]
+
+
+_partial_bases: dict[type, type] = {}
+_partial_args: dict[type, tuple[type, frozenset[str]]] = {}
+
+
+@cache
+def _partial_model(model: type[DanbooruModelType], missing: frozenset[str]) -> type[DanbooruModelType]:
+    fields: dict[str, Any] = {name: (model.model_fields[name].annotation | None, None) for name in sorted(missing)}
+    partial = create_model(model.__name__, __base__=model, __module__=model.__module__, **fields)
+    _partial_bases[partial] = _partial_bases.get(model, model)
+    _partial_args[partial] = (model, missing)
+    # partial classes can't be found by name, so their instances are pickled as (model, missing fields, state)
+    partial.__reduce__ = _reduce_partial  # type: ignore[method-assign, assignment]
+    return partial
+
+
+def _reduce_partial(self: DanbooruModel) -> tuple:
+    model, missing = _partial_args[type(self)]
+    return _unpickle_partial, (model, missing, self.__getstate__())
+
+
+def _unpickle_partial(model: type[DanbooruModel], missing: frozenset[str], state: dict[str, Any]) -> DanbooruModel:
+    partial = _partial_model(model, missing)
+    instance = partial.__new__(partial)
+    instance.__setstate__(state)
+    return instance
+
+
 class WrongIncludeCallError(Exception):
     def __init__(self, value: str):
         """Raise an exception when an optional parameter was not passed to the query, but it's still accessed in the model."""
@@ -74,6 +119,26 @@ class DanbooruModel(BaseModel):
         """Default includes for the model."""
         return [name for name, field in cls.model_fields.items() if field.is_required()]
 
+    @classmethod
+    def partial(cls, fields: Iterable[str]) -> type[Self]:
+        """
+        Return the model to use for objects projected to some fields with `only=`.
+
+        If required fields were left out, this is a subclass with the same name in which they are optional: accessing
+        them raises `WrongIncludeCallError` instead of failing validation.
+        """
+        missing = frozenset(name for name, field in cls.model_fields.items() if field.is_required()).difference(fields)
+        if not missing:
+            return cls
+        return _partial_model(cls, missing)
+
+    @classmethod
+    def projected(cls, url: str) -> type[Self]:
+        """Return the model for the objects returned by a request url, taking its `only=` param into account."""
+        if not (only := parse_qs(urlparse(url).query).get("only")):
+            return cls
+        return cls.partial(parse_only(only[0]))
+
     def __getattribute__(self, name: str):
         """Override to skip validation for the response."""
 
@@ -92,9 +157,10 @@ class DanbooruModel(BaseModel):
             request: PreparedRequest = super().__getattribute__("_request")
             params = parse_qs(urlparse(request.url).query).get("only", [])
             if params:
-                params = params[0].split(",")
+                params = parse_only(params[0])
             params = params or super().__getattribute__("default_includes")()
-            if name not in params:
+            # fields set explicitly, by the api or by `prefetch`, were loaded and are really empty
+            if name not in params and name not in super().__getattribute__("__pydantic_fields_set__"):
                 raise WrongIncludeCallError(name)
 
         return value
@@ -121,7 +187,7 @@ class DanbooruModel(BaseModel):
     def __str__(self) -> str:
         return f"{type(self).__name__}[ {self.url} ]"
 
-    @classproperty
+    @cached_classproperty
     def model_name(self) -> str:
         """Autogenerates the model name."""
         class_name = self.__name__  # type: ignore[attr-defined]
@@ -129,7 +195,7 @@ class DanbooruModel(BaseModel):
 
         return snake_name.removeprefix("danbooru_")
 
-    @classproperty
+    @cached_classproperty
     def generic_endpoint(self) -> str:
         """Autogenerates the endpoint name."""
         endpoint = self.model_name
@@ -139,8 +205,7 @@ class DanbooruModel(BaseModel):
     def url_for(cls, **kwargs) -> str:
         """Return the canonical url for a model with params."""
 
-        if not kwargs.pop("session", None):
-            session = get_default_session()
+        session = kwargs.pop("session", None) or get_default_session()
 
         params = session._kwargs_to_rails_params(endpoint=cls.generic_endpoint, **kwargs)  # noqa: SLF001
         param_string = urlencode(params)
@@ -151,8 +216,7 @@ class DanbooruModel(BaseModel):
     def from_url(cls, url: str, cache: bool = False, **kwargs) -> Self:
         """Return the model instance from a url."""
 
-        if not kwargs.pop("session", None):
-            session = get_default_session()
+        session = kwargs.pop("session", None) or get_default_session()
 
         match = re.match(r"^https?://[^/]+/(?P<path>(?P<type>[a-z_]+)/(?P<id>\d+))", url)
         if match:
@@ -169,8 +233,7 @@ class DanbooruModel(BaseModel):
     @classmethod
     def get_by_id(cls, model_id: int, cache: bool = False, **kwargs) -> list[Self] | Self:
         """Gets a specific instance of the model matching the ID."""
-        if not kwargs.pop("session", None):
-            session = get_default_session()
+        session = kwargs.pop("session", None) or get_default_session()
 
         endpoint = f"{cls.generic_endpoint}/{model_id}"
 
@@ -188,16 +251,15 @@ class DanbooruModel(BaseModel):
     @classmethod
     def get(cls, cache: bool = False, **kwargs) -> list[Self] | Self:
         """Proxy for `Danbooru().danbooru_request("GET", endpoint, **kwargs)`. Accepts an optional `session` param."""
-        if not kwargs.pop("session", None):
-            session = get_default_session()
+        session = kwargs.pop("session", None) or get_default_session()
 
         response = session.danbooru_request("GET", cls.generic_endpoint, cache=cache, **kwargs)
         return response # ty:ignore[invalid-return-type]
 
     @classmethod
-    def get_all(cls, max_pages: int = 0, **kwargs) -> list[Self]:
-        """Get all elements for a specific search. Accepts an optional `session` param."""
-        all_results = []
+    def get_all(cls, max_pages: int = 0, **kwargs) -> DanbooruResults[Self]:
+        """Get all elements for a specific search. Accepts optional `session` and `deadline` params, as `all_pages`."""
+        all_results = DanbooruResults()
 
         for current_page, page_of_results in enumerate(cls.all_pages(**kwargs)):
             all_results += page_of_results
@@ -208,25 +270,73 @@ class DanbooruModel(BaseModel):
         return all_results
 
     @classmethod
-    def all_pages(cls, **kwargs) -> Generator[list[Self], None, None]:
-        """Loop through the pages of a specific search. Accepts an optional `session` param."""
-        if not kwargs.pop("session", None):
-            session = get_default_session()
+    def all_pages(cls, **kwargs) -> Generator[DanbooruResults[Self], None, None]:
+        """
+        Loop through the pages of a specific search. Accepts optional `session` and `deadline` params.
+
+        The page size is halved when a page times out and grows back after a few successful pages. Searches in the
+        default id order are paginated with `b<id>` cursors, so an interrupted crawl can be resumed with `page="b<id>"`.
+        A `deadline` in seconds bounds the whole crawl, time spent by the caller between pages included.
+        """
+        from danbooru.deadline import deadline_at
+        from danbooru.paging import AdaptivePageSize, no_timeout_retries, parse_page
 
-        kwargs.pop("page", None)
-        kwargs.pop("limit", None)
-        page = 1
+        session = kwargs.pop("session", None) or get_default_session()
+        deadline = kwargs.pop("deadline", None)
+        ends_at = None if deadline is None else time.monotonic() + deadline
 
-        limit = 200 if cls.generic_endpoint == "posts" else 1000
+        start = parse_page(kwargs.pop("page", None))
+        maximum = kwargs.pop("limit", None) or (200 if cls.generic_endpoint == "posts" else 1000)
+        by_id = cls._paginates_by_id(kwargs)
+
+        page_size = AdaptivePageSize(maximum, aligned=not by_id)
+        cursor = start if isinstance(start, str) else None
+        offset = 0 if cursor else (start - 1) * maximum
 
         while True:
-            response = session.danbooru_request("GET", cls.generic_endpoint, page=page, limit=limit, **kwargs)
+            limit = page_size.limit
+            page = cursor or offset // limit + 1
+            try:
+                with deadline_at(ends_at), no_timeout_retries() if page_size.can_shrink else nullcontext():
+                    response = session.danbooru_request("GET", cls.generic_endpoint, page=page, limit=limit, **kwargs)
+            except DanbooruTimeoutError:
+                if not page_size.shrink():
+                    raise
+                logger.warning(f"Page {page} of {cls.generic_endpoint} timed out with limit={limit}, retrying with limit={page_size.limit}.")
+                continue
+
+            offset += len(response)
+            page_size.record_success(offset)
+
             if response:
                 yield response
             if len(response) < limit:
                 logger.trace(f"Got {len(response)} (<{limit}) {cls.generic_endpoint} on page {page}, stopping.")
                 return
-            page += 1
+            if by_id:
+                cursor = f"b{response[-1].id}"
+
+    @classmethod
+    def _paginates_by_id(cls, kwargs: dict) -> bool:
+        """Whether a search is in the default descending id order, so that it can be paginated with `b<id>` cursors."""
+        if not issubclass(cls, DanbooruInstancedModel) or "order" in kwargs:
+            return False
+        if isinstance(only := kwargs.get("only"), str | list) and "id" not in parse_only(only if isinstance(only, str) else ",".join(only)):
+            return False
+        return not re.search(r"(?:^|\s)-?(?:order|ordfav|ordpool|random):", str(kwargs.get("tags") or ""))
+
+    @classmethod
+    def pipelined_pages(cls, processes: int | None = None, prefetch: int = 4, **kwargs) -> Generator[DanbooruResults[Self], None, None]:
+        """
+        Like `all_pages`, but pages are parsed in a process pool while the next ones are fetched.
+
+        Accepts optional `session` and `deadline` params.
+        """
+        from danbooru.pipeline import PipelinedCrawler
+
+        session = kwargs.pop("session", None) or get_default_session()
+        crawler = PipelinedCrawler(cls, session=session, processes=processes, prefetch=prefetch)
+        yield from crawler.pages(**kwargs)
 
     @classmethod
     def model_for_name(cls, name: str) -> type[DanbooruModelType | DanbooruModel]:
@@ -263,11 +373,30 @@ class DanbooruInstancedModel(DanbooruModel):
     created_at: datetime.datetime
     updated_at: datetime.datetime
 
+    @cached_classproperty
+    def identity_model(self) -> type[DanbooruInstancedModel]:
+        """The model instances are identified by: the class itself, or the full model for partial ones built by `partial`."""
+        return _partial_bases.get(self, self)  # type: ignore[arg-type]
+
+    def __hash__(self) -> int:
+        # rows without an id, e.g. projected without it, can't be told apart and fall back to object identity
+        if (instance_id := object.__getattribute__(self, "__dict__").get("id")) is None:
+            return object.__hash__(self)
+        return hash((type(self).identity_model, instance_id))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DanbooruInstancedModel):
+            return NotImplemented
+        instance_id = object.__getattribute__(self, "__dict__").get("id")
+        if instance_id is None:
+            return self is other
+        return (type(self).identity_model is type(other).identity_model
+                and instance_id == object.__getattribute__(other, "__dict__").get("id"))
+
     @classmethod
     def create(cls, **kwargs) -> Self:
         """Create on danbooru and then return self."""
-        if not kwargs.pop("session", None):
-            session = get_default_session()
+        session = kwargs.pop("session", None) or get_default_session()
 
         data = {cls.model_name: kwargs}
 
@@ -277,8 +406,7 @@ class DanbooruInstancedModel(DanbooruModel):
 
     def update(self, **kwargs) -> Self | None:
         """Update on danbooru and then return self."""
-        if not kwargs.pop("session", None):
-            session = get_default_session()
+        session = kwargs.pop("session", None) or get_default_session()
 
         data = {self.model_name: kwargs}
 
@@ -294,8 +422,7 @@ class DanbooruInstancedModel(DanbooruModel):
     @classmethod
     def update_instance(cls, id: int, **kwargs) -> Self | None:
         """Update on danbooru and then return self."""
-        if not kwargs.pop("session", None):
-            session = get_default_session()
+        session = kwargs.pop("session", None) or get_default_session()
 
         data = {cls.model_name: kwargs}
 
@@ -314,6 +441,18 @@ class DanbooruInstancedModel(DanbooruModel):
         logger.info(f"Deleting {self}")
         self.session._do_request("DELETE", self.instance_endpoint, cache=False)
 
+    @classmethod
+    def watch(cls, since: int | None = None, **kwargs) -> ChangeFeed:
+        """
+        Iterate, synchronously or with `async for`, over new instances as they are created. Accepts an optional `session` param.
+
+        Other kwargs filter the search. See `danbooru.watch.ChangeFeed` to watch several models in the same polling cycle.
+        """
+        from danbooru.watch import ChangeFeed
+
+        session = kwargs.pop("session", None) or get_default_session()
+        return ChangeFeed(session=session).add(cls, since=since, **kwargs)
+
     @property
     def instance_endpoint(self) -> str:
         """Autogenerates the endpoint name."""
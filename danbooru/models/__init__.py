@@ -1,40 +1,70 @@
-"""Defines the danbooru models individually."""
-from danbooru.models.artist_version import DanbooruArtistVersion
-from danbooru.models.bulk_update_request import DanbooruBulkUpdateRequest
-from danbooru.models.comment import DanbooruComment
-from danbooru.models.comment_vote import DanbooruCommentVote
-from danbooru.models.favorite_group import DanbooruFavoriteGroup
-from danbooru.models.forum_post import DanbooruForumPost
-from danbooru.models.pool import DanbooruPool
-from danbooru.models.post import DanbooruPost
-from danbooru.models.post_approval import DanbooruPostApproval
-from danbooru.models.post_counts import DanbooruPostCounts
-from danbooru.models.post_version import DanbooruPostVersion
-from danbooru.models.post_vote import DanbooruPostVote
-from danbooru.models.related_tag import DanbooruRelatedTag
-from danbooru.models.tag import DanbooruTag
-from danbooru.models.tag_implication import DanbooruTagImplication
-from danbooru.models.user import DanbooruUser
-from danbooru.models.wiki_page import DanbooruWikiPage
-from danbooru.models.wiki_page_version import DanbooruWikiPageVersion
-
-_models = [
-    DanbooruArtistVersion,
-    DanbooruBulkUpdateRequest,
-    DanbooruComment,
-    DanbooruCommentVote,
-    DanbooruFavoriteGroup,
-    DanbooruForumPost,
-    DanbooruPool,
-    DanbooruPost,
-    DanbooruPostApproval,
-    DanbooruPostCounts,
-    DanbooruPostVersion,
-    DanbooruPostVote,
-    DanbooruRelatedTag,
-    DanbooruTag,
-    DanbooruTagImplication,
-    DanbooruUser,
-    DanbooruWikiPage,
-    DanbooruWikiPageVersion,
-]
+"""
+Defines the danbooru models individually.
+
+Models are imported lazily on first access, so importing the package doesn't build every pydantic model.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from danbooru.models.artist_version import DanbooruArtistVersion
+    from danbooru.models.bulk_update_request import DanbooruBulkUpdateRequest
+    from danbooru.models.comment import DanbooruComment
+    from danbooru.models.comment_vote import DanbooruCommentVote
+    from danbooru.models.favorite_group import DanbooruFavoriteGroup
+    from danbooru.models.forum_post import DanbooruForumPost
+    from danbooru.models.pool import DanbooruPool
+    from danbooru.models.post import DanbooruPost
+    from danbooru.models.post_approval import DanbooruPostApproval
+    from danbooru.models.post_counts import DanbooruPostCounts
+    from danbooru.models.post_version import DanbooruPostVersion
+    from danbooru.models.post_vote import DanbooruPostVote
+    from danbooru.models.related_tag import DanbooruRelatedTag
+    from danbooru.models.tag import DanbooruTag
+    from danbooru.models.tag_implication import DanbooruTagImplication
+    from danbooru.models.user import DanbooruUser
+    from danbooru.models.wiki_page import DanbooruWikiPage
+    from danbooru.models.wiki_page_version import DanbooruWikiPageVersion
+
+_modules = {
+    "DanbooruArtistVersion": "artist_version",
+    "DanbooruBulkUpdateRequest": "bulk_update_request",
+    "DanbooruComment": "comment",
+    "DanbooruCommentVote": "comment_vote",
+    "DanbooruFavoriteGroup": "favorite_group",
+    "DanbooruForumPost": "forum_post",
+    "DanbooruPool": "pool",
+    "DanbooruPost": "post",
+    "DanbooruPostApproval": "post_approval",
+    "DanbooruPostCounts": "post_counts",
+    "DanbooruPostVersion": "post_version",
+    "DanbooruPostVote": "post_vote",
+    "DanbooruRelatedTag": "related_tag",
+    "DanbooruTag": "tag",
+    "DanbooruTagImplication": "tag_implication",
+    "DanbooruUser": "user",
+    "DanbooruWikiPage": "wiki_page",
+    "DanbooruWikiPageVersion": "wiki_page_version",
+}
+
+__all__ = list(_modules)
+
+
+def __getattr__(name: str) -> Any:
+    if name == "_models":
+        value = [__getattr__(model_name) for model_name in __all__]
+    elif name in _modules:
+        module = importlib.import_module(f"{__name__}.{_modules[name]}")
+        value = getattr(module, name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
@@ -1,5 +1,6 @@
 """Model definition for /bulk_update_requests."""
 
+from danbooru.bur_script import BURCommand, parse_script
 from danbooru.model import DanbooruInstancedModel
 from danbooru.models.forum_post import DanbooruForumPost
 
@@ -14,3 +15,8 @@ class DanbooruBulkUpdateRequest(DanbooruInstancedModel):
     tags: list[str]
 
     forum_post: DanbooruForumPost | None = None
+
+    @property
+    def commands(self) -> list[BURCommand]:
+        """Return the parsed script."""
+        return parse_script(self.script)
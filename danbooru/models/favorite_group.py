@@ -3,10 +3,11 @@
 
 from __future__ import annotations
 
+from danbooru.hydration import PostCollectionMixin
 from danbooru.model import DanbooruInstancedModel
 
 
-class DanbooruFavoriteGroup(DanbooruInstancedModel):
+class DanbooruFavoriteGroup(PostCollectionMixin, DanbooruInstancedModel):
     name: str
     creator_id: int
 
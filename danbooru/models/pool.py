@@ -5,10 +5,11 @@ from __future__ import annotations
 
 from typing import Literal
 
+from danbooru.hydration import PostCollectionMixin
 from danbooru.model import DanbooruInstancedModel
 
 
-class DanbooruPool(DanbooruInstancedModel):
+class DanbooruPool(PostCollectionMixin, DanbooruInstancedModel):
     name: str
     description: str
     is_active: bool
@@ -3,12 +3,12 @@
 
 from __future__ import annotations
 
-import time
-from typing import Self
+from typing import TYPE_CHECKING, Self
 
-from danbooru import logger
-from danbooru.exceptions import DanbooruHTTPError
-from danbooru.model import DanbooruInstancedModel
+from danbooru.model import DanbooruInstancedModel, get_default_session
+
+if TYPE_CHECKING:
+    from danbooru.danbooru import Danbooru
 
 
 class DanbooruPost(DanbooruInstancedModel):
@@ -29,21 +29,7 @@ class DanbooruPost(DanbooruInstancedModel):
         return self.update(**data)
 
     @classmethod
-    def expunge(cls, post_id: int) -> None:
-        from danbooru.danbooru import Danbooru
-        session = Danbooru()
-        assert post_id > 11_000_000
-        logger.info(f"Permanently expunging post #{post_id}")
-        try:
-            session.danbooru_request(
-                "POST",
-                f"moderator/post/posts/{post_id}/expunge",
-                params={"post_id": post_id},
-            )
-        except DanbooruHTTPError as e:
-            if e.response.status_code == 406:
-                return
-            if e.response.status_code == 500:
-                time.sleep(5)
-            else:
-                raise
+    def expunge(cls, post_id: int, session: Danbooru | None = None) -> None:
+        """Permanently expunge a post, retrying server errors with backoff. See `danbooru.moderation` for bulk expunges."""
+        from danbooru.moderation import expunge_post
+        expunge_post(post_id, session=session or get_default_session())
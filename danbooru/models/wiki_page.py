@@ -3,6 +3,13 @@ import re
 
 from danbooru.model import DanbooruInstancedModel
 
+WIKI_LINK_PATTERN = re.compile(r"\[\[([^|\[\]]+)(?:\|[^\[\]]*)?\]\]")
+
+
+def parse_linked_tags(body: str) -> list[str]:
+    """Return the normalized tag names linked with `[[tag]]` or `[[tag|text]]` in a dtext body."""
+    return [t.strip().replace(" ", "_").lower() for t in WIKI_LINK_PATTERN.findall(body)]
+
 
 class DanbooruWikiPage(DanbooruInstancedModel):
     title: str
@@ -14,7 +21,4 @@ class DanbooruWikiPage(DanbooruInstancedModel):
     @property
     def linked_tags(self) -> list[str]:
         """Return a list of linked tags in a wiki's body."""
-        pattern = re.compile(r"\[\[([^|\[\]]+)(?:\|(.*))?\]\]")
-
-        tags = [t[0].strip() for t in pattern.findall(self.body)]
-        return [t.replace(" ", "_").lower() for t in tags]
+        return parse_linked_tags(self.body)
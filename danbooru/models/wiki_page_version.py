@@ -2,7 +2,16 @@
 
 
 from danbooru.model import DanbooruInstancedModel
+from danbooru.models.wiki_page import parse_linked_tags
 
 
 class DanbooruWikiPageVersion(DanbooruInstancedModel):
-    ...
+    wiki_page_id: int
+    title: str
+    body: str
+    is_deleted: bool
+
+    @property
+    def linked_tags(self) -> list[str]:
+        """Return a list of linked tags in this version's body."""
+        return parse_linked_tags(self.body)
@@ -0,0 +1,166 @@
+"""
+Bulk deletions and expunges over one shared session, with bounded concurrency and a resumable journal.
+
+    moderator = BulkModerator(journal="cleanup.jsonl")
+    report = moderator.expunge(post_ids)
+    report = moderator.delete(DanbooruComment, comment_ids)
+
+Every processed id is appended to the journal, so re-running the same job after a crash skips the ids that
+were already handled and only retries the ones that failed.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal
+
+from backoff import expo, on_exception
+
+from danbooru import logger
+from danbooru.exceptions import DanbooruHTTPError
+from danbooru.model import get_default_session
+from danbooru.utils import ContextThreadPoolExecutor
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from danbooru.danbooru import Danbooru
+    from danbooru.model import DanbooruInstancedModel
+
+Outcome = Literal["done", "gone", "failed"]
+
+
+def _is_not_server_error(error: DanbooruHTTPError) -> bool:
+    return error.response.status_code != 500
+
+
+def _log_retry(details: dict) -> None:
+    logger.warning(f"Server error on {details['args'][2]}, retrying in {details['wait']:0.1f} seconds (try {details['tries']}).")
+
+
+@on_exception(expo, DanbooruHTTPError, max_tries=5, jitter=None, giveup=_is_not_server_error, on_backoff=_log_retry)
+def _send(session: Danbooru, method: str, endpoint: str, **kwargs) -> None:
+    """Send a moderation request, retrying 500s with exponential backoff."""
+    session._do_request(method, endpoint, cache=False, **kwargs)  # noqa: SLF001
+
+
+def expunge_post(post_id: int, session: Danbooru) -> Outcome:
+    """Permanently expunge a post. Return "gone" if it was already expunged."""
+    assert post_id > 11_000_000
+    logger.info(f"Permanently expunging post #{post_id}")
+    try:
+        _send(session, "POST", f"moderator/post/posts/{post_id}/expunge", params={"post_id": post_id})
+    except DanbooruHTTPError as e:
+        if e.response.status_code == 406:
+            return "gone"
+        raise
+    return "done"
+
+
+def delete_instance(model: type[DanbooruInstancedModel], instance_id: int, session: Danbooru, **params) -> Outcome:
+    """Delete an instance by id. Return "gone" if it doesn't exist anymore."""
+    logger.info(f"Deleting {model.model_name} #{instance_id}")
+    try:
+        _send(session, "DELETE", f"{model.generic_endpoint}/{instance_id}", params=params or None)
+    except DanbooruHTTPError as e:
+        if e.response.status_code == 404:
+            return "gone"
+        raise
+    return "done"
+
+
+class ModerationJournal:
+    def __init__(self, path: str | Path):
+        """An append-only json-lines log of the ids processed by each action."""
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def processed(self, action: str) -> set[int]:
+        """Ids that an action already handled, successfully or because they were gone. Failed ids are not included."""
+        if not self.path.exists():
+            return set()
+
+        outcomes: dict[int, str] = {}
+        with self.path.open(encoding="utf-8") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry["action"] == action:
+                    outcomes[entry["id"]] = entry["outcome"]
+        return {instance_id for instance_id, outcome in outcomes.items() if outcome != "failed"}
+
+    def record(self, action: str, instance_id: int, outcome: Outcome, error: str | None = None) -> None:
+        """Append an entry, flushed right away so that a crash loses nothing."""
+        entry = {"action": action, "id": instance_id, "outcome": outcome}
+        if error:
+            entry["error"] = error
+        with self._lock, self.path.open("a", encoding="utf-8") as file:
+            file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+
+@dataclass
+class ModerationReport:
+    action: str
+    done: list[int] = field(default_factory=list)
+    gone: list[int] = field(default_factory=list)
+    failed: dict[int, Exception] = field(default_factory=dict)
+    resumed: int = 0
+    """Ids skipped because the journal already had them."""
+
+
+class BulkModerator:
+    def __init__(self, session: Danbooru | None = None, max_workers: int = 4, journal: str | Path | None = None):
+        """Run moderation actions over many ids through one session, with at most `max_workers` requests in flight."""
+        self.session = session or get_default_session()
+        self.max_workers = max_workers
+        self.journal = ModerationJournal(journal) if journal else None
+
+    def expunge(self, post_ids: Iterable[int]) -> ModerationReport:
+        """Permanently expunge posts."""
+        return self.run("expunge", post_ids, lambda post_id: expunge_post(post_id, self.session))
+
+    def delete(self, model: type[DanbooruInstancedModel], ids: Iterable[int], **params) -> ModerationReport:
+        """Delete instances of a model. `params`, such as `reason`, are sent with every request."""
+        return self.run(f"delete_{model.model_name}", ids, lambda instance_id: delete_instance(model, instance_id, self.session, **params))
+
+    def run(self, action: str, ids: Iterable[int], operation: Callable[[int], Outcome]) -> ModerationReport:
+        """Apply an operation to every id not already processed by `action`, journaling each outcome."""
+        ids = list(dict.fromkeys(ids))
+        processed = self.journal.processed(action) if self.journal else set()
+        pending = [instance_id for instance_id in ids if instance_id not in processed]
+
+        report = ModerationReport(action, resumed=len(ids) - len(pending))
+        logger.info(f"Running {action} on {len(pending)} ids ({report.resumed} already in the journal).")
+
+        in_flight: dict[Future[Outcome], int] = {}
+        with ContextThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for instance_id in pending:
+                in_flight[executor.submit(operation, instance_id)] = instance_id
+                if len(in_flight) >= self.max_workers * 2:
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        self._collect(report, in_flight.pop(future), future)
+            for future in list(in_flight):
+                self._collect(report, in_flight.pop(future), future)
+
+        logger.info(f"{action}: {len(report.done)} done, {len(report.gone)} already gone, {len(report.failed)} failed.")
+        return report
+
+    def _collect(self, report: ModerationReport, instance_id: int, future: Future[Outcome]) -> None:
+        try:
+            outcome = future.result()
+        except Exception as e:  # noqa: BLE001
+            logger.error(f"{report.action} failed for #{instance_id}: {e}")
+            report.failed[instance_id] = e
+            if self.journal:
+                self.journal.record(report.action, instance_id, "failed", error=str(e))
+            return
+
+        (report.done if outcome == "done" else report.gone).append(instance_id)
+        if self.journal:
+            self.journal.record(report.action, instance_id, outcome)
@@ -0,0 +1,88 @@
+"""
+Adaptive page sizes for long listings.
+
+A heavy search that hits `ActiveRecord::QueryCanceled` at `limit=1000` usually times out again if the same
+query is retried. `all_pages` instead halves the page size after a timeout and grows it back after a few
+successful pages, paginating with `page=b<id>` cursors so that changing sizes never skips or repeats rows.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING
+
+from danbooru.exceptions import DanbooruTimeoutError
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+_retry_timeouts: ContextVar[bool] = ContextVar("_retry_timeouts", default=True)
+
+
+@contextmanager
+def no_timeout_retries() -> Generator[None, None, None]:
+    """Raise `DanbooruTimeoutError` right away inside the block instead of retrying the same query."""
+    token = _retry_timeouts.set(False)
+    try:
+        yield
+    finally:
+        _retry_timeouts.reset(token)
+
+
+def give_up_on_timeout(error: Exception) -> bool:
+    """Backoff `giveup` predicate: don't retry timeouts when the caller handles them itself."""
+    return isinstance(error, DanbooruTimeoutError) and not _retry_timeouts.get()
+
+
+def parse_page(page: int | str | None) -> int | str:
+    """Validate a starting page: a page number or a `b<id>` cursor, as returned in `AdaptivePageSize` logs."""
+    if page is None:
+        return 1
+    if isinstance(page, int) or page.isdigit():
+        return int(page)
+    if page.startswith("b") and page[1:].isdigit():
+        return page
+    raise ValueError(f"Can't start paginating from page '{page}'. Use a page number or a 'b<id>' cursor.")
+
+
+class AdaptivePageSize:
+    def __init__(self, maximum: int, minimum: int = 20, grow_after: int = 3, aligned: bool = False):
+        """
+        Track the page size of a listing, between `minimum` and `maximum`.
+
+        `aligned` is for numbered pages, where the offset is `(page - 1) * limit`: sizes then only change when
+        the rows fetched so far are a whole number of pages at the new size.
+        """
+        self.maximum = maximum
+        self.minimum = min(minimum, maximum)
+        self.grow_after = grow_after
+        self.aligned = aligned
+
+        self.limit = maximum
+        self._successes = 0
+
+    @property
+    def can_shrink(self) -> bool:
+        """Whether a timeout can still be answered with a smaller page."""
+        return self.limit // 2 >= self.minimum and not (self.aligned and self.limit % 2)
+
+    def shrink(self) -> bool:
+        """Halve the page size after a timeout. Return False if it can't shrink any further."""
+        if not self.can_shrink:
+            return False
+        self.limit //= 2
+        self._successes = 0
+        return True
+
+    def record_success(self, offset: int) -> None:
+        """Count a successful page, doubling the size after `grow_after` of them in a row. `offset` is the number of rows fetched so far."""
+        self._successes += 1
+        if self._successes < self.grow_after or self.limit >= self.maximum:
+            return
+
+        larger = min(self.limit * 2, self.maximum)
+        if self.aligned and (offset % larger or larger % self.limit):
+            return
+        self.limit = larger
+        self._successes = 0
@@ -0,0 +1,248 @@
+"""
+Pipelined crawling: pages are fetched under the rate limiter by a background thread while a process pool
+decodes and validates them, so CPU-heavy endpoints use both the rate budget and several cores.
+
+    for page in DanbooruPostVersion.pipelined_pages(updater_id=1, processes=4):
+        ...
+"""
+
+from __future__ import annotations
+
+import contextvars
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Any
+
+from pydantic import BaseModel
+from requests import PreparedRequest, Response
+
+from danbooru import logger
+from danbooru.deadline import deadline_at
+from danbooru.exceptions import DanbooruTimeoutError
+from danbooru.model import DanbooruModel, get_default_session
+from danbooru.paging import AdaptivePageSize, no_timeout_retries, parse_page
+from danbooru.results import DanbooruResults
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+    from multiprocessing.context import BaseContext
+    from multiprocessing.queues import Queue
+
+    from danbooru.danbooru import Danbooru
+
+_DONE = object()
+
+# set in each worker process by `_init_worker`
+_bounds: Queue | None = None
+
+
+def _init_worker(bounds: Queue) -> None:
+    global _bounds  # noqa: PLW0603
+    _bounds = bounds
+
+
+def _parse_page(endpoint: str, content: bytes, url: str, token: int) -> tuple[list[DanbooruModel], float]:
+    """
+    Decode and validate a page in a worker process. The models come back detached from any session.
+
+    The row count and the last id are sent back as soon as the page is decoded, so the fetcher can request the next
+    page while this one is still being validated.
+    """
+    started_at = time.perf_counter()
+
+    assert _bounds is not None
+    try:
+        rows = json.loads(content)
+    except BaseException:
+        _bounds.put((token, None, None))
+        raise
+    last = rows[-1] if rows and isinstance(rows, list) else None
+    _bounds.put((token, len(rows), last.get("id") if isinstance(last, dict) else None))
+
+    request = PreparedRequest()
+    request.method = "GET"
+    request.url = url
+    response = Response()
+    response.status_code = 200
+    response._content = b""  # noqa: SLF001
+    response.url = url
+    response.request = request
+
+    model = DanbooruModel.model_for_endpoint(endpoint).projected(url)
+    with DanbooruModel._bind({"session": None, "response": response}):  # noqa: SLF001
+        models = [model(**row) for row in rows]
+
+    return models, time.perf_counter() - started_at
+
+
+def _reattach(value: Any, session: Danbooru, response: Response) -> None:
+    """Point a detached model, and every model nested in it, back to the live session and response."""
+    if isinstance(value, list):
+        for item in value:
+            _reattach(item, session, response)
+        return
+
+    if not isinstance(value, BaseModel):
+        return
+
+    if isinstance(value, DanbooruModel):
+        object.__setattr__(value, "_session", session)
+        object.__setattr__(value, "_response", response)
+        object.__setattr__(value, "_request", response.request)
+        raw = object.__getattribute__(value, "_raw_data")
+        raw["session"], raw["response"] = session, response
+        extra = object.__getattribute__(value, "__pydantic_extra__")
+        if extra is not None and "session" in extra:
+            extra["session"], extra["response"] = session, response
+
+    for name in type(value).model_fields:
+        _reattach(object.__getattribute__(value, name), session, response)
+
+
+class PipelinedCrawler:
+    def __init__(self,
+                 model: type[DanbooruModel],
+                 session: Danbooru | None = None,
+                 processes: int | None = None,
+                 prefetch: int = 4,
+                 mp_context: BaseContext | None = None,
+                 ):
+        """
+        Crawl every page of a search with network fetches overlapped with multi-process parsing.
+
+        At most `prefetch` fetched pages wait for parsing or consumption at any time, which bounds memory and
+        stops the fetcher from running ahead of a slow consumer.
+        """
+        self.model = model
+        self.session = session or get_default_session()
+        self.processes = processes or max(1, (os.cpu_count() or 2) - 1)
+        self.prefetch = prefetch
+        self.mp_context = mp_context
+
+    def pages(self, **kwargs) -> Generator[DanbooruResults[DanbooruModel], None, None]:
+        """Yield the pages of a search in order, like `all_pages`, with the same cursors and adaptive page size."""
+        endpoint = self.model.generic_endpoint
+        start = parse_page(kwargs.pop("page", None))
+        maximum = kwargs.pop("limit", None) or (200 if endpoint == "posts" else 1000)
+        deadline = kwargs.pop("deadline", None)
+        ends_at = None if deadline is None else time.monotonic() + deadline
+
+        pending: queue.Queue = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+        bounds = (self.mp_context or multiprocessing.get_context()).Queue()
+
+        with ProcessPoolExecutor(max_workers=self.processes, mp_context=self.mp_context,
+                                 initializer=_init_worker, initargs=(bounds,)) as pool:
+            # start the workers before the fetcher thread exists, so fork-based pools never fork a threaded process
+            pool.submit(int).result()
+
+            # in the caller's context, for its deadline and request priority
+            with deadline_at(ends_at):
+                fetcher = threading.Thread(target=contextvars.copy_context().run,
+                                           args=(self._fetch, pool, bounds, pending, stop, start, maximum, kwargs),
+                                           daemon=True)
+            fetcher.start()
+            try:
+                yield from self._consume(pending, endpoint)
+            finally:
+                stop.set()
+                while fetcher.is_alive():
+                    try:
+                        _, future = pending.get(timeout=0.1)
+                        future.cancel()
+                    except (queue.Empty, TypeError, ValueError):
+                        pass
+                fetcher.join()
+                bounds.close()
+
+    def _fetch(self,
+               pool: ProcessPoolExecutor,
+               bounds: Queue,
+               pending: queue.Queue,
+               stop: threading.Event,
+               start: int | str,
+               maximum: int,
+               kwargs: dict,
+               ) -> None:
+        endpoint = self.model.generic_endpoint
+        by_id = self.model._paginates_by_id(kwargs)  # noqa: SLF001
+        page_size = AdaptivePageSize(maximum, aligned=not by_id)
+        cursor = start if isinstance(start, str) else None
+        offset = 0 if cursor else (start - 1) * maximum
+        token = 0
+
+        try:
+            while not stop.is_set():
+                limit = page_size.limit
+                page = cursor or offset // limit + 1
+                params = self.session._get_params(endpoint, page=page, limit=limit, **kwargs)  # noqa: SLF001
+                try:
+                    with no_timeout_retries() if page_size.can_shrink else nullcontext():
+                        response = self.session._do_request("GET", endpoint, False, params=params)  # noqa: SLF001
+                except DanbooruTimeoutError:
+                    if not page_size.shrink():
+                        raise
+                    logger.warning(f"Page {page} of {endpoint} timed out with limit={limit}, retrying with limit={page_size.limit}.")
+                    continue
+
+                token += 1
+                future: Future = pool.submit(_parse_page, endpoint, response.content, response.url, token)
+                while not stop.is_set():
+                    try:
+                        pending.put((response, future), timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+
+                # the worker tells where the next page starts once it has decoded this one, before validating it
+                count, last_id = self._wait_for_bounds(bounds, token, future, stop)
+                if count is None:
+                    break
+                offset += count
+                page_size.record_success(offset)
+
+                if count < limit:
+                    logger.trace(f"Got {count} (<{limit}) {endpoint} on page {page}, stopping.")
+                    break
+                if by_id:
+                    cursor = f"b{last_id}"
+        except BaseException as e:  # noqa: BLE001
+            pending.put(e)
+        else:
+            pending.put(_DONE)
+
+    @staticmethod
+    def _wait_for_bounds(bounds: Queue, token: int, future: Future, stop: threading.Event) -> tuple[int | None, int | None]:
+        """Wait for the row count and last id of a page. `None` when the page can't be decoded or the crawl stopped."""
+        while not stop.is_set():
+            try:
+                sent, count, last_id = bounds.get(timeout=0.1)
+            except queue.Empty:
+                # a page that failed without reporting, or got cancelled; the consumer raises its error
+                if future.done() and (future.cancelled() or future.exception() is not None):
+                    return None, None
+                continue
+            if sent == token:
+                return count, last_id
+        return None, None
+
+    def _consume(self, pending: queue.Queue, endpoint: str) -> Generator[DanbooruResults[DanbooruModel], None, None]:
+        while True:
+            item = pending.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+
+            response, future = item
+            models, duration = future.result()
+            _reattach(models, self.session, response)
+            self.session.hooks.emit("parse", endpoint=endpoint, duration=duration, rows=len(models))
+            if models:
+                yield DanbooruResults(models)
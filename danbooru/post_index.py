@@ -0,0 +1,348 @@
+"""
+A local mirror of post tags with an offline evaluator for common tag searches.
+
+    index = PostIndex.build(tags="kantai_collection")
+    index.search("1girl -solo ~hat ~cap id:>1000 order:id", limit=100)
+    index.count("1girl solo")
+    index.save("kancolle.npz")
+
+    index = PostIndex.load("kancolle.npz")
+    index.sync()  # applies the post versions created since the last build or sync, within the mirrored search
+
+Each tag maps to a sorted array of post ids, so searches are set operations on numpy arrays. Supported syntax:
+plain tags (AND), `-tag`, `~tag` (any of the `~` tags), `id:` in its `1,2,3`, `>`, `>=`, `<`, `<=`, `a..b` forms,
+and `order:id`/`order:id_desc`. Other metatags raise `UnsupportedQueryError`.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from itertools import batched
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Self
+
+from danbooru import logger
+from danbooru.model import get_default_session
+from danbooru.results import _require_numpy
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    import numpy as np
+
+    from danbooru.danbooru import Danbooru
+    from danbooru.models.post import DanbooruPost
+
+UNSUPPORTED_METATAGS = frozenset((
+    "age", "ai", "appealer", "approver", "arttags", "chartags", "child", "comment", "commenter", "commentary", "copytags",
+    "date", "disapproved", "downvote", "duration", "embedded", "exif", "fav", "favcount", "favgroup", "filesize",
+    "filetype", "flagger", "gentags", "has", "height", "is", "limit", "md5", "metatags", "mpixels", "note", "noter",
+    "ordfav", "ordpool", "parent", "pixiv", "pixiv_id", "pool", "random", "rating", "ratio", "score", "search",
+    "source", "status", "tagcount", "unaliased", "updater", "upvote", "user", "width",
+))
+"""Danbooru metatags the evaluator doesn't implement. Terms with other prefixes, like `re:zero`, are plain tags."""
+
+_RANGE = re.compile(r"^(?P<op>>=|<=|>|<)?(?P<low>\d+)?(?P<dots>\.\.)?(?P<high>\d+)?$")
+
+
+class UnsupportedQueryError(ValueError):
+    """The query uses search syntax the local evaluator doesn't support."""
+
+
+def _contains(haystack: np.ndarray, needles: np.ndarray) -> np.ndarray:
+    """Return which of the sorted `needles` are in the sorted `haystack`, by binary search instead of a merge sort."""
+    if not len(haystack):
+        return _require_numpy().zeros(len(needles), dtype=bool)
+    positions = haystack.searchsorted(needles).clip(max=len(haystack) - 1)
+    return haystack[positions] == needles
+
+
+@dataclass
+class IdFilter:
+    low: int | None = None
+    high: int | None = None
+    ids: frozenset[int] | None = None
+
+    @classmethod
+    def parse(cls, value: str) -> IdFilter:
+        """Parse the value of an `id:` metatag."""
+        if "," in value:
+            return cls(ids=frozenset(int(post_id) for post_id in value.split(",") if post_id))
+
+        match = _RANGE.match(value)
+        if not match or not (match["low"] or match["high"]):
+            raise UnsupportedQueryError(f"Can't parse 'id:{value}'.")
+
+        low, high = match["low"] and int(match["low"]), match["high"] and int(match["high"])
+        match match["op"], match["dots"]:
+            case ">", None:
+                return cls(low=low + 1)
+            case ">=", None:
+                return cls(low=low)
+            case "<", None:
+                return cls(high=low - 1)
+            case "<=", None:
+                return cls(high=low)
+            case None, "..":
+                return cls(low=low, high=high)
+            case None, None:
+                return cls(ids=frozenset((low,)))
+        raise UnsupportedQueryError(f"Can't parse 'id:{value}'.")
+
+    def mask(self, post_ids: np.ndarray) -> np.ndarray:
+        """Return which of the ids match the filter."""
+        np = _require_numpy()
+        if self.ids is not None:
+            return np.isin(post_ids, np.fromiter(self.ids, dtype=np.uint32))
+        mask = np.ones(len(post_ids), dtype=bool)
+        if self.low is not None:
+            mask &= post_ids >= self.low
+        if self.high is not None:
+            mask &= post_ids <= self.high
+        return mask
+
+
+@dataclass
+class TagQuery:
+    required: list[str] = field(default_factory=list)
+    excluded: list[str] = field(default_factory=list)
+    any_of: list[str] = field(default_factory=list)
+    id_filters: list[tuple[IdFilter, bool]] = field(default_factory=list)
+    """Each filter with whether it's negated."""
+    ascending: bool = False
+
+    @classmethod
+    def parse(cls, query: str) -> TagQuery:
+        """Parse a tag search."""
+        parsed = cls()
+        for term in query.lower().split():
+            negated, term = term.startswith("-"), term.removeprefix("-")
+            is_or, term = term.startswith("~"), term.removeprefix("~")
+
+            metatag, separator, value = term.partition(":")
+            if separator and metatag == "id":
+                parsed.id_filters.append((IdFilter.parse(value), negated))
+            elif separator and metatag == "order":
+                if value not in ("id", "id_asc", "id_desc"):
+                    raise UnsupportedQueryError(f"Only order:id and order:id_desc are supported, not 'order:{value}'.")
+                parsed.ascending = value in ("id", "id_asc")
+            elif separator and metatag in UNSUPPORTED_METATAGS:
+                raise UnsupportedQueryError(f"The '{metatag}:' metatag is not supported locally.")
+            elif "*" in term:
+                raise UnsupportedQueryError(f"Wildcard searches like '{term}' are not supported locally.")
+            elif negated:
+                parsed.excluded.append(term)
+            elif is_or:
+                parsed.any_of.append(term)
+            else:
+                parsed.required.append(term)
+        return parsed
+
+
+class PostIndex:
+    def __init__(self):
+        """An empty index. Postings are kept as sorted uint32 arrays, with pending changes merged on the next query."""
+        np = _require_numpy()
+        self._postings: dict[str, np.ndarray] = {}
+        self._added: defaultdict[str, set[int]] = defaultdict(set)
+        self._removed: defaultdict[str, set[int]] = defaultdict(set)
+        self._post_tags: dict[int, frozenset[str]] | None = {}
+        self._all_ids = np.empty(0, dtype=np.uint32)
+        self._new_ids: set[int] = set()
+        self._removed_ids: set[int] = set()
+
+        self.last_version_id = 0
+        self.search_params: dict[str, Any] = {}
+        """The search kwargs the index mirrors, which `sync` applies to the changed posts."""
+
+    def __len__(self) -> int:
+        self._compact()
+        return len(self._all_ids)
+
+    @property
+    def tags(self) -> list[str]:
+        """Every tag with at least one post."""
+        self._compact()
+        return [tag for tag, posting in self._postings.items() if len(posting)]
+
+    def add_posts(self, posts: Iterable[DanbooruPost]) -> None:
+        """Add posts, or replace the tags of posts that are already indexed."""
+        post_tags = self._tags_by_post()
+        for post in posts:
+            tags = frozenset(post.tag_string.split())
+            previous = post_tags.get(post.id, frozenset())
+            for tag in previous - tags:
+                self._removed[tag].add(post.id)
+                self._added[tag].discard(post.id)
+            for tag in tags - previous:
+                self._added[tag].add(post.id)
+                self._removed[tag].discard(post.id)
+            post_tags[post.id] = tags
+            self._new_ids.add(post.id)
+            self._removed_ids.discard(post.id)
+
+    def remove_posts(self, post_ids: Iterable[int]) -> None:
+        """Remove posts from the index. Ids that aren't indexed are ignored."""
+        post_tags = self._tags_by_post()
+        for post_id in post_ids:
+            if (tags := post_tags.pop(post_id, None)) is None:
+                continue
+            for tag in tags:
+                self._removed[tag].add(post_id)
+                self._added[tag].discard(post_id)
+            self._new_ids.discard(post_id)
+            self._removed_ids.add(post_id)
+
+    def _tags_by_post(self) -> dict[int, frozenset[str]]:
+        # dropped by `load` to save memory, and rebuilt from the postings once the index is updated
+        if self._post_tags is None:
+            self._compact()
+            tags: defaultdict[int, set[str]] = defaultdict(set)
+            for tag, posting in self._postings.items():
+                for post_id in posting.tolist():
+                    tags[post_id].add(tag)
+            self._post_tags = {post_id: frozenset(post_tags) for post_id, post_tags in tags.items()}
+        return self._post_tags
+
+    def _compact(self) -> None:
+        np = _require_numpy()
+        if self._new_ids:
+            self._all_ids = np.union1d(self._all_ids, np.fromiter(self._new_ids, dtype=np.uint32))
+            self._new_ids.clear()
+        if self._removed_ids:
+            self._all_ids = np.setdiff1d(self._all_ids, np.fromiter(self._removed_ids, dtype=np.uint32), assume_unique=True)
+            self._removed_ids.clear()
+
+        for tag in self._added.keys() | self._removed.keys():
+            posting = self._postings.get(tag, np.empty(0, dtype=np.uint32))
+            if added := self._added.pop(tag, None):
+                posting = np.union1d(posting, np.fromiter(added, dtype=np.uint32))
+            if removed := self._removed.pop(tag, None):
+                posting = np.setdiff1d(posting, np.fromiter(removed, dtype=np.uint32), assume_unique=True)
+            self._postings[tag] = posting
+
+    def posting(self, tag: str) -> np.ndarray:
+        """The sorted ids of the posts with a tag."""
+        np = _require_numpy()
+        self._compact()
+        return self._postings.get(tag, np.empty(0, dtype=np.uint32))
+
+    def search(self, query: str, limit: int | None = None) -> np.ndarray:
+        """Return the ids of the posts matching a search, newest first unless the query has `order:id`."""
+        parsed = TagQuery.parse(query) if isinstance(query, str) else query
+        result = self._matches(parsed)
+        if not parsed.ascending:
+            result = result[::-1]
+        # the matches can be a posting list itself, which callers must not be able to change
+        return result[:limit].copy()
+
+    def count(self, query: str) -> int:
+        """Count the posts matching a search."""
+        return len(self._matches(TagQuery.parse(query) if isinstance(query, str) else query))
+
+    def _matches(self, parsed: TagQuery) -> np.ndarray:
+        """The ids matching a parsed search in ascending order, possibly shared with the index."""
+        np = _require_numpy()
+        self._compact()
+
+        required = sorted((self.posting(tag) for tag in parsed.required), key=len)
+        result = required[0] if required else self._all_ids
+        for posting in required[1:]:
+            result = result[_contains(posting, result)]
+
+        if parsed.any_of:
+            matches_any = np.zeros(len(result), dtype=bool)
+            for tag in parsed.any_of:
+                matches_any |= _contains(self.posting(tag), result)
+            result = result[matches_any]
+
+        for tag in parsed.excluded:
+            result = result[~_contains(self.posting(tag), result)]
+
+        for id_filter, negated in parsed.id_filters:
+            mask = id_filter.mask(result)
+            result = result[~mask if negated else mask]
+        return result
+
+    @classmethod
+    def build(cls, session: Danbooru | None = None, **kwargs) -> Self:
+        """Mirror the posts of a search, by default every post, through `all_pages`. Kwargs are passed to the search and kept for `sync`."""
+        from danbooru.models.post import DanbooruPost
+        from danbooru.models.post_version import DanbooruPostVersion
+
+        session = session or get_default_session()
+        index = cls()
+        index.search_params = {key: value for key, value in kwargs.items() if key not in ("page", "limit")}
+
+        latest = DanbooruPostVersion.get(limit=1, session=session)
+        index.last_version_id = latest[0].id if latest else 0
+
+        for page in DanbooruPost.all_pages(session=session, only="id,tag_string", **kwargs):
+            index.add_posts(page)
+        logger.info(f"Indexed {len(index)} posts with {len(index.tags)} tags.")
+        return index
+
+    def sync(self, session: Danbooru | None = None) -> int:
+        """
+        Apply the post versions created since the last build or sync, returning how many posts were updated.
+
+        The changed posts are refetched through the mirrored search with an `id:` filter, so posts that started
+        matching it are added and posts that stopped matching it are removed.
+        """
+        from danbooru.hydration import POST_CHUNK_SIZE
+        from danbooru.models.post import DanbooruPost
+        from danbooru.models.post_version import DanbooruPostVersion
+
+        session = session or get_default_session()
+        versions = DanbooruPostVersion.get_all(id_gt=self.last_version_id, session=session)
+        if not versions:
+            return 0
+
+        params = dict(self.search_params)
+        tags = params.pop("tags", "")
+        post_ids = sorted({version.post_id for version in versions})
+        matching: dict[int, DanbooruPost] = {}
+        for chunk in batched(post_ids, POST_CHUNK_SIZE):
+            chunk_tags = f"{tags} id:{','.join(map(str, chunk))}".strip()
+            posts = DanbooruPost.get(tags=chunk_tags, limit=POST_CHUNK_SIZE, only="id,tag_string", session=session, **params)
+            matching |= {post.id: post for post in posts}
+
+        self.add_posts(matching.values())
+        self.remove_posts(post_id for post_id in post_ids if post_id not in matching)
+        self.last_version_id = max(version.id for version in versions)
+        logger.trace(f"Updated {len(post_ids)} posts from {len(versions)} post versions, up to #{self.last_version_id}.")
+        return len(post_ids)
+
+    def save(self, path: str | Path) -> None:
+        """Write the index to a compressed `.npz` file, with the postings concatenated in CSR layout."""
+        np = _require_numpy()
+        self._compact()
+        tags = [tag for tag, posting in self._postings.items() if len(posting)]
+        postings = [self._postings[tag] for tag in tags]
+        offsets = np.cumsum([0, *map(len, postings)], dtype=np.int64)
+
+        np.savez_compressed(Path(path),
+                            tags=np.array(tags, dtype=object).astype(str),
+                            offsets=offsets,
+                            postings=np.concatenate(postings) if postings else np.empty(0, dtype=np.uint32),
+                            all_ids=self._all_ids,
+                            last_version_id=np.array(self.last_version_id, dtype=np.int64),
+                            search_params=np.array(json.dumps(self.search_params)))
+
+    @classmethod
+    def load(cls, path: str | Path) -> Self:
+        """Read an index written by `save`."""
+        np = _require_numpy()
+        index = cls()
+        with np.load(Path(path)) as data:
+            offsets, postings = data["offsets"], data["postings"]
+            index._postings = {str(tag): postings[offsets[i]:offsets[i + 1]] for i, tag in enumerate(data["tags"])}
+            index._all_ids = data["all_ids"]
+            index.last_version_id = int(data["last_version_id"])
+            if "search_params" in data.files:
+                index.search_params = json.loads(str(data["search_params"]))
+        index._post_tags = None
+        return index
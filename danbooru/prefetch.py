@@ -0,0 +1,115 @@
+"""
+Batched eager loading of the objects that models reference by id.
+
+    comments = DanbooruComment.get(limit=1000)
+    prefetch(comments, "creator", "post")  # two or three requests instead of two thousand
+    comments[0].creator.name
+
+    requests = DanbooruBulkUpdateRequest.get(limit=100)
+    prefetch(requests, "forum_post")  # declared relations are embedded by the endpoint through `include=`
+"""
+
+from __future__ import annotations
+
+from itertools import batched
+from typing import TYPE_CHECKING
+
+from danbooru import logger
+from danbooru.model import DanbooruInstancedModel, DanbooruModel, DanbooruModelType, get_default_session
+from danbooru.results import raw_data
+from danbooru.utils import ContextThreadPoolExecutor
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    from danbooru.danbooru import Danbooru
+
+ID_CHUNK_SIZE = 500
+"""Ids per `search[id]=1,2,3` request."""
+
+USER_ROLES = frozenset(("creator", "updater", "approver", "user", "uploader", "banner", "reporter"))
+"""Relations that point to users despite being named after their role."""
+
+
+def related_model(relation: str) -> type[DanbooruInstancedModel]:
+    """Return the model a relation such as `creator`, `post` or `forum_post` points to."""
+    from danbooru.models.user import DanbooruUser
+
+    if relation in USER_ROLES:
+        return DanbooruUser
+
+    model = DanbooruModel.model_for_name(relation)
+    if not issubclass(model, DanbooruInstancedModel):
+        raise ValueError(f"Don't know which model the relation '{relation}' points to.")
+    return model
+
+
+def fetch_by_ids(model: type[DanbooruInstancedModel],
+                 ids: Iterable[int],
+                 session: Danbooru | None = None,
+                 max_workers: int = 4,
+                 **params,
+                 ) -> dict[int, DanbooruInstancedModel]:
+    """Fetch instances of a model by id in chunked, concurrent `search[id]` requests. `params`, such as `include`, are sent with each."""
+    from danbooru.hydration import fetch_posts
+    from danbooru.models.post import DanbooruPost
+
+    session = session or get_default_session()
+    ids = list(dict.fromkeys(ids))
+
+    if model is DanbooruPost and not params:
+        return fetch_posts(ids, session=session, max_workers=max_workers)  # type: ignore[return-value]
+
+    def fetch_chunk(chunk: tuple[int, ...]) -> list[DanbooruInstancedModel]:
+        return model.get(id=",".join(map(str, chunk)), limit=len(chunk), session=session, **params)
+
+    with ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+        return {instance.id: instance for chunk in executor.map(fetch_chunk, batched(ids, ID_CHUNK_SIZE)) for instance in chunk}
+
+
+def prefetch(results: Sequence[DanbooruModelType],
+             *relations: str,
+             session: Danbooru | None = None,
+             max_workers: int = 4,
+             ) -> Sequence[DanbooruModelType]:
+    """
+    Load a relation across a list of models in batched requests and attach the objects as `<relation>`.
+
+    Relations declared on the model, which the endpoint can embed, are loaded by fetching the rows again by id with
+    `include=<relation>`. Other relations are resolved from their `<relation>_id` references. Either way each relation
+    costs one request per chunk of ids instead of one per row. Rows that already carry the relation are left
+    untouched. Rows whose relation is null or missing get `None`, which reads back as `None` rather than raising
+    `WrongIncludeCallError`.
+    """
+    if not results:
+        return results
+    session = session or results[0]._session  # noqa: SLF001
+
+    for relation in relations:
+        pending = [row for row in results if not _is_loaded(row, relation)]
+        if not pending:
+            continue
+
+        row_model = type(pending[0])
+        if relation in row_model.model_fields and issubclass(row_model, DanbooruInstancedModel):
+            logger.trace(f"Prefetching '{relation}' on {len(pending)} {row_model.generic_endpoint} through include=.")
+            reloaded = fetch_by_ids(row_model.identity_model, (row.id for row in pending),
+                                    session=session, max_workers=max_workers, include=[relation])
+            for row in pending:
+                setattr(row, relation, getattr(reloaded[row.id], relation) if row.id in reloaded else None)
+            continue
+
+        model = related_model(relation)
+        foreign_key = f"{relation}_id"
+        ids = {fk for row in pending if (fk := raw_data(row).get(foreign_key)) is not None}
+        logger.trace(f"Prefetching {len(ids)} {model.generic_endpoint} for '{relation}' on {len(pending)} rows.")
+
+        instances = fetch_by_ids(model, ids, session=session, max_workers=max_workers)
+        for row in pending:
+            setattr(row, relation, instances.get(raw_data(row).get(foreign_key)))
+
+    return results
+
+
+def _is_loaded(row: DanbooruModel, relation: str) -> bool:
+    return relation in raw_data(row) or relation in row.model_fields_set or relation in (row.model_extra or {})
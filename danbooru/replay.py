@@ -0,0 +1,194 @@
+"""
+Record/replay transport for deterministic, network-free sessions.
+
+Recording wraps the session's transport adapters and appends every exchange to a gzipped json-lines archive;
+replaying serves the archived responses back without touching the network or the rate limiter.
+
+    with record(session, "crawl.jsonl.gz"):
+        DanbooruPost.get_all(tags="kantai_collection", session=session)
+
+    with replay(session, "crawl.jsonl.gz"):
+        DanbooruPost.get_all(tags="kantai_collection", session=session)  # served locally
+"""
+
+from __future__ import annotations
+
+import base64
+import gzip
+import json
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from requests import Response
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from danbooru import logger
+from danbooru.exceptions import ReplayMissError
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+    from requests import PreparedRequest
+
+    from danbooru.danbooru import Danbooru
+
+# bodies are archived decoded, so Content-Encoding would no longer describe them
+_KEPT_HEADERS = ("Content-Type", "Date", "X-Rate-Limit")
+
+
+def request_key(method: str, url: str, body: bytes | str | None = None) -> str:
+    """Return a stable key for a request: method, url with sorted query params, and body."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    url = urlunsplit((parts.scheme, parts.netloc, parts.path.rstrip("/"), query, ""))
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", errors="replace")
+    return f"{method.upper()} {url} {body or ''}".rstrip()
+
+
+def _encode_body(content: bytes) -> dict[str, str]:
+    try:
+        return {"body": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body_b64": base64.b64encode(content).decode("ascii")}
+
+
+def _decode_body(entry: dict) -> bytes:
+    if "body_b64" in entry:
+        return base64.b64decode(entry["body_b64"])
+    return entry["body"].encode("utf-8")
+
+
+class RecordingAdapter(HTTPAdapter):
+    def __init__(self, archive: Path, *args, **kwargs):
+        """Send requests over the network and append each exchange to `archive`."""
+        super().__init__(*args, **kwargs)
+        self.archive = Path(archive)
+        self._lock = threading.Lock()
+        self._file = gzip.open(self.archive, "at", encoding="utf-8")  # noqa: SIM115
+
+    def send(self, request: PreparedRequest, *args, **kwargs) -> Response:
+        """Send the request and record the response."""
+        response = super().send(request, *args, **kwargs)
+        entry = {
+            "key": request_key(request.method or "GET", request.url or "", request.body),
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {name: response.headers[name] for name in _KEPT_HEADERS if name in response.headers},
+            **_encode_body(response.content),
+        }
+        line = json.dumps(entry, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+        return response
+
+    def close(self) -> None:
+        """Flush the archive and close the underlying connections."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        super().close()
+
+
+class ReplayAdapter(BaseAdapter):
+    def __init__(self, archive: Path, strict: bool = True):
+        """
+        Serve responses from a recorded archive.
+
+        Repeated requests are answered in recording order, and the last response is reused once they run out.
+        With `strict=False`, unknown requests get an empty 404 instead of raising `ReplayMissError`.
+        """
+        super().__init__()
+        self.archive = Path(archive)
+        self.strict = strict
+        self._entries: dict[str, list[dict]] = defaultdict(list)
+        self._served: dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+        with gzip.open(self.archive, "rt", encoding="utf-8") as file:
+            for line in file:
+                entry = json.loads(line)
+                self._entries[entry["key"]].append(entry)
+        logger.trace(f"Loaded {sum(len(e) for e in self._entries.values())} recorded responses from {self.archive}")
+
+    def send(self, request: PreparedRequest, *args, **kwargs) -> Response:  # noqa: ARG002
+        """Return the recorded response for a request."""
+        key = request_key(request.method or "GET", request.url or "", request.body)
+
+        with self._lock:
+            entries = self._entries.get(key)
+            if entries:
+                entry = entries[min(self._served[key], len(entries) - 1)]
+                self._served[key] += 1
+            else:
+                entry = None
+
+        if entry is None:
+            if self.strict:
+                raise ReplayMissError(key)
+            entry = {"status": 404, "reason": "Not Recorded", "headers": {}, "body": ""}
+
+        response = Response()
+        response.status_code = entry["status"]
+        response.reason = entry["reason"]
+        response.headers = CaseInsensitiveDict({name: value for name, value in entry["headers"].items() if name in _KEPT_HEADERS})
+        response._content = _decode_body(entry)  # noqa: SLF001
+        response.encoding = "utf-8"
+        response.url = request.url or ""
+        response.request = request
+        return response
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+def _mount(session: Danbooru, adapter: BaseAdapter) -> dict:
+    previous = {}
+    for http_session in (session._session, session._cache_session):  # noqa: SLF001
+        for prefix in ("http://", "https://"):
+            previous[id(http_session), prefix] = http_session.get_adapter(prefix)
+            http_session.mount(prefix, adapter)
+    return previous
+
+
+def _unmount(session: Danbooru, previous: dict) -> None:
+    for http_session in (session._session, session._cache_session):  # noqa: SLF001
+        for prefix in ("http://", "https://"):
+            http_session.mount(prefix, previous[id(http_session), prefix])
+
+
+@contextmanager
+def record(session: Danbooru, archive: str | Path) -> Generator[RecordingAdapter, None, None]:
+    """Record every request sent by `session` inside the block to `archive`, appending if it exists."""
+    adapter = RecordingAdapter(Path(archive))
+    previous = _mount(session, adapter)
+    try:
+        yield adapter
+    finally:
+        _unmount(session, previous)
+        adapter.close()
+
+
+class _UnlimitedLimiter:
+    def try_acquire(self, *_, **__) -> bool:
+        return True
+
+
+@contextmanager
+def replay(session: Danbooru, archive: str | Path, strict: bool = True) -> Generator[ReplayAdapter, None, None]:
+    """Serve every request of `session` inside the block from `archive`, without rate limiting."""
+    adapter = ReplayAdapter(Path(archive), strict=strict)
+    previous = _mount(session, adapter)
+    # the limiter setter builds a new scheduler, so the old one is put back as is
+    scheduler = session.scheduler
+    session.limiter = _UnlimitedLimiter()
+    try:
+        yield adapter
+    finally:
+        session.scheduler = scheduler
+        _unmount(session, previous)
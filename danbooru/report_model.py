@@ -8,7 +8,7 @@ import inflection
 
 from danbooru.model import DanbooruModel
 from danbooru.user_level import UserLevel
-from danbooru.utils import classproperty
+from danbooru.utils import cached_classproperty
 
 
 class DanbooruReportModel(DanbooruModel):
@@ -19,7 +19,7 @@ class DanbooruReportModel(DanbooruModel):
         props = " ".join(f"{k}={v}" for k, v in self.model_dump(exclude_none=True).items())
         return f"{type(self).__name__}[{props}]"
 
-    @classproperty
+    @cached_classproperty
     def generic_endpoint(self) -> str:
         """Autogenerates the endpoint name."""
         endpoint = self.model_name.removesuffix("_report")
@@ -1,16 +1,46 @@
-"""Defines the danbooru report models individually."""
-from danbooru.reports.artist_version_report import DanbooruArtistVersionReport
-from danbooru.reports.forum_post_report import DanbooruForumPostReport
-from danbooru.reports.note_version_report import DanbooruNoteVersionReport
-from danbooru.reports.post_appeal_report import DanbooruPostAppealReport
-from danbooru.reports.post_report import DanbooruPostReport
-from danbooru.reports.wiki_page_version_report import DanbooruWikiPageVersionReport
-
-_report_models = [
-    DanbooruArtistVersionReport,
-    DanbooruForumPostReport,
-    DanbooruNoteVersionReport,
-    DanbooruPostAppealReport,
-    DanbooruPostReport,
-    DanbooruWikiPageVersionReport,
-]
+"""
+Defines the danbooru report models individually.
+
+Models are imported lazily on first access, so importing the package doesn't build every pydantic model.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from danbooru.reports.artist_version_report import DanbooruArtistVersionReport
+    from danbooru.reports.forum_post_report import DanbooruForumPostReport
+    from danbooru.reports.note_version_report import DanbooruNoteVersionReport
+    from danbooru.reports.post_appeal_report import DanbooruPostAppealReport
+    from danbooru.reports.post_report import DanbooruPostReport
+    from danbooru.reports.wiki_page_version_report import DanbooruWikiPageVersionReport
+
+_modules = {
+    "DanbooruArtistVersionReport": "artist_version_report",
+    "DanbooruForumPostReport": "forum_post_report",
+    "DanbooruNoteVersionReport": "note_version_report",
+    "DanbooruPostAppealReport": "post_appeal_report",
+    "DanbooruPostReport": "post_report",
+    "DanbooruWikiPageVersionReport": "wiki_page_version_report",
+}
+
+__all__ = list(_modules)
+
+
+def __getattr__(name: str) -> Any:
+    if name == "_report_models":
+        value = [__getattr__(model_name) for model_name in __all__]
+    elif name in _modules:
+        module = importlib.import_module(f"{__name__}.{_modules[name]}")
+        value = getattr(module, name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
@@ -0,0 +1,176 @@
+"""Result collections returned by list requests, with columnar conversion for batch analytics."""
+
+from __future__ import annotations
+
+import datetime
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Generic, Self, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    import numpy as np
+    import pandas as pd
+    from scipy.sparse import csr_matrix
+
+    from danbooru.model import DanbooruModel
+
+T = TypeVar("T", bound="DanbooruModel")
+
+_SKIPPED_KEYS = frozenset(("session", "response"))
+
+
+def _require_numpy():  # noqa: ANN202
+    try:
+        import numpy as np
+    except ImportError as e:
+        e.add_note(">[danbooru-api]: Columnar conversion requires numpy. Install with `pip install danbooru[analytics]`.")
+        raise
+    return np
+
+
+def raw_data(model: DanbooruModel) -> dict[str, Any]:
+    """Return the unvalidated api data for a model, bypassing the attribute access overrides."""
+    return object.__getattribute__(model, "_raw_data")
+
+
+def _to_utc(value: str | datetime.datetime | None) -> datetime.datetime | None:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.UTC).replace(tzinfo=None)
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class TagMatrix:
+    """A sparse row-by-tag incidence matrix in CSR layout: row `i` has the tags `vocabulary[indices[indptr[i]:indptr[i+1]]]`."""
+
+    vocabulary: np.ndarray
+    indptr: np.ndarray
+    indices: np.ndarray
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """The (rows, tags) shape of the matrix."""
+        return (len(self.indptr) - 1, len(self.vocabulary))
+
+    def tag_counts(self) -> np.ndarray:
+        """Number of rows each tag in `vocabulary` appears in."""
+        np = _require_numpy()
+        return np.bincount(self.indices, minlength=len(self.vocabulary))
+
+    def rows_with(self, tag: str) -> np.ndarray:
+        """Return the indices of the rows containing a tag."""
+        np = _require_numpy()
+        matches = np.flatnonzero(self.vocabulary == tag)
+        if not len(matches):
+            return np.empty(0, dtype=np.int64)
+        entries = np.flatnonzero(self.indices == matches[0])
+        return np.searchsorted(self.indptr, entries, side="right") - 1
+
+    def to_scipy(self) -> csr_matrix:
+        """Convert to a `scipy.sparse.csr_matrix` of ones."""
+        np = _require_numpy()
+        from scipy.sparse import csr_matrix
+
+        data = np.ones(len(self.indices), dtype=np.int8)
+        return csr_matrix((data, self.indices, self.indptr), shape=self.shape)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[str | list[str] | None]) -> TagMatrix:
+        """Build the matrix from tag strings or tag lists, one per row."""
+        np = _require_numpy()
+
+        vocabulary: dict[str, int] = {}
+        intern = vocabulary.setdefault
+        indices: list[int] = []
+        indptr = [0]
+        for row in rows:
+            if row:
+                tags = row.split() if isinstance(row, str) else row
+                indices += [intern(tag, len(vocabulary)) for tag in tags]
+            indptr.append(len(indices))
+
+        return cls(
+            vocabulary=np.array(list(vocabulary), dtype=object),
+            indptr=np.array(indptr, dtype=np.int64),
+            indices=np.array(indices, dtype=np.int32),
+        )
+
+
+class DanbooruResults(list[T], Generic[T]):
+    """A list of models returned by the api, convertible to numpy columns for vectorized aggregations."""
+
+    def prefetch(self, *relations: str, max_workers: int = 4) -> Self:
+        """Resolve and attach related objects in batched requests. See `danbooru.prefetch.prefetch`."""
+        from danbooru.prefetch import prefetch
+
+        prefetch(self, *relations, max_workers=max_workers)
+        return self
+
+    def columns(self) -> list[str]:
+        """Return the scalar fields present in the api data."""
+        keys: dict[str, None] = {}
+        for model in self:
+            for key, value in raw_data(model).items():
+                if key not in _SKIPPED_KEYS and not isinstance(value, (dict, list)):
+                    keys[key] = None
+        return list(keys)
+
+    def to_arrays(self, *fields: str, tags: str | None = None) -> dict[str, np.ndarray | TagMatrix]:
+        """
+        Convert the results into numpy columns, read straight from the raw api data.
+
+        Fields ending in `_at` are converted into UTC `datetime64[ms]` columns, and integer columns with
+        missing values are promoted to float with `nan`. If `tags` names a tag field (`tag_string`, `added_tags`, ...)
+        it is returned under the same key as a `TagMatrix`. By default, every scalar field is converted, and
+        `tag_string` is used as the tag field if present.
+        """
+        np = _require_numpy()
+
+        fields = fields or tuple(self.columns())
+        rows = [raw_data(model) for model in self]
+
+        if tags is None and rows and "tag_string" in rows[0]:
+            tags = "tag_string"
+
+        arrays: dict[str, np.ndarray | TagMatrix] = {}
+        for field in fields:
+            if field == tags:
+                continue
+            values = [row.get(field) for row in rows]
+            arrays[field] = self._column(np, field, values)
+
+        if tags:
+            arrays[tags] = TagMatrix.from_rows(row.get(tags) for row in rows)
+
+        return arrays
+
+    def to_frame(self, *fields: str) -> pd.DataFrame:
+        """Convert the scalar fields of the results into a `pandas.DataFrame`."""
+        import pandas as pd
+
+        arrays = self.to_arrays(*fields, tags="")
+        return pd.DataFrame(arrays)
+
+    @staticmethod
+    def _column(np, field: str, values: list) -> np.ndarray:  # noqa: ANN001
+        if field.endswith("_at"):
+            return np.array([_to_utc(value) for value in values], dtype="datetime64[ms]")
+
+        present = [value for value in values if value is not None]
+        if present and all(isinstance(value, int) and not isinstance(value, bool) for value in present):
+            if len(present) == len(values):
+                return np.array(values, dtype=np.int64)
+            return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+
+        if present and all(isinstance(value, bool) for value in present) and len(present) == len(values):
+            return np.array(values, dtype=np.bool_)
+
+        if present and all(isinstance(value, float | int) for value in present):
+            return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+
+        return np.array(values, dtype=object)
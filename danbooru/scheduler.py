@@ -0,0 +1,109 @@
+"""
+Priority-aware scheduling of requests in front of the rate limiter.
+
+Every request takes a ticket; whenever the rate budget allows a request, the ticket with the highest priority
+goes first. Within a priority class, tickets of different flows (for example, two crawl jobs) are interleaved
+fairly instead of first-come-first-served, so one job queueing hundreds of requests can't starve another.
+
+    with session.priority(Priority.INTERACTIVE):
+        post = DanbooruPost.get_by_id(1234, session=session)
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import TYPE_CHECKING, Any, Protocol
+
+from danbooru.deadline import time_left
+from danbooru.exceptions import DeadlineExceededError
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Hashable
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    DEFAULT = 1
+    BACKGROUND = 2
+
+
+_current_priority: ContextVar[Priority] = ContextVar("_current_priority", default=Priority.DEFAULT)
+_current_flow: ContextVar[Hashable] = ContextVar("_current_flow", default=None)
+
+
+@contextmanager
+def request_priority(priority: Priority, flow: Hashable = None) -> Generator[None, None, None]:
+    """Run the requests made inside the block, in this thread or task, with a priority and an optional fairness flow."""
+    priority_token = _current_priority.set(priority)
+    flow_token = _current_flow.set(flow)
+    try:
+        yield
+    finally:
+        _current_flow.reset(flow_token)
+        _current_priority.reset(priority_token)
+
+
+class RateLimiter(Protocol):
+    def try_acquire(self, name: str, weight: int = 1) -> Any: ...
+
+
+class RequestScheduler:
+    def __init__(self, limiter: RateLimiter):
+        """Order access to `limiter` by priority class, with fair queuing between flows of the same class."""
+        self.limiter = limiter
+        self._condition = threading.Condition()
+        self._queue: list[tuple[int, float, int]] = []
+        self._sequence = itertools.count()
+        self._virtual_time: dict[int, float] = {}
+        self._flow_finish: dict[tuple[int, Hashable], float] = {}
+        self._dispatching = False
+
+    def acquire(self, priority: Priority | None = None, flow: Hashable = None) -> None:
+        """Block until it's this caller's turn and the rate limiter grants a request, or until the current deadline passes."""
+        priority = _current_priority.get() if priority is None else priority
+        flow = _current_flow.get() if flow is None else flow
+
+        with self._condition:
+            # start-time fair queuing: each flow advances its own virtual clock by one request
+            start = max(self._virtual_time.get(priority, 0.0), self._flow_finish.get((priority, flow), 0.0))
+            self._flow_finish[priority, flow] = start + 1
+            ticket = (int(priority), start, next(self._sequence))
+            heapq.heappush(self._queue, ticket)
+
+            try:
+                while self._dispatching or self._queue[0] != ticket:
+                    left = time_left()
+                    if left is not None and left <= 0:
+                        raise DeadlineExceededError
+                    self._condition.wait(left)
+            except BaseException:
+                # a ticket left behind at the head of the queue would block every other caller
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._condition.notify_all()
+                raise
+
+            heapq.heappop(self._queue)
+            self._virtual_time[priority] = start
+            self._dispatching = True
+
+        try:
+            self.limiter.try_acquire("request")
+        finally:
+            with self._condition:
+                self._dispatching = False
+                if not self._queue:
+                    self._flow_finish.clear()
+                    self._virtual_time.clear()
+                self._condition.notify_all()
+
+    @property
+    def queued(self) -> int:
+        """Number of requests waiting for their turn."""
+        with self._condition:
+            return len(self._queue)
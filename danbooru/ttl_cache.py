@@ -0,0 +1,77 @@
+"""A small thread-safe in-memory cache whose entries expire after a fixed time."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable, Iterable, Mapping
+
+
+class TTLCache[K: Hashable, V]:
+    def __init__(self, ttl: float, maxsize: int | None = None):
+        """Keep entries for `ttl` seconds, evicting the least recently stored ones beyond `maxsize`."""
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: K) -> bool:
+        return self.get_many((key,)) != {}
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire()
+            return len(self._entries)
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        """Return the value of a key if present and not expired."""
+        return self.get_many((key,)).get(key, default)
+
+    def get_many(self, keys: Iterable[K]) -> dict[K, V]:
+        """Return the present, unexpired values of several keys under a single lock."""
+        now = time.monotonic()
+        found: dict[K, V] = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                expires_at, value = entry
+                if expires_at <= now:
+                    del self._entries[key]
+                    continue
+                found[key] = value
+        return found
+
+    def set(self, key: K, value: V) -> None:
+        """Store a value, replacing any previous one."""
+        self.update({key: value})
+
+    def update(self, values: Mapping[K, V]) -> None:
+        """Store several values at once."""
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            for key, value in values.items():
+                self._entries[key] = (expires_at, value)
+                self._entries.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        # entries are stored in insertion order with a fixed ttl, so the expired ones are at the front
+        while self._entries:
+            key, (expires_at, _) = next(iter(self._entries.items()))
+            if expires_at > now:
+                break
+            del self._entries[key]
@@ -2,123 +2,141 @@
 
 from __future__ import annotations
 
-from pydantic import model_serializer, model_validator
-
-from danbooru.utils import BaseModel
-
-LEVEL_MAP = {
-    "ANONYMOUS": 0,
-    "RESTRICTED": 10,
-    "MEMBER": 20,
-    "GOLD": 30,
-    "PLATINUM": 31,
-    "BUILDER": 32,
-    "CONTRIBUTOR": 35,
-    "APPROVER": 37,
-    "MODERATOR": 40,
-    "ADMIN": 50,
-    "OWNER": 60,
-}
-
-
-class UserLevel(BaseModel):
-    number: int
-    name: str
-
-    def __init__(self, level: int | str | UserLevel | None = None, **data):  # noqa: D107
-        if level is not None:
-            super().__init__(level=level)
-        else:
-            super().__init__(**data)
-
-    @model_serializer
-    def serializer(self) -> int:
-        """Serialize the level as an int for DB and Peewee. Accepts both UserLevel and int."""
-        # If self is already an int (shouldn't happen, but for robustness)
-        if isinstance(self, int):
-            return self
-        # Normal case: UserLevel instance
-        return self.number
-
-    @model_validator(mode="before")
+from enum import Enum
+from typing import TYPE_CHECKING, Any
+
+from pydantic_core import core_schema
+
+if TYPE_CHECKING:
+    from pydantic import GetCoreSchemaHandler
+
+
+class UserLevel(Enum):
+    """
+    A Danbooru user level.
+
+    Levels are canonical singletons: `UserLevel(20)`, `UserLevel("member")` and `UserLevel.MEMBER` are the same object.
+    They compare and hash like their level number, and can be compared directly against ints and level names.
+    """
+
+    ANONYMOUS = 0
+    RESTRICTED = 10
+    MEMBER = 20
+    GOLD = 30
+    PLATINUM = 31
+    BUILDER = 32
+    CONTRIBUTOR = 35
+    APPROVER = 37
+    MODERATOR = 40
+    ADMIN = 50
+    OWNER = 60
+
+    @property
+    def number(self) -> int:
+        """The level number."""
+        return self._value_
+
     @classmethod
-    def validate_model(cls, level: int | str | dict | UserLevel) -> dict:
-        """Validate that the level is valid."""
-        # Accept dicts with "number" and "name" keys (from model_dump)
-        if isinstance(level, dict):
-            if "number" in level and "name" in level:
-                return {"number": level["number"], "name": level["name"]}
-            if "level" in level:
-                level = level["level"]
-            else:
-                e = f"{level} ({type(level)}): not an acceptable value."
-                raise TypeError(e)
-
-        # Accept int directly
-        if isinstance(level, int):
-            number = level
-            name = cls.name_from_number(number)
-            return {"number": number, "name": name}
-
-        # Accept str directly
-        if isinstance(level, str):
-            name = level.upper()
-            number = cls.number_from_name(name)
-            return {"number": number, "name": name}
-
-        # Accept UserLevel directly
-        if isinstance(level, UserLevel):
-            return {"number": level.number, "name": level.name}
+    def _missing_(cls, value: object) -> UserLevel | None:
+        if isinstance(value, str):
+            return _LEVELS_BY_NAME.get(value) or _LEVELS_BY_NAME.get(value.upper())
+        if isinstance(value, dict):
+            if "number" in value:
+                return cls(value["number"])
+            if "level" in value:
+                return cls(value["level"])
+        return None
 
+    @classmethod
+    def parse(cls, level: int | str | dict | UserLevel) -> UserLevel:
+        """Return the canonical level for a number, a name, a serialized dict or a level."""
+        if level.__class__ is cls:
+            return level  # type: ignore[return-value]
+        if isinstance(level, int | str | dict) and not isinstance(level, bool):
+            try:
+                return cls(level)
+            except ValueError:
+                pass
         e = f"{level} ({type(level)}): not an acceptable value."
-        raise TypeError(e)
+        raise ValueError(e)
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:  # noqa: ARG003
+        """Validate from a number, a name or a level, and serialize as the level number."""
+        return core_schema.no_info_plain_validator_function(
+            cls.parse,
+            serialization=core_schema.plain_serializer_function_ser_schema(lambda level: level._value_),
+        )
 
     @staticmethod
     def name_from_number(number: int) -> str:
-        """Return the level number from a name."""
+        """Return the level name from a number."""
         try:
-            number_index = list(LEVEL_MAP.values()).index(number)
-            name = list(LEVEL_MAP.keys())[number_index]
-        except (IndexError, ValueError) as e:
+            return _LEVELS_BY_NUMBER[number].name
+        except KeyError as e:
             msg = f"No level with number {number}."
             raise ValueError(msg) from e
-        else:
-            return name
 
     @staticmethod
     def number_from_name(name: str) -> int:
-        """Return the level name from a number."""
-        name = name.upper()
-        if name == "MOD":
-            name = "MODERATOR"
-        elif name == "CONTRIB":
-            name = "CONTRIBUTOR"
-
-        try:
-            number = LEVEL_MAP[name]
-        except KeyError as e:
-            msg = f"No level with name {name}."
-            raise ValueError(msg) from e
-        else:
-            return number
+        """Return the level number from a name."""
+        level = _LEVELS_BY_NAME.get(name) or _LEVELS_BY_NAME.get(name.upper())
+        if level is None:
+            msg = f"No level with name {name.upper()}."
+            raise ValueError(msg)
+        return level._value_
 
     def __lt__(self, level: int | UserLevel | str) -> bool:
-        return self.number < UserLevel(level).number
+        return self._value_ < _number_of(level)
 
     def __le__(self, level: int | UserLevel | str) -> bool:
-        return self.number <= UserLevel(level).number
+        return self._value_ <= _number_of(level)
 
     def __gt__(self, level: int | UserLevel | str) -> bool:
-        return self.number > UserLevel(level).number
+        return self._value_ > _number_of(level)
 
     def __ge__(self, level: int | UserLevel | str) -> bool:
-        return self.number >= UserLevel(level).number
+        return self._value_ >= _number_of(level)
 
-    def __eq__(self, level: int | UserLevel | str) -> bool:
-        return self.number == UserLevel(level=level).number
+    def __eq__(self, level: object) -> bool:
+        if level is self:
+            return True
+        try:
+            return self._value_ == _number_of(level)  # type: ignore[arg-type]
+        except ValueError:
+            return False
 
     def __hash__(self) -> int:
-        return hash(self.number)
+        return hash(self._value_)
 
     def __repr__(self) -> str:
-        return f"UserLevel[{self.name}]"
+        return f"UserLevel[{self._name_}]"
+
+
+LEVEL_MAP = {level.name: level.number for level in UserLevel}
+
+_LEVELS_BY_NUMBER: dict[int, UserLevel] = {level.number: level for level in UserLevel}
+
+_LEVELS_BY_NAME: dict[str, UserLevel] = {}
+for _level in UserLevel:
+    for _name in (_level.name, _level.name.lower(), _level.name.capitalize()):
+        _LEVELS_BY_NAME[_name] = _level
+for _alias, _level in (("MOD", UserLevel.MODERATOR), ("CONTRIB", UserLevel.CONTRIBUTOR)):
+    for _name in (_alias, _alias.lower(), _alias.capitalize()):
+        _LEVELS_BY_NAME[_name] = _level
+
+# comparisons resolve their right-hand side through one dict lookup, without building a level
+_NUMBERS_BY_KEY: dict[int | str, int] = {number: number for number in _LEVELS_BY_NUMBER}
+_NUMBERS_BY_KEY.update({name: level.number for name, level in _LEVELS_BY_NAME.items()})
+
+
+def _number_of(level: int | str | UserLevel) -> int:
+    if level.__class__ is UserLevel:
+        return level._value_  # type: ignore[union-attr]
+    try:
+        return _NUMBERS_BY_KEY[level]  # type: ignore[index]
+    except (KeyError, TypeError):
+        if isinstance(level, str) and (number := _NUMBERS_BY_KEY.get(level.upper())) is not None:
+            return number
+    e = f"{level} ({type(level)}): not an acceptable value."
+    raise ValueError(e)
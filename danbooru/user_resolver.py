@@ -0,0 +1,105 @@
+"""
+Batched resolution of usernames and user ids into users, with a long-lived cache.
+
+    resolver = UserResolver()
+    reports = DanbooruPostReport.get(...)
+    users = resolver.for_rows(reports, "uploader")  # a few requests for the whole report
+    levels = {name: user.level for name, user in users.items() if user}
+"""
+
+from __future__ import annotations
+
+from itertools import batched
+from typing import TYPE_CHECKING
+
+from danbooru import logger
+from danbooru.model import get_default_session
+from danbooru.prefetch import fetch_by_ids
+from danbooru.ttl_cache import TTLCache
+from danbooru.utils import ContextThreadPoolExecutor
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from danbooru.danbooru import Danbooru
+    from danbooru.model import DanbooruModel
+    from danbooru.models.user import DanbooruUser
+
+
+def normalize_name(name: str) -> str:
+    """Return the lookup key of a username: case-insensitive, with spaces as underscores."""
+    return name.strip().replace(" ", "_").lower()
+
+
+class UserResolver:
+    NAME_CHUNK_SIZE = 100
+    """Names per `search[name_lower_comma]` request, keeping urls well under server limits."""
+
+    def __init__(self, session: Danbooru | None = None, ttl: float = 86400.0, max_workers: int = 4):
+        """
+        Resolve users by name or id, caching them for `ttl` seconds.
+
+        Names and ids that don't match any user are cached as missing too, so they aren't looked up again.
+        """
+        self.session = session or get_default_session()
+        self.max_workers = max_workers
+        self.users: TTLCache[int, DanbooruUser | None] = TTLCache(ttl)
+        self.ids: TTLCache[str, int | None] = TTLCache(ttl)
+
+    def add(self, users: Iterable[DanbooruUser]) -> None:
+        """Cache users that were already fetched."""
+        users = list(users)
+        self.users.update({user.id: user for user in users})
+        self.ids.update({normalize_name(user.name): user.id for user in users})
+
+    def by_ids(self, user_ids: Iterable[int]) -> dict[int, DanbooruUser | None]:
+        """Return the users with the given ids, fetched in chunked `search[id]` requests when not cached."""
+        from danbooru.models.user import DanbooruUser
+
+        user_ids = list(dict.fromkeys(user_ids))
+        found = self.users.get_many(user_ids)
+        missing = [user_id for user_id in user_ids if user_id not in found]
+
+        if missing:
+            logger.trace(f"Resolving {len(missing)} of {len(user_ids)} users by id.")
+            fetched = fetch_by_ids(DanbooruUser, missing, session=self.session, max_workers=self.max_workers)
+            self.add(fetched.values())  # type: ignore[arg-type]
+            self.users.update({user_id: None for user_id in missing if user_id not in fetched})
+            found.update((user_id, fetched.get(user_id)) for user_id in missing)  # type: ignore[misc]
+
+        return {user_id: found[user_id] for user_id in user_ids}
+
+    def by_names(self, names: Iterable[str]) -> dict[str, DanbooruUser | None]:
+        """Return the users with the given names, keyed as passed, fetched in chunked `search[name_lower_comma]` requests."""
+        keys = {name: normalize_name(name) for name in names}
+
+        resolved: dict[str, DanbooruUser | None] = {}
+        known_ids = self.ids.get_many(set(keys.values()))
+        cached_users = self.users.get_many(user_id for user_id in known_ids.values() if user_id is not None)
+        for key, user_id in known_ids.items():
+            if user_id is None:
+                resolved[key] = None
+            elif user_id in cached_users:
+                resolved[key] = cached_users[user_id]
+
+        missing = [key for key in dict.fromkeys(keys.values()) if key not in resolved]
+        if missing:
+            logger.trace(f"Resolving {len(missing)} of {len(keys)} users by name.")
+            with ContextThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for users in executor.map(self._fetch_name_chunk, batched(missing, self.NAME_CHUNK_SIZE)):
+                    self.add(users)
+                    resolved.update((normalize_name(user.name), user) for user in users)
+
+            not_found = dict.fromkeys(key for key in missing if key not in resolved)
+            self.ids.update(not_found)
+            resolved.update(not_found)
+
+        return {name: resolved[key] for name, key in keys.items()}
+
+    def for_rows(self, rows: Iterable[DanbooruModel], field: str) -> dict[str, DanbooruUser | None]:
+        """Resolve the usernames found in a field of each row, such as the `uploader` column of a report."""
+        return self.by_names(name for row in rows if (name := getattr(row, field, None)))
+
+    def _fetch_name_chunk(self, names: tuple[str, ...]) -> list[DanbooruUser]:
+        from danbooru.models.user import DanbooruUser
+        return DanbooruUser.get(name_lower_comma=",".join(names), limit=len(names), session=self.session)
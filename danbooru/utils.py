@@ -1,6 +1,8 @@
 """Various utility methods are defined here."""
 
+import contextvars
 from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any
 
 from pydantic import BaseModel as _PydanticModel
@@ -16,6 +18,27 @@ class classproperty:
         return self.fget(owner)
 
 
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """A thread pool whose tasks run in a copy of the submitting context, so deadlines and request priorities carry over."""
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+class cached_classproperty(classproperty):
+    def __init__(self, func: Callable):
+        """A class property computed once per class, for metadata derived from the class itself."""
+        super().__init__(func)
+        self._values: dict[type, Any] = {}
+
+    def __get__(self, instance: Any, owner: Any):
+        try:
+            return self._values[owner]
+        except KeyError:
+            value = self._values[owner] = self.fget(owner)
+            return value
+
+
 class BaseModel(_PydanticModel):
     class Config:
         ignored_types = (classproperty, )
@@ -0,0 +1,143 @@
+"""
+Live change feeds: poll for new rows of one or more models without re-downloading what was already seen.
+
+    for comment in DanbooruComment.watch():
+        print(comment.id, comment.body)
+
+    feed = ChangeFeed().add(DanbooruPost, tags="kantai_collection").add(DanbooruForumPost)
+    async for item in feed:
+        ...
+
+Each model keeps a cursor on the last id it delivered and asks for `page=a<id>`, the rows created after it.
+Poll intervals shrink while a model is busy and grow while it's quiet, every model that is due is polled in
+the same cycle, and nothing is fetched while the consumer is still busy with the previous rows.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Self
+
+from danbooru import logger
+from danbooru.model import get_default_session
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator, Generator
+
+    from danbooru.danbooru import Danbooru
+    from danbooru.model import DanbooruInstancedModel
+
+
+class AdaptiveInterval:
+    def __init__(self, minimum: float = 5.0, maximum: float = 300.0, initial: float | None = None):
+        """A poll interval between `minimum` and `maximum` seconds, that follows how many new rows each poll finds."""
+        self.minimum = minimum
+        self.maximum = maximum
+        self.seconds = initial if initial is not None else minimum
+
+    def update(self, rows: int, full: bool) -> float:
+        """Adjust the interval after a poll that found `rows` new rows. A full page means there's a backlog to catch up on."""
+        if full:
+            self.seconds = 0.0
+        elif rows:
+            self.seconds = max(self.minimum, self.seconds / 2)
+        else:
+            self.seconds = min(self.maximum, max(self.minimum, self.seconds * 1.5))
+        return self.seconds
+
+
+@dataclass
+class _Watch:
+    model: type[DanbooruInstancedModel]
+    params: dict[str, Any]
+    last_id: int | None
+    interval: AdaptiveInterval
+    due_at: float = field(default=0.0)
+
+
+class ChangeFeed:
+    def __init__(self,
+                 session: Danbooru | None = None,
+                 limit: int | None = None,
+                 min_interval: float = 5.0,
+                 max_interval: float = 300.0,
+                 ):
+        """
+        A feed of new rows across the models added to it, iterable synchronously or with `async for`.
+
+        Rows are delivered in id order within each model. `limit` is the page size of each poll, by default the
+        maximum for the endpoint.
+        """
+        self.session = session or get_default_session()
+        self.limit = limit
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._watches: list[_Watch] = []
+        self._stop = threading.Event()
+
+    def add(self, model: type[DanbooruInstancedModel], since: int | None = None, **params) -> Self:
+        """
+        Watch a model, optionally filtered by search `params`.
+
+        Only rows newer than `since` are delivered; by default, rows newer than the latest one at the first poll.
+        """
+        interval = AdaptiveInterval(self.min_interval, self.max_interval)
+        self._watches.append(_Watch(model, params, since, interval))
+        return self
+
+    def stop(self) -> None:
+        """Stop the feed after the rows already fetched are delivered."""
+        self._stop.set()
+
+    def __iter__(self) -> Generator[DanbooruInstancedModel, None, None]:
+        while not self._stop.is_set():
+            due = self._due()
+            if not due:
+                self._stop.wait(self._seconds_until_due())
+                continue
+            for watch in due:
+                yield from self._poll(watch)
+
+    async def __aiter__(self) -> AsyncGenerator[DanbooruInstancedModel, None]:
+        while not self._stop.is_set():
+            due = self._due()
+            if not due:
+                # wake up at least every second to notice `stop()`
+                await asyncio.sleep(min(self._seconds_until_due(), 1.0))
+                continue
+            for watch in due:
+                for row in await asyncio.to_thread(self._poll, watch):
+                    yield row
+
+    def _due(self) -> list[_Watch]:
+        now = time.monotonic()
+        return [watch for watch in self._watches if watch.due_at <= now]
+
+    def _seconds_until_due(self) -> float:
+        if not self._watches:
+            raise ValueError("Nothing to watch. Add a model to the feed first.")
+        return max(0.0, min(watch.due_at for watch in self._watches) - time.monotonic())
+
+    def _poll(self, watch: _Watch) -> list[DanbooruInstancedModel]:
+        model = watch.model
+        limit = self.limit or (200 if model.generic_endpoint == "posts" else 1000)
+
+        if watch.last_id is None:
+            latest = model.get(limit=1, session=self.session, **watch.params)
+            watch.last_id = latest[0].id if latest else 0
+            logger.trace(f"Watching {model.generic_endpoint} after #{watch.last_id}.")
+            watch.due_at = time.monotonic() + watch.interval.seconds
+            return []
+
+        rows = model.get(page=f"a{watch.last_id}", limit=limit, session=self.session, **watch.params)
+        rows = sorted(rows, key=lambda row: row.id)
+        if rows:
+            watch.last_id = rows[-1].id
+
+        seconds = watch.interval.update(len(rows), full=len(rows) >= limit)
+        watch.due_at = time.monotonic() + seconds
+        logger.trace(f"Got {len(rows)} new {model.generic_endpoint}, up to #{watch.last_id}. Next poll in {seconds:.0f}s.")
+        return rows
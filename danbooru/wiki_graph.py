@@ -0,0 +1,180 @@
+"""
+A local index of the links between wiki pages, answering forward and reverse link queries for the whole wiki.
+
+    index = WikiLinkIndex.build()
+    index.links_to("hatsune_miku")
+    index.save("wiki_links.json.gz")
+
+    index = WikiLinkIndex.load("wiki_links.json.gz")
+    index.update()  # applies the wiki page versions created since the last build or update
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+from array import array
+from collections import defaultdict
+from pathlib import Path
+from typing import TYPE_CHECKING, Self
+
+from danbooru import logger
+from danbooru.model import get_default_session
+from danbooru.models.wiki_page import parse_linked_tags
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from danbooru.danbooru import Danbooru
+    from danbooru.models.wiki_page import DanbooruWikiPage
+    from danbooru.models.wiki_page_version import DanbooruWikiPageVersion
+
+
+class WikiLinkIndex:
+    def __init__(self):
+        """An empty index. Titles are interned to integers, and each page's outgoing links are stored as a compact int array."""
+        self._titles: list[str] = []
+        self._title_ids: dict[str, int] = {}
+
+        self._page_titles: dict[int, int] = {}  # wiki page id => title id, to follow renames
+        self._existing: set[int] = set()  # title ids of live wiki pages
+        self._forward: dict[int, array] = {}
+        self._reverse: defaultdict[int, set[int]] = defaultdict(set)
+
+        self.last_version_id = 0
+
+    def _intern(self, title: str) -> int:
+        title_id = self._title_ids.get(title)
+        if title_id is None:
+            title_id = self._title_ids[title] = len(self._titles)
+            self._titles.append(title)
+        return title_id
+
+    def _unlink(self, source: int) -> None:
+        for target in self._forward.pop(source, ()):
+            self._reverse[target].discard(source)
+
+    def _link(self, source: int, targets: Iterable[int]) -> None:
+        links = array("I", sorted(set(targets) - {source}))
+        self._forward[source] = links
+        for target in links:
+            self._reverse[target].add(source)
+
+    def set_page(self, wiki_page_id: int, title: str, body: str, is_deleted: bool = False) -> None:
+        """Add, replace, rename or delete a page in the index."""
+        title_id = self._intern(title)
+
+        previous = self._page_titles.get(wiki_page_id)
+        if previous is not None and previous != title_id:
+            self._unlink(previous)
+            self._existing.discard(previous)
+
+        self._page_titles[wiki_page_id] = title_id
+        self._unlink(title_id)
+
+        if is_deleted:
+            self._existing.discard(title_id)
+            return
+
+        self._existing.add(title_id)
+        self._link(title_id, map(self._intern, parse_linked_tags(body)))
+
+    def add_pages(self, pages: Iterable[DanbooruWikiPage | DanbooruWikiPageVersion]) -> None:
+        """Add wiki pages or wiki page versions to the index."""
+        for page in pages:
+            wiki_page_id = getattr(page, "wiki_page_id", None) or page.id
+            self.set_page(wiki_page_id, page.title, page.body, page.is_deleted)
+
+    def links_from(self, title: str) -> list[str]:
+        """Return the titles a page links to."""
+        title_id = self._title_ids.get(title)
+        if title_id is None:
+            return []
+        return [self._titles[target] for target in self._forward.get(title_id, ())]
+
+    def links_to(self, title: str) -> list[str]:
+        """Return the titles of the pages linking to a title."""
+        title_id = self._title_ids.get(title)
+        if title_id is None:
+            return []
+        return sorted(self._titles[source] for source in self._reverse.get(title_id, ()))
+
+    def dead_links(self) -> dict[str, list[str]]:
+        """Return `{page: [targets]}` for every link pointing to a title without a live wiki page."""
+        dead: dict[str, list[str]] = {}
+        for source, targets in self._forward.items():
+            missing = [self._titles[target] for target in targets if target not in self._existing]
+            if missing:
+                dead[self._titles[source]] = missing
+        return dead
+
+    def orphans(self) -> list[str]:
+        """Return the titles of live pages that no other page links to."""
+        return sorted(self._titles[title_id] for title_id in self._existing if not self._reverse.get(title_id))
+
+    def __len__(self) -> int:
+        return len(self._existing)
+
+    def __contains__(self, title: str) -> bool:
+        return self._title_ids.get(title) in self._existing
+
+    @classmethod
+    def build(cls, session: Danbooru | None = None) -> Self:
+        """Build the index by paging through every wiki page."""
+        from danbooru.models.wiki_page import DanbooruWikiPage
+        from danbooru.models.wiki_page_version import DanbooruWikiPageVersion
+
+        session = session or get_default_session()
+        index = cls()
+
+        # take the version cursor before paging, so edits made during the build are replayed by the next update
+        latest = DanbooruWikiPageVersion.get(limit=1, session=session)
+        index.last_version_id = latest[0].id if latest else 0
+
+        for page in DanbooruWikiPage.all_pages(session=session):
+            index.add_pages(page)
+            logger.trace(f"Indexed {len(index)} wiki pages.")
+
+        return index
+
+    def update(self, session: Danbooru | None = None) -> int:
+        """Apply the wiki page versions created since the last build or update, returning how many were applied."""
+        from danbooru.models.wiki_page_version import DanbooruWikiPageVersion
+
+        session = session or get_default_session()
+        versions = DanbooruWikiPageVersion.get_all(id_gt=self.last_version_id, session=session)
+        versions = sorted({version.id: version for version in versions}.values(), key=lambda version: version.id)
+
+        self.add_pages(versions)
+        if versions:
+            self.last_version_id = versions[-1].id
+        logger.trace(f"Applied {len(versions)} wiki page versions, up to #{self.last_version_id}.")
+        return len(versions)
+
+    def save(self, path: str | Path) -> None:
+        """Write the index to a gzipped json file."""
+        data = {
+            "last_version_id": self.last_version_id,
+            "titles": self._titles,
+            "pages": {str(wiki_page_id): title_id for wiki_page_id, title_id in self._page_titles.items()},
+            "existing": sorted(self._existing),
+            "forward": {str(source): targets.tolist() for source, targets in self._forward.items()},
+        }
+        with gzip.open(Path(path), "wt", encoding="utf-8") as file:
+            json.dump(data, file, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str | Path) -> Self:
+        """Read an index written by `save`."""
+        with gzip.open(Path(path), "rt", encoding="utf-8") as file:
+            data = json.load(file)
+
+        index = cls()
+        index.last_version_id = data["last_version_id"]
+        index._titles = data["titles"]
+        index._title_ids = {title: title_id for title_id, title in enumerate(index._titles)}
+        index._page_titles = {int(wiki_page_id): title_id for wiki_page_id, title_id in data["pages"].items()}
+        index._existing = set(data["existing"])
+        for source, targets in data["forward"].items():
+            index._link(int(source), targets)
+        return index
@@ -0,0 +1,121 @@
+from types import SimpleNamespace
+
+import pytest
+
+from danbooru.bur_script import BURCommand, BURImpactEstimator, BURScriptError, parse_script
+from danbooru.danbooru import Danbooru
+
+GENERAL, CHARACTER = 0, 4
+TAGS = {
+    "old": (100, GENERAL, False),
+    "new": (5, GENERAL, False),
+    "cat_ears": (300, GENERAL, False),
+    "animal_ears": (900, GENERAL, False),
+    "other": (1, GENERAL, True),
+    "thing": (3, CHARACTER, False),
+}
+
+
+class FakeEstimator(BURImpactEstimator):
+    def __init__(self):
+        super().__init__(session=Danbooru(), cache=False)
+        self.tag_requests: list[tuple[str, ...]] = []
+        self.searches: list[str] = []
+        self.counter._fetch_tag_chunk = self._fetch_tag_chunk  # type: ignore[method-assign]
+        self.counter._fetch_count = self._fetch_count  # type: ignore[method-assign]
+
+    def _fetch_tag_chunk(self, names):  # noqa: ANN001, ANN202
+        self.tag_requests.append(names)
+        tags = {name: TAGS.get(name, (1, GENERAL, False)) for name in names if not name.startswith("missing_")}
+        return [SimpleNamespace(name=name, post_count=count, category=category, is_deprecated=is_deprecated)
+                for name, (count, category, is_deprecated) in tags.items()]
+
+    def _fetch_count(self, query):  # noqa: ANN001, ANN202
+        self.searches.append(query)
+        return query, 42
+
+
+def test_parse_script() -> None:
+    script = """
+        create alias Dangogo99 -> dangogo
+        imply cat_ears -> animal_ears
+        unalias a -> b
+        remove implication c -> d
+        rename old_name -> new_name
+        mass update 1girl solo -> 1girl -solo
+        category some_artist -> artist
+        nuke bad_tag
+        deprecate old_tag
+        undeprecate old_tag
+        category foo -> art
+        category Some_Show -> COPY
+    """
+
+    assert parse_script(script) == [
+        BURCommand("create_alias", "dangogo99", "dangogo", 2),
+        BURCommand("create_implication", "cat_ears", "animal_ears", 3),
+        BURCommand("remove_alias", "a", "b", 4),
+        BURCommand("remove_implication", "c", "d", 5),
+        BURCommand("rename", "old_name", "new_name", 6),
+        BURCommand("mass_update", "1girl solo", "1girl -solo", 7),
+        BURCommand("change_category", "some_artist", "artist", 8),
+        BURCommand("nuke", "bad_tag", None, 9),
+        BURCommand("deprecate", "old_tag", None, 10),
+        BURCommand("undeprecate", "old_tag", None, 11),
+        BURCommand("change_category", "foo", "artist", 12),
+        BURCommand("change_category", "some_show", "copyright", 13),
+    ]
+
+
+def test_command_tags() -> None:
+    alias, update = parse_script("alias a -> b\nupdate a -b ~c rating:g -> d")
+
+    assert alias.tags == ["a", "b"]
+    assert update.tags == ["a", "b", "c", "d"]
+
+
+def test_invalid_line() -> None:
+    with pytest.raises(BURScriptError) as excinfo:
+        parse_script("alias a -> b\nalias a b")
+
+    assert excinfo.value.line_number == 2
+
+
+def test_impact_estimation() -> None:
+    estimator = FakeEstimator()
+    burs = [
+        SimpleNamespace(id=1, script="alias old -> new\nimply cat_ears -> animal_ears\nupdate 1girl solo -> 1girl -solo\nnuke missing_tag"),
+        SimpleNamespace(id=2, script="alias old -> other\nimply new -> thing\nalias thing -> thing"),
+        SimpleNamespace(id=3, script="imply old -> animal_ears"),
+        SimpleNamespace(id=4, script="alias a -> b\nnot a command"),
+    ]
+
+    impacts = estimator.estimate(burs)
+
+    assert [command.affected_posts for command in impacts[1].commands] == [100, 300, 42, 0]
+    assert impacts[1].affected_posts == 442
+    assert estimator.searches == ["1girl solo"]
+    assert impacts[1].issues == [
+        "line 4 (nuke): 'missing_tag' does not exist.",
+        "'old' is aliased differently by other requests: #2 -> other.",
+    ]
+    assert impacts[2].issues == [
+        "line 1 (create_alias): 'other' is deprecated.",
+        "line 2 (create_implication): 'new' and 'thing' are in different categories.",
+        "line 3 (create_alias): 'thing' points to itself.",
+        "'old' is aliased differently by other requests: #1 -> new.",
+    ]
+    assert impacts[3].issues == ["'old' is aliased away by #1, #2."]
+    assert impacts[4].commands == []
+    assert len(impacts[4].issues) == 1
+
+
+def test_tags_are_resolved_in_chunks() -> None:
+    estimator = FakeEstimator()
+    script = "\n".join(f"alias tag_{n} -> tag_{n + 1}" for n in range(0, 250, 2))
+
+    estimator.estimate([SimpleNamespace(id=1, script=script)])
+    assert sorted(len(chunk) for chunk in estimator.tag_requests) == [50, 100, 100]
+
+    estimator.estimate([SimpleNamespace(id=2, script="alias tag_0 -> tag_1\nalias tag_250 -> tag_251")])
+    assert estimator.tag_requests[3:] == [("tag_250", "tag_251")]
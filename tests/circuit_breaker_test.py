@@ -0,0 +1,55 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from danbooru.circuit_breaker import CircuitBreaker, CircuitState
+from danbooru.exceptions import CircuitOpenError, DanbooruRateLimitError, DownbooruError
+
+
+def make_error(error_class: type = DownbooruError) -> Exception:
+    return error_class(MagicMock(), error_type="Downbooru", error_message="The site is down for maintenance.")
+
+
+def test_opens_after_threshold_and_fails_fast() -> None:
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60, block=False)
+
+    breaker.record_failure(make_error())
+    assert breaker.state == CircuitState.CLOSED
+    breaker.record_failure(make_error())
+    assert breaker.state == CircuitState.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+
+def test_rate_limit_opens_immediately() -> None:
+    breaker = CircuitBreaker(failure_threshold=5, rate_limit_timeout=60, block=False)
+    breaker.record_failure(make_error(DanbooruRateLimitError))
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_single_half_open_probe() -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05, block=False)
+    breaker.record_failure(make_error())
+    time.sleep(0.06)
+
+    breaker.before_request()
+    assert breaker.state == CircuitState.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    breaker.before_request()
+
+
+def test_failed_probe_reopens() -> None:
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+    for _ in range(3):
+        breaker.record_failure(make_error())
+    time.sleep(0.06)
+
+    breaker.before_request()
+    breaker.record_failure(make_error())
+    assert breaker.state == CircuitState.OPEN
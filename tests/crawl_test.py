@@ -0,0 +1,116 @@
+import sqlite3
+import time
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+
+from benchmarks.fixtures import make_posts
+from benchmarks.stub_server import StubServer
+from danbooru.crawl import CrawlCoordinator, SharedRateBudget, SQLiteWorkQueue, split_id_range
+from danbooru.danbooru import Danbooru
+from danbooru.models.post import DanbooruPost
+
+IDS = [1, 2, 3, 5, 8, 13, 21, 22, 23, 24, 25]
+
+
+@pytest.fixture
+def server() -> Generator[StubServer, None, None]:
+    with StubServer({"posts": [post for post in make_posts(max(IDS)) if post["id"] in IDS]}) as server:
+        server.requests = []  # type: ignore[attr-defined]
+        respond = server.respond
+
+        def recording_respond(endpoint: str, params: dict[str, str]) -> tuple[int, list | dict]:
+            server.requests.append(params)  # type: ignore[attr-defined]
+            return respond(endpoint, params)
+
+        server.respond = recording_respond  # type: ignore[method-assign]
+        yield server
+
+
+@pytest.fixture
+def coordinator(server: StubServer, tmp_path: Path) -> CrawlCoordinator:
+    """Crawl the posts in ranges of 10 ids and pages of 3 posts, under a rate budget shared through the queue's file."""
+    session = Danbooru(base_url=server.base_url, limiter=SharedRateBudget(tmp_path / "crawl.sqlite", requests=1000))
+    return CrawlCoordinator(DanbooruPost, SQLiteWorkQueue(tmp_path / "crawl.sqlite"), params={"limit": 3}, chunk_size=10, session=session)
+
+
+def test_split_id_range() -> None:
+    assert split_id_range(1, 25, 10) == [(16, 25), (6, 15), (1, 5)]
+    assert split_id_range(1, 10, 10) == [(1, 10)]
+
+
+def test_workers_share_the_queue(coordinator: CrawlCoordinator) -> None:
+    assert coordinator.plan() == 3
+    assert coordinator.plan() == 0
+
+    first = coordinator.pages(worker="first")
+    page = next(first)
+    assert [row.id for row in page] == [25, 24, 23]
+
+    seen = [row.id for page in coordinator.pages(worker="second") for row in page]
+    assert seen == [13, 8, 5, 3, 2, 1]  # the range held by the first worker is left alone
+
+    seen = [row.id for page in first for row in page]
+    assert seen == [22, 21]
+    assert coordinator.progress() == {"pending": 0, "leased": 0, "done": 3, "failed": 0, "rows": len(IDS)}
+
+
+def test_ranges_are_searched_by_id(server: StubServer, coordinator: CrawlCoordinator, tmp_path: Path) -> None:
+    coordinator.plan()
+    list(coordinator.pages())
+
+    searches = [(params["tags"], params["page"]) for params in server.requests[1:]]  # type: ignore[attr-defined]
+    assert searches == [("id:16..25", "b26"), ("id:16..25", "b23"), ("id:6..15", "b16"), ("id:1..5", "b6"), ("id:1..5", "b2")]
+
+    with sqlite3.connect(tmp_path / "crawl.sqlite") as db:
+        (spent,) = db.execute("SELECT COUNT(*) FROM rate_budget").fetchone()
+    assert spent == len(server.requests)  # type: ignore[attr-defined]
+
+
+def test_expired_leases_resume_from_the_checkpoint(coordinator: CrawlCoordinator) -> None:
+    coordinator.plan()
+
+    crashed = coordinator.pages(worker="crashed", lease_seconds=0.01)
+    next(crashed)
+    next(crashed)  # checkpoints the first page
+    time.sleep(0.02)
+
+    seen = [row.id for page in coordinator.pages(worker="other") for row in page]
+    assert seen == [22, 21, 13, 8, 5, 3, 2, 1]
+
+    assert list(crashed) == []  # the lease was lost, and there is nothing left to do
+    assert coordinator.progress()["done"] == 3
+
+
+def test_closed_workers_release_their_task(coordinator: CrawlCoordinator) -> None:
+    coordinator.plan()
+
+    worker = coordinator.pages(worker="stopped")
+    next(worker)
+    worker.close()
+    assert coordinator.progress()["pending"] == 3
+
+
+def test_expired_leases_on_the_last_attempt_fail(tmp_path: Path) -> None:
+    queue = SQLiteWorkQueue(tmp_path / "crawl.sqlite", max_attempts=1)
+    queue.put("job", [(1, 10)])
+
+    assert queue.lease("job", "crashed", seconds=0.01)
+    time.sleep(0.02)
+
+    assert queue.lease("job", "other", seconds=60) is None
+    assert queue.progress("job") == {"pending": 0, "leased": 0, "done": 0, "failed": 1, "rows": 0}
+
+
+def test_shared_rate_budget(tmp_path: Path) -> None:
+    first = SharedRateBudget(tmp_path / "crawl.sqlite", requests=3, per=0.2)
+    second = SharedRateBudget(tmp_path / "crawl.sqlite", requests=3, per=0.2)
+
+    started = time.monotonic()
+    for budget in (first, second, first):
+        budget.try_acquire()
+    assert time.monotonic() - started < 0.1
+
+    second.try_acquire()
+    assert time.monotonic() - started >= 0.2
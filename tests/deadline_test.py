@@ -0,0 +1,81 @@
+import time
+
+import pytest
+from pyrate_limiter import Duration, Limiter, Rate
+from requests import Request, Response
+from requests.exceptions import ReadTimeout
+
+from danbooru.danbooru import DEFAULT_TIMEOUT, Danbooru
+from danbooru.deadline import cap_timeout, deadline, time_left
+from danbooru.exceptions import DeadlineExceededError
+from danbooru.utils import ContextThreadPoolExecutor
+
+
+def make_session(stalled: bool, **kwargs) -> tuple[Danbooru, list]:
+    """A session whose requests record their timeout, then stall or return an empty page."""
+    session = Danbooru(base_url="http://localhost", limiter=Limiter(Rate(100, Duration.SECOND)), **kwargs)
+    timeouts = []
+
+    def request(method: str, url: str, timeout: tuple[float, float] | None, **_kwargs) -> Response:
+        timeouts.append(timeout)
+        if stalled:
+            raise ReadTimeout
+        response = Response()
+        response.status_code = 200
+        response._content = b"[]"
+        response.request = Request(method, url).prepare()
+        return response
+
+    session._session.request = request  # type: ignore[method-assign]
+    return session, timeouts
+
+
+def test_nested_deadlines_never_extend() -> None:
+    assert time_left() is None
+    assert cap_timeout(DEFAULT_TIMEOUT) == DEFAULT_TIMEOUT
+
+    with deadline(1):
+        with deadline(100):
+            assert time_left() <= 1  # type: ignore[operator]
+        assert max(cap_timeout(DEFAULT_TIMEOUT)) <= 1  # type: ignore[arg-type]
+        assert max(cap_timeout(None)) <= 1  # type: ignore[arg-type]
+
+    assert time_left() is None
+
+
+def test_deadline_bounds_retries() -> None:
+    session, timeouts = make_session(stalled=True)
+
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceededError) as error:
+        session.danbooru_request("GET", "posts", deadline=0.5)
+
+    assert time.monotonic() - started < 1.5  # instead of 1 + 2 + 4 + 8 seconds of backoff
+    assert isinstance(error.value.last_error, ReadTimeout)
+    assert max(timeouts[0]) <= 0.5
+
+
+def test_timeouts() -> None:
+    session, timeouts = make_session(stalled=False, timeout=3)
+
+    session.danbooru_request("GET", "posts")
+    session.danbooru_request("GET", "posts", timeout=(1, 2))
+    session.timeout = None
+    session.danbooru_request("GET", "posts")
+
+    assert timeouts == [3, (1, 2), None]
+
+
+def test_batched_helpers_inherit_the_deadline() -> None:
+    from danbooru.hydration import fetch_posts
+
+    session, timeouts = make_session(stalled=False)
+    fetch_posts([1, 2, 3], session=session)
+    assert timeouts == [DEFAULT_TIMEOUT]
+
+    with deadline(5):
+        fetch_posts([1, 2, 3], session=session)
+    assert max(timeouts[1]) <= 5
+
+    with deadline(5), ContextThreadPoolExecutor() as executor:
+        assert executor.submit(time_left).result() is not None
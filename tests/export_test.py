@@ -0,0 +1,135 @@
+import gzip
+import json
+import sys
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+from pyrate_limiter import Duration, Limiter, Rate
+
+from benchmarks.fixtures import default_fixtures, make_posts
+from benchmarks.stub_server import StubServer
+from danbooru import logger
+from danbooru.cli import main
+from danbooru.danbooru import Danbooru
+from danbooru.exceptions import DanbooruHTTPError, ExportMismatchError
+from danbooru.export import Exporter
+from danbooru.models.post import DanbooruPost
+
+SERVER_ERROR = {"success": False, "error": "Exception", "message": "Something went wrong.", "backtrace": []}
+
+
+@pytest.fixture
+def server() -> Generator[StubServer, None, None]:
+    with StubServer(default_fixtures(rows=450)) as server:
+        yield server
+
+
+@pytest.fixture
+def session(server: StubServer) -> Danbooru:
+    return Danbooru(base_url=server.base_url, limiter=Limiter(Rate(1000, Duration.SECOND)))
+
+
+@pytest.fixture
+def restore_logging() -> Generator[None, None, None]:
+    """The command line replaces the log handlers."""
+    yield
+    logger.remove()
+    logger.add(sys.stderr)
+
+
+def read_ids(output: Path) -> list[int]:
+    ids = []
+    for path in sorted(output.glob("part-*.ndjson.gz")):
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            ids += [json.loads(line)["id"] for line in file]
+    return ids
+
+
+def test_files_rotate(session: Danbooru, tmp_path: Path) -> None:
+    checkpoint = Exporter(DanbooruPost, tmp_path, rows_per_file=200, session=session).run()
+
+    assert checkpoint == {"endpoint": "posts", "params": {}, "format": "ndjson", "cursor": "b51", "files": 3, "rows": 450, "done": True}
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "checkpoint.json", "part-00000.ndjson.gz", "part-00001.ndjson.gz", "part-00002.ndjson.gz",
+    ]
+    assert read_ids(tmp_path) == list(range(450, 0, -1))
+
+
+def test_parquet_parts_share_one_schema(tmp_path: Path) -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+    posts = make_posts(450)
+    for post in posts:
+        # null on the whole first page, set on the second one
+        post["approver_id"] = post["id"] if post["id"] < 200 else None
+        post["last_noted_at"] = post["created_at"] if post["id"] < 200 else None
+        post["pixiv_id"] = post["id"] if post["id"] < 200 else None
+
+    with StubServer({"posts": posts}) as server:
+        session = Danbooru(base_url=server.base_url, limiter=Limiter(Rate(1000, Duration.SECOND)))
+        Exporter(DanbooruPost, tmp_path, file_format="parquet", rows_per_file=150, session=session).run()
+
+    tables = [pq.read_table(path) for path in sorted(tmp_path.glob("part-*.parquet"))]
+    assert len(tables) == 3
+    assert all(table.schema == tables[0].schema for table in tables)
+    assert str(tables[0].schema.field("approver_id").type) == "int64"
+    assert str(tables[0].schema.field("last_noted_at").type) == "string"
+    assert tables[2].column("pixiv_id").to_pylist() == list(range(150, 0, -1))
+    assert tables[0].column("tag_string").to_pylist() == [post["tag_string"] for post in posts[:-151:-1]]
+
+
+def test_interrupted_exports_resume(server: StubServer, session: Danbooru, tmp_path: Path) -> None:
+    respond = server.respond
+
+    def failing_respond(endpoint: str, params: dict[str, str]) -> tuple[int, list | dict]:
+        if params.get("page") == "b251":
+            return 422, SERVER_ERROR
+        return respond(endpoint, params)
+
+    server.respond = failing_respond  # type: ignore[method-assign]
+    with pytest.raises(DanbooruHTTPError):
+        Exporter(DanbooruPost, tmp_path, rows_per_file=150, session=session).run()
+
+    checkpoint = json.loads((tmp_path / "checkpoint.json").read_text())
+    assert (checkpoint["files"], checkpoint["rows"], checkpoint["cursor"], checkpoint["done"]) == (1, 150, "b301", False)
+
+    server.respond = respond  # type: ignore[method-assign]
+    checkpoint = Exporter(DanbooruPost, tmp_path, rows_per_file=150, session=session).run()
+
+    assert (checkpoint["files"], checkpoint["rows"]) == (3, 450)
+    assert read_ids(tmp_path) == list(range(450, 0, -1))  # no row is missing or written twice
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+@pytest.mark.usefixtures("restore_logging")
+def test_cli(server: StubServer, tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+    main(["--base-url", server.base_url, "export", "posts", "tags=solo", "--only", "id,tag_string", "-o", str(tmp_path)])
+
+    checkpoint = json.loads((tmp_path / "checkpoint.json").read_text())
+    assert checkpoint["params"] == {"tags": "solo", "only": "id,tag_string"}
+    assert read_ids(tmp_path) == list(range(450, 0, -1))
+
+    with pytest.raises(SystemExit):
+        main(["--base-url", server.base_url, "export", "posts", "tags=touhou", "-o", str(tmp_path)])
+    assert "holds an export with different arguments" in capsys.readouterr().err
+
+    with pytest.raises(SystemExit):
+        main(["--base-url", server.base_url, "export", "posts", "tags", "-o", str(tmp_path)])
+    assert "Search params must look like key=value" in capsys.readouterr().err
+
+
+def test_checkpoint_mismatch(session: Danbooru, tmp_path: Path) -> None:
+    Exporter(DanbooruPost, tmp_path, params={"tags": "solo"}, session=session).run()
+
+    with pytest.raises(ExportMismatchError):
+        Exporter(DanbooruPost, tmp_path, params={"tags": "touhou"}, session=session).run()
+
+
+@pytest.mark.usefixtures("restore_logging")
+def test_cli_keeps_other_errors(server: StubServer, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    def broken_run(_self: Exporter) -> None:
+        raise ValueError("Not a usage error.")
+
+    monkeypatch.setattr(Exporter, "run", broken_run)
+    with pytest.raises(ValueError, match="Not a usage error."):
+        main(["--base-url", server.base_url, "export", "posts", "-o", str(tmp_path)])
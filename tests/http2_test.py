@@ -0,0 +1,42 @@
+import pytest
+import requests
+
+from danbooru.http2 import HTTP2Adapter
+
+httpx = pytest.importorskip("httpx")
+
+
+def make_session(handler) -> requests.Session:  # noqa: ANN001
+    session = requests.Session()
+    session.mount("https://", HTTP2Adapter(httpx.Client(transport=httpx.MockTransport(handler))))
+    return session
+
+
+def test_responses_are_converted() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(404, json={"success": False}, headers={"X-Rate-Limit": "{}"})
+
+    response = make_session(handler).get("https://danbooru.donmai.us/posts/1.json", timeout=(1, 2))
+
+    assert response.status_code == 404
+    assert response.json() == {"success": False}
+    assert response.headers["X-Rate-Limit"] == "{}"
+    assert response.headers["Content-Length"] == str(len(response.content))
+    assert response.url == "https://danbooru.donmai.us/posts/1.json"
+
+
+def test_cookies_are_kept() -> None:
+    sent_cookies = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent_cookies.append(request.headers.get("Cookie"))
+        return httpx.Response(200, json=[], headers=[("Set-Cookie", "_danbooru2_session=abc; path=/"),
+                                                     ("Set-Cookie", "theme=dark; path=/")])
+
+    session = make_session(handler)
+    response = session.get("https://danbooru.donmai.us/posts.json")
+    session.get("https://danbooru.donmai.us/posts.json")
+
+    assert response.cookies.get_dict() == {"_danbooru2_session": "abc", "theme": "dark"}
+    assert session.cookies.get_dict() == {"_danbooru2_session": "abc", "theme": "dark"}
+    assert sent_cookies[1] == "_danbooru2_session=abc; theme=dark"
@@ -0,0 +1,75 @@
+from collections.abc import Generator
+
+import pytest
+from pyrate_limiter import Duration, Limiter, Rate
+
+from benchmarks.fixtures import make_posts
+from benchmarks.stub_server import StubServer
+from danbooru.danbooru import Danbooru
+from danbooru.hydration import fetch_posts, hydrate_post_collections, iter_post_chunks
+from danbooru.models.pool import DanbooruPool
+
+TIMESTAMP = "2024-01-01T00:00:00.000-05:00"
+MEMBERS = [(1, [300, 5, 250, 5, 9999, 42]), (2, [42, 7, 300])]
+
+
+def make_pool(pool_id: int, post_ids: list[int]) -> dict:
+    return {"id": pool_id, "name": f"pool_{pool_id}", "description": "", "is_active": True, "is_deleted": False, "category": "series",
+            "post_count": len(post_ids), "post_ids": post_ids, "created_at": TIMESTAMP, "updated_at": TIMESTAMP}
+
+
+@pytest.fixture
+def server() -> Generator[StubServer, None, None]:
+    with StubServer({"posts": make_posts(450), "pools": [make_pool(*members) for members in MEMBERS]}) as server:
+        server.requests = []  # type: ignore[attr-defined]
+        respond = server.respond
+
+        def recording_respond(endpoint: str, params: dict[str, str]) -> tuple[int, list | dict]:
+            if endpoint == "posts":
+                ids = next(tag.removeprefix("id:") for tag in params["tags"].split() if tag.startswith("id:"))
+                server.requests.append([int(post_id) for post_id in ids.split(",")])  # type: ignore[attr-defined]
+            return respond(endpoint, params)
+
+        server.respond = recording_respond  # type: ignore[method-assign]
+        yield server
+
+
+@pytest.fixture
+def session(server: StubServer) -> Danbooru:
+    return Danbooru(base_url=server.base_url, limiter=Limiter(Rate(1000, Duration.SECOND)))
+
+
+def test_fetch_posts_in_chunks(server: StubServer, session: Danbooru) -> None:
+    ids = [*range(450, 0, -1), 450, 9999]
+
+    posts = fetch_posts(ids, session=session)
+
+    assert sorted(posts) == list(range(1, 451))  # duplicates fetched once, missing ids left out
+    assert sorted(len(chunk) for chunk in server.requests) == [51, 200, 200]  # type: ignore[attr-defined]
+    assert [list(chunk) for chunk in iter_post_chunks([3, 2, 1], session=session, known={2: posts[2]})] == [[3, 1]]
+
+
+def test_known_posts_are_reused(server: StubServer, session: Danbooru) -> None:
+    known = fetch_posts([1, 2], session=session)
+
+    posts = fetch_posts([3, 2, 1], session=session, known=known)
+
+    assert posts[1] is known[1]
+    assert server.requests == [[1, 2], [3]]  # type: ignore[attr-defined]
+
+
+def test_collections(server: StubServer, session: Danbooru) -> None:
+    pools = sorted(DanbooruPool.get(session=session), key=lambda pool: pool.id)
+
+    posts = hydrate_post_collections(pools)
+
+    assert sorted(posts) == [5, 7, 42, 250, 300]
+    assert sorted(post_id for chunk in server.requests for post_id in chunk) == [5, 7, 42, 250, 300, 9999]  # type: ignore[attr-defined]
+
+    server.requests.clear()  # type: ignore[attr-defined]
+    assert [post.id for post in pools[0].posts(known=posts)] == [300, 5, 250, 5, 42]
+    assert [post.id for post in pools[1].iter_posts(known=posts)] == [42, 7, 300]
+    # only the missing post is asked for again
+    assert server.requests == [[9999]]  # type: ignore[attr-defined]
+
+    assert [post.id for post in pools[0].iter_posts(max_workers=1)] == [300, 5, 250, 5, 42]
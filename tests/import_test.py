@@ -0,0 +1,31 @@
+import subprocess
+import sys
+
+HEAVY_MODULES = ["backoff", "dotenv", "inflection", "pydantic", "pyrate_limiter", "requests", "requests_cache"]
+
+
+def loaded_modules(statement: str) -> list[str]:
+    code = f"import sys; {statement}; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return output.split()
+
+
+def test_import_is_lazy() -> None:
+    assert loaded_modules("import danbooru") == []
+
+
+def test_model_import_skips_session_stack() -> None:
+    loaded = loaded_modules("from danbooru import DanbooruPost")
+
+    assert "pydantic" in loaded
+    assert "requests_cache" not in loaded
+    assert "backoff" not in loaded
+    assert "dotenv" not in loaded
+
+
+def test_session_import_skips_cache_stack() -> None:
+    loaded = loaded_modules("from danbooru import Danbooru")
+
+    assert "requests" in loaded
+    assert "requests_cache" not in loaded
+    assert "dotenv" not in loaded
@@ -0,0 +1,97 @@
+import pytest
+from pyrate_limiter import Duration, Limiter, Rate
+from requests.exceptions import ConnectionError as RequestsConnectionError
+
+from danbooru.danbooru import Danbooru
+from danbooru.instrumentation import Hooks, MetricsCollector, OpenTelemetryExporter
+
+
+class FakeInstrument:
+    def __init__(self):
+        self.calls: list[tuple[float, dict | None]] = []
+
+    def add(self, amount: float, attributes: dict | None = None) -> None:
+        self.calls.append((amount, attributes))
+
+    record = add
+
+
+class FakeMeter:
+    def __init__(self):
+        """Stand in for an `opentelemetry.metrics.Meter`, keeping the instruments by name."""
+        self.instruments: dict[str, FakeInstrument] = {}
+
+    def create_counter(self, name: str, **_kwargs) -> FakeInstrument:
+        return self.instruments.setdefault(name, FakeInstrument())
+
+    create_histogram = create_counter
+
+
+def emit_events(hooks: Hooks) -> None:
+    hooks.emit("request_end", method="GET", endpoint="posts/123", status_code=200, duration=0.5, cached=False, error=False)
+    hooks.emit("request_end", method="GET", endpoint="posts/456", status_code=500, duration=1.5, cached=False, error=True)
+    hooks.emit("cache_hit", method="GET", endpoint="posts")
+    hooks.emit("cache_miss", method="GET", endpoint="posts")
+    hooks.emit("rate_limit_wait", method="GET", endpoint="posts", duration=0.25)
+    hooks.emit("retry", target=None, tries=1, wait=1.0, exception=TimeoutError())
+    hooks.emit("parse", endpoint="https://danbooru.donmai.us/posts.json?limit=2", duration=0.1, rows=2)
+
+
+def test_failed_requests_are_reported() -> None:
+    session = Danbooru(base_url="http://localhost", limiter=Limiter(Rate(100, Duration.SECOND)))
+    ended = []
+    session.hooks.register("request_end", lambda **event: ended.append(event))
+
+    def request(*_args, **_kwargs) -> None:
+        raise RequestsConnectionError
+
+    session._session.request = request  # type: ignore[method-assign]
+    with pytest.raises(RequestsConnectionError):
+        session.danbooru_request("GET", "posts")
+
+    [event] = ended
+    assert event["error"] is True
+    assert event["status_code"] is None
+    assert 'danbooru_requests_total{method="GET",endpoint="posts",status="error"} 1' in session.metrics.to_prometheus()
+
+
+def test_prometheus_exposition() -> None:
+    hooks = Hooks()
+    metrics = MetricsCollector()
+    metrics.attach(hooks)
+    emit_events(hooks)
+
+    lines = metrics.to_prometheus().splitlines()
+
+    assert 'danbooru_requests_total{method="GET",endpoint="posts/:id",status="200"} 1' in lines
+    assert 'danbooru_requests_total{method="GET",endpoint="posts/:id",status="500"} 1' in lines
+    assert "danbooru_cache_hits_total 1" in lines
+    assert "danbooru_cache_misses_total 1" in lines
+    assert 'danbooru_retries_total{error="TimeoutError"} 1' in lines
+    assert 'danbooru_request_seconds_count{endpoint="posts/:id"} 2' in lines
+    assert 'danbooru_request_seconds_sum{endpoint="posts/:id"} 2.0' in lines
+    assert 'danbooru_parse_seconds_count{endpoint="posts.json"} 1' in lines
+    assert "danbooru_rate_limit_wait_seconds_sum 0.25" in lines
+    assert "danbooru_parsed_rows_total 2" in lines
+    assert all(line.startswith(("# TYPE danbooru_", "danbooru_")) for line in lines)
+
+    metrics.reset()
+    assert metrics.snapshot()["requests"] == []
+
+
+def test_opentelemetry_exporter() -> None:
+    hooks = Hooks()
+    meter = FakeMeter()
+    OpenTelemetryExporter(meter).attach(hooks)
+    emit_events(hooks)
+
+    instruments = meter.instruments
+    assert instruments["danbooru.requests"].calls == [
+        (1, {"method": "GET", "endpoint": "posts/:id", "status_code": 200}),
+        (1, {"method": "GET", "endpoint": "posts/:id", "status_code": 500}),
+    ]
+    assert [duration for duration, _ in instruments["danbooru.request.duration"].calls] == [0.5, 1.5]
+    assert instruments["danbooru.cache"].calls == [(1, {"result": "hit"}), (1, {"result": "miss"})]
+    assert instruments["danbooru.retries"].calls == [(1, {"error": "TimeoutError"})]
+    assert instruments["danbooru.rate_limit.wait"].calls == [(0.25, None)]
+    assert instruments["danbooru.parse.duration"].calls == [(0.1, {"endpoint": "posts.json"})]
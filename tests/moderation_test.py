@@ -0,0 +1,94 @@
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from danbooru.danbooru import Danbooru
+from danbooru.exceptions import DanbooruHTTPError
+from danbooru.models.comment import DanbooruComment
+from danbooru.moderation import BulkModerator, ModerationJournal, delete_instance, expunge_post
+
+
+def http_error(status_code: int) -> DanbooruHTTPError:
+    return DanbooruHTTPError(MagicMock(status_code=status_code), error_type="Error", error_message="Something broke.")
+
+
+def fake_session(*statuses: int) -> SimpleNamespace:
+    """A session whose requests fail with each of `statuses` in turn, then succeed."""
+    session = SimpleNamespace(requests=[])
+    errors = [http_error(status) for status in statuses]
+
+    def do_request(method: str, endpoint: str, cache: bool, **kwargs) -> None:
+        session.requests.append((method, endpoint, kwargs))
+        if errors:
+            raise errors.pop(0)
+
+    session._do_request = do_request
+    return session
+
+
+@pytest.fixture(autouse=True)
+def no_backoff_sleep(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("backoff._sync.time.sleep", lambda _seconds: None)
+
+
+def failing_operation(failures: set[int]):  # noqa: ANN201
+    calls: list[int] = []
+
+    def operation(instance_id: int) -> str:
+        calls.append(instance_id)
+        if instance_id in failures:
+            raise DanbooruHTTPError(MagicMock(), error_type="Error", error_message="Something broke.")
+        return "gone" if instance_id % 10 == 0 else "done"
+
+    return operation, calls
+
+
+def test_run_journals_and_resumes(tmp_path: Path) -> None:
+    journal = tmp_path / "journal.jsonl"
+    moderator = BulkModerator(session=Danbooru(), max_workers=2, journal=journal)
+
+    operation, calls = failing_operation(failures={3})
+    report = moderator.run("expunge", [1, 2, 3, 10, 2], operation)
+
+    assert sorted(calls) == [1, 2, 3, 10]
+    assert sorted(report.done) == [1, 2]
+    assert report.gone == [10]
+    assert list(report.failed) == [3]
+    assert ModerationJournal(journal).processed("expunge") == {1, 2, 10}
+
+    operation, calls = failing_operation(failures=set())
+    report = moderator.run("expunge", [1, 2, 3, 10, 11], operation)
+
+    assert sorted(calls) == [3, 11]
+    assert report.resumed == 3
+    assert ModerationJournal(journal).processed("expunge") == {1, 2, 3, 10, 11}
+    assert ModerationJournal(journal).processed("delete_post") == set()
+
+
+def test_only_server_errors_are_retried() -> None:
+    session = fake_session(500, 500)
+    assert expunge_post(12_000_000, session) == "done"  # type: ignore[arg-type]
+    assert session.requests == [("POST", "moderator/post/posts/12000000/expunge", {"params": {"post_id": 12_000_000}})] * 3
+
+    session = fake_session(403)
+    with pytest.raises(DanbooruHTTPError):
+        expunge_post(12_000_000, session)  # type: ignore[arg-type]
+    assert len(session.requests) == 1
+
+    session = fake_session(*[500] * 5)
+    with pytest.raises(DanbooruHTTPError):
+        delete_instance(DanbooruComment, 1, session)  # type: ignore[arg-type]
+    assert len(session.requests) == 5
+
+
+def test_gone_instances() -> None:
+    assert expunge_post(12_000_000, fake_session(406)) == "gone"  # type: ignore[arg-type]
+
+    session = fake_session(404)
+    assert delete_instance(DanbooruComment, 1, session, reason="spam") == "gone"  # type: ignore[arg-type]
+    assert session.requests == [("DELETE", "comments/1", {"params": {"reason": "spam"}})]
+
+    with pytest.raises(DanbooruHTTPError):
+        delete_instance(DanbooruComment, 1, fake_session(406))  # type: ignore[arg-type]
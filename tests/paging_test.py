@@ -0,0 +1,44 @@
+import pytest
+
+from danbooru.paging import AdaptivePageSize, parse_page
+
+
+def test_shrink_and_grow() -> None:
+    page_size = AdaptivePageSize(1000, minimum=200, grow_after=2)
+
+    assert page_size.shrink()
+    assert page_size.shrink()
+    assert page_size.limit == 250
+    assert not page_size.shrink()
+
+    page_size.record_success(250)
+    assert page_size.limit == 250
+    page_size.record_success(500)
+    assert page_size.limit == 500
+
+
+def test_aligned_sizes_keep_page_numbers_valid() -> None:
+    page_size = AdaptivePageSize(200, minimum=20, grow_after=1, aligned=True)
+    page_size.shrink()
+    page_size.shrink()
+    assert page_size.limit == 50
+
+    page_size.record_success(150)
+    assert page_size.limit == 50  # 150 rows aren't a whole number of 100-row pages
+    page_size.record_success(200)
+    assert page_size.limit == 100
+
+    page_size = AdaptivePageSize(1000, minimum=20, aligned=True)
+    page_size.shrink()
+    page_size.shrink()
+    page_size.shrink()
+    assert page_size.limit == 125
+    assert not page_size.shrink()  # 62-row pages don't line up with 125-row ones
+
+
+def test_parse_page() -> None:
+    assert parse_page(None) == 1
+    assert parse_page("3") == 3
+    assert parse_page("b1234") == "b1234"
+    with pytest.raises(ValueError, match="cursor"):
+        parse_page("a1234")
@@ -0,0 +1,105 @@
+import json
+import multiprocessing
+import os
+import time
+from collections.abc import Generator
+from typing import Any
+
+import pytest
+from pyrate_limiter import Duration, Limiter, Rate
+
+from benchmarks.fixtures import default_fixtures
+from benchmarks.stub_server import StubServer
+from danbooru.danbooru import Danbooru
+from danbooru.exceptions import DeadlineExceededError
+from danbooru.models.post import DanbooruPost
+from danbooru.pipeline import PipelinedCrawler
+
+QUERY_CANCELED = {"success": False, "error": "ActiveRecord::QueryCanceled", "message": "Canceling statement.", "backtrace": []}
+
+
+@pytest.fixture
+def server() -> Generator[StubServer, None, None]:
+    with StubServer(default_fixtures(rows=450)) as server:
+        server.requests = []  # type: ignore[attr-defined]
+        respond = server.respond
+
+        def recording_respond(endpoint: str, params: dict[str, str]) -> tuple[int, list | dict]:
+            server.requests.append(params)  # type: ignore[attr-defined]
+            return respond(endpoint, params)
+
+        server.respond = recording_respond  # type: ignore[method-assign]
+        yield server
+
+
+@pytest.fixture
+def session(server: StubServer) -> Danbooru:
+    return Danbooru(base_url=server.base_url, limiter=Limiter(Rate(1000, Duration.SECOND)))
+
+
+def test_pages_follow_id_cursors(server: StubServer, session: Danbooru) -> None:
+    pages = list(DanbooruPost.pipelined_pages(processes=1, session=session))
+
+    assert [len(page) for page in pages] == [200, 200, 50]
+    assert [post.id for page in pages for post in page] == list(range(450, 0, -1))
+    assert [params["page"] for params in server.requests] == ["1", "b251", "b51"]  # type: ignore[attr-defined]
+
+
+def test_projected_pages_cross_processes(session: Danbooru) -> None:
+    pages = list(DanbooruPost.pipelined_pages(only="id,tag_string", processes=1, session=session))
+
+    posts = [post for page in pages for post in page]
+    assert [post.id for post in posts] == list(range(450, 0, -1))
+    assert type(posts[0]) is DanbooruPost.partial(["id", "tag_string"])
+    assert posts[0].tags
+    assert posts[0]._session is session
+
+
+def test_page_size_shrinks_after_a_timeout(server: StubServer, session: Danbooru) -> None:
+    respond = server.respond
+
+    def slow_respond(endpoint: str, params: dict[str, str]) -> tuple[int, list | dict]:
+        if params["limit"] == "200" and params["page"] == "b251":
+            return 500, QUERY_CANCELED
+        return respond(endpoint, params)
+
+    server.respond = slow_respond  # type: ignore[method-assign]
+    posts = [post.id for page in DanbooruPost.pipelined_pages(processes=1, session=session) for post in page]
+
+    assert posts == list(range(450, 0, -1))
+    assert ("b251", "100") in [(params["page"], params["limit"]) for params in server.requests]  # type: ignore[attr-defined]
+
+
+def test_stopping_early(server: StubServer, session: Danbooru) -> None:
+    for page in DanbooruPost.pipelined_pages(processes=1, prefetch=1, session=session, limit=20):
+        assert len(page) == 20
+        break
+
+    assert len(server.requests) < 450 // 20  # type: ignore[attr-defined]
+
+
+def test_pages_are_decoded_in_the_workers(session: Danbooru, monkeypatch: pytest.MonkeyPatch) -> None:
+    decoded_here = []
+    loads = json.loads
+
+    def recording_loads(*args, **kwargs) -> Any:  # noqa: ANN002, ANN003
+        decoded_here.append(os.getpid())
+        return loads(*args, **kwargs)
+
+    # forked workers get their own copy of the list, so only decoding in this process is seen
+    monkeypatch.setattr(json, "loads", recording_loads)
+    crawler = PipelinedCrawler(DanbooruPost, session=session, processes=1, mp_context=multiprocessing.get_context("fork"))
+    pages = list(crawler.pages())
+
+    assert [len(page) for page in pages] == [200, 200, 50]
+    assert os.getpid() not in decoded_here
+
+
+def test_deadline(server: StubServer, session: Danbooru) -> None:
+    # the time the caller spends on each page counts
+    with pytest.raises(DeadlineExceededError):
+        for _ in DanbooruPost.pipelined_pages(processes=1, prefetch=1, session=session, limit=20, deadline=0.5):
+            time.sleep(0.2)
+
+    assert all("deadline" not in params and "search[deadline]" not in params for params in server.requests)  # type: ignore[attr-defined]
+    assert len(server.requests) < 450 // 20  # type: ignore[attr-defined]
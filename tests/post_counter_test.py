@@ -0,0 +1,58 @@
+import time
+from types import SimpleNamespace
+
+from danbooru.danbooru import Danbooru
+from danbooru.post_counter import PostCounter, is_single_tag, normalize_query
+from danbooru.ttl_cache import TTLCache
+
+TAG_COUNTS = {"1girl": 5000, "solo": 4000, "old_alias": 0}
+
+
+class FakeCounter(PostCounter):
+    def __init__(self, **kwargs):
+        super().__init__(session=Danbooru(), **kwargs)
+        self.tag_requests: list[tuple[str, ...]] = []
+        self.searches: list[str] = []
+
+    def _fetch_tag_chunk(self, names):  # noqa: ANN001, ANN202
+        self.tag_requests.append(names)
+        return [SimpleNamespace(name=name, post_count=TAG_COUNTS[name]) for name in names if name in TAG_COUNTS]
+
+    def _fetch_count(self, query):  # noqa: ANN001, ANN202
+        self.searches.append(query)
+        return query, 42
+
+
+def test_normalize_query() -> None:
+    assert normalize_query("  Solo 1girl  solo ") == "1girl solo"
+    assert normalize_query("user:Albert -Touhou") == "-touhou user:Albert"
+    assert normalize_query("( A ~b )  c") == "( a ~b ) c"
+    assert normalize_query("c -( a b ) fate_(series)") == "c -( a b ) fate_(series)"
+    assert normalize_query("fate_(series) Saber") == "fate_(series) saber"
+    assert is_single_tag("1girl")
+    assert not is_single_tag("-1girl")
+    assert not is_single_tag("rating:g")
+
+
+def test_counts_are_batched_deduplicated_and_cached() -> None:
+    counter = FakeCounter()
+    counts = counter.counts(["1girl", "solo", "old_alias", "1girl solo", "solo  1girl", "missing_tag"])
+
+    assert counts == {"1girl": 5000, "solo": 4000, "old_alias": 42, "1girl solo": 42, "solo  1girl": 42, "missing_tag": 42}
+    assert len(counter.tag_requests) == 1
+    assert sorted(counter.searches) == ["1girl solo", "missing_tag", "old_alias"]
+
+    counter.counts(["SOLO 1girl", "1girl"])
+    assert len(counter.tag_requests) == 1
+    assert len(counter.searches) == 3
+
+
+def test_ttl_cache_expiry() -> None:
+    cache: TTLCache[str, int] = TTLCache(ttl=0.05, maxsize=2)
+    cache.update({"a": 1, "b": 2, "c": 3})
+    assert "a" not in cache
+    assert cache.get_many(["b", "c"]) == {"b": 2, "c": 3}
+
+    time.sleep(0.06)
+    assert cache.get("b") is None
+    assert len(cache) == 0
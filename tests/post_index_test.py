@@ -0,0 +1,136 @@
+from collections.abc import Generator
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from pyrate_limiter import Duration, Limiter, Rate
+
+from benchmarks.fixtures import make_post_versions, make_posts
+from benchmarks.stub_server import StubServer
+from danbooru.danbooru import Danbooru
+from danbooru.post_index import PostIndex, UnsupportedQueryError
+
+
+def make_index() -> PostIndex:
+    index = PostIndex()
+    index.add_posts([
+        SimpleNamespace(id=1, tag_string="1girl solo hat"),
+        SimpleNamespace(id=2, tag_string="1girl 1boy cap"),
+        SimpleNamespace(id=3, tag_string="1girl solo re:zero"),
+        SimpleNamespace(id=4, tag_string="1boy solo hat"),
+        SimpleNamespace(id=5, tag_string="scenery"),
+    ])
+    return index
+
+
+@pytest.fixture
+def server() -> Generator[StubServer, None, None]:
+    posts = make_posts(5)
+    for post, tag_string in zip(posts, ["1girl solo", "1girl", "1boy", "1girl hat", "scenery"], strict=True):
+        post["tag_string"] = tag_string
+
+    with StubServer({"posts": posts, "post_versions": make_post_versions(2)}) as server:
+        respond = server.respond
+
+        def searching_respond(endpoint: str, params: dict[str, str]) -> tuple[int, list | dict]:
+            """Also filter posts by plain tags and post versions by `search[id_gt]`, which the stub ignores."""
+            status, rows = respond(endpoint, params)
+            tags = {tag for tag in params.get("tags", "").split() if ":" not in tag}
+            rows = [row for row in rows if tags <= set(row.get("tag_string", "").split())]  # type: ignore[union-attr]
+            return status, [row for row in rows if row["id"] > int(params.get("search[id_gt]", 0))]
+
+        server.respond = searching_respond  # type: ignore[method-assign]
+        yield server
+
+
+def test_search() -> None:
+    index = make_index()
+
+    assert index.search("1girl").tolist() == [3, 2, 1]
+    assert index.search("1girl solo order:id").tolist() == [1, 3]
+    assert index.search("1girl -solo").tolist() == [2]
+    assert index.search("~hat ~cap").tolist() == [4, 2, 1]
+    assert index.search("solo ~hat ~cap -1boy").tolist() == [1]
+    assert index.search("re:zero").tolist() == [3]
+    assert index.search("").tolist() == [5, 4, 3, 2, 1]
+    assert index.search("missing_tag").tolist() == []
+    assert index.search("1GIRL", limit=2).tolist() == [3, 2]
+    assert index.count("solo") == 3
+
+
+def test_id_metatag() -> None:
+    index = make_index()
+
+    assert index.search("id:2").tolist() == [2]
+    assert index.search("id:1,3,5 order:id_asc").tolist() == [1, 3, 5]
+    assert index.search("id:>3").tolist() == [5, 4]
+    assert index.search("id:<=2").tolist() == [2, 1]
+    assert index.search("solo id:2..4").tolist() == [4, 3]
+    assert index.search("-id:1 solo").tolist() == [4, 3]
+
+
+def test_results_are_copies() -> None:
+    index = make_index()
+
+    for query in ("hat order:id", "", "hat"):
+        index.search(query)[:] = 0
+
+    assert index.search("hat").tolist() == [4, 1]
+    assert index.search("").tolist() == [5, 4, 3, 2, 1]
+
+
+def test_unsupported_syntax() -> None:
+    index = make_index()
+
+    for query in ("rating:g", "order:score", "hat*", "id:abc"):
+        with pytest.raises(UnsupportedQueryError):
+            index.search(query)
+
+
+def test_retag() -> None:
+    index = make_index()
+
+    index.add_posts([SimpleNamespace(id=1, tag_string="1girl cap")])
+    assert index.search("hat").tolist() == [4]
+    assert index.search("cap").tolist() == [2, 1]
+    assert len(index) == 5
+
+
+def test_save_and_load(tmp_path: Path) -> None:
+    index = make_index()
+    index.last_version_id = 123
+    index.save(tmp_path / "index.npz")
+
+    loaded = PostIndex.load(tmp_path / "index.npz")
+    assert loaded.last_version_id == 123
+    assert len(loaded) == 5
+    assert loaded.search("1girl -solo").tolist() == [2]
+
+    loaded.add_posts([SimpleNamespace(id=2, tag_string="1girl solo")])
+    assert loaded.search("1girl solo").tolist() == [3, 2, 1]
+    assert loaded.search("cap").tolist() == []
+
+
+def test_sync_keeps_to_the_mirrored_search(server: StubServer, tmp_path: Path) -> None:
+    session = Danbooru(base_url=server.base_url, limiter=Limiter(Rate(1000, Duration.SECOND)))
+    index = PostIndex.build(tags="1girl", session=session)
+    assert index.search("").tolist() == [4, 2, 1]
+    assert index.last_version_id == 2
+
+    index.save(tmp_path / "index.npz")
+    index = PostIndex.load(tmp_path / "index.npz")
+    assert index.search_params == {"tags": "1girl"}
+
+    posts = server.fixtures["posts"]
+    posts[4]["tag_string"] = "1boy"  # post #1 stops matching
+    posts[2]["tag_string"] = "1girl smile"  # post #3 starts matching
+    posts[1]["tag_string"] = "1girl 1boy"  # post #4 is retagged
+    version = make_post_versions(1)[0]
+    server.fixtures["post_versions"] = [{**version, "id": version_id, "post_id": post_id}
+                                        for version_id, post_id in [(5, 4), (4, 3), (3, 1)]]
+
+    assert index.sync(session=session) == 3
+    assert index.search("").tolist() == [4, 3, 2]
+    assert index.search("smile").tolist() == [3]
+    assert index.search("1boy").tolist() == [4]
+    assert index.last_version_id == 5
@@ -0,0 +1,82 @@
+from collections.abc import Generator
+
+import pytest
+from pyrate_limiter import Duration, Limiter, Rate
+
+from benchmarks.fixtures import make_posts, make_users
+from benchmarks.stub_server import StubServer
+from danbooru.danbooru import Danbooru
+from danbooru.models.bulk_update_request import DanbooruBulkUpdateRequest
+from danbooru.models.post import DanbooruPost
+from danbooru.prefetch import prefetch
+
+TIMESTAMP = "2024-01-01T00:00:00.000-05:00"
+FORUM_POST = {"id": 10, "creator_id": 1, "updater_id": 1, "topic_id": 5, "body": "please", "is_deleted": False,
+              "created_at": TIMESTAMP, "updated_at": TIMESTAMP}
+
+
+def make_request(request_id: int, forum_post: dict | None) -> dict:
+    return {"id": request_id, "user_id": 1, "script": "alias a -> b", "status": "pending", "approver_id": None,
+            "forum_post_id": forum_post and forum_post["id"], "forum_topic_id": forum_post and forum_post["topic_id"],
+            "tags": ["a", "b"], "forum_post": forum_post, "created_at": TIMESTAMP, "updated_at": TIMESTAMP}
+
+
+@pytest.fixture
+def server() -> Generator[StubServer, None, None]:
+    fixtures = {
+        "posts": make_posts(30),
+        "users": make_users(5_000),
+        "bulk_update_requests": [make_request(1, FORUM_POST), make_request(2, None)],
+    }
+    with StubServer(fixtures) as server:
+        server.requests = []  # type: ignore[attr-defined]
+        respond = server.respond
+
+        def projecting_respond(endpoint: str, params: dict[str, str]) -> tuple[int, list | dict]:
+            """Embed `forum_post` only when asked for, like the api."""
+            server.requests.append((endpoint, params))  # type: ignore[attr-defined]
+            status, body = respond(endpoint, params)
+            if endpoint == "bulk_update_requests" and "forum_post" not in params.get("only", ""):
+                body = [{key: value for key, value in row.items() if key != "forum_post"} for row in body]  # type: ignore[union-attr]
+            return status, body
+
+        server.respond = projecting_respond  # type: ignore[method-assign]
+        yield server
+
+
+@pytest.fixture
+def session(server: StubServer) -> Danbooru:
+    return Danbooru(base_url=server.base_url, limiter=Limiter(Rate(1000, Duration.SECOND)))
+
+
+def test_prefetch_by_foreign_key(server: StubServer, session: Danbooru) -> None:
+    posts = DanbooruPost.get(limit=30, session=session)
+    server.requests.clear()  # type: ignore[attr-defined]
+
+    prefetch(posts, "uploader")
+
+    assert [endpoint for endpoint, _ in server.requests] == ["users"]  # type: ignore[attr-defined]
+    assert all(post.uploader.id == post.uploader_id for post in posts)  # type: ignore[attr-defined]
+
+    prefetch(posts, "uploader")
+    assert len(server.requests) == 1  # type: ignore[attr-defined]
+
+
+def test_prefetch_through_include(server: StubServer, session: Danbooru) -> None:
+    requests = DanbooruBulkUpdateRequest.get(session=session)
+    assert "forum_post" not in requests[0].model_fields_set
+    server.requests.clear()  # type: ignore[attr-defined]
+
+    prefetch(requests, "forum_post")
+
+    [(endpoint, params)] = server.requests  # type: ignore[attr-defined]
+    assert endpoint == "bulk_update_requests"
+    assert "forum_post" in params["only"].split(",")
+    assert params["search[id]"] == "2,1"
+
+    by_id = {request.id: request for request in requests}
+    assert by_id[1].forum_post.body == "please"  # type: ignore[union-attr]
+    assert by_id[2].forum_post is None  # loaded and empty, instead of raising `WrongIncludeCallError`
+
+    prefetch(requests, "forum_post")
+    assert len(server.requests) == 1  # type: ignore[attr-defined]
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+from requests import PreparedRequest, Response
+
+from danbooru.danbooru import Danbooru
+from danbooru.model import WrongIncludeCallError, parse_only
+from danbooru.models.post import DanbooruPost
+
+
+def make_response(url: str, data: list[dict]) -> Response:
+    request = PreparedRequest()
+    request.prepare(method="GET", url=url)
+    response = Response()
+    response.status_code = 200
+    response._content = json.dumps(data).encode()
+    response.request = request
+    response.url = url
+    return response
+
+
+def test_only_params() -> None:
+    session = Danbooru()
+    assert session._get_params("posts", only="id,tag_string,uploader[id,name]")["only"] == "id,tag_string,uploader[id,name]"
+    assert session._get_params("posts", only=True)["only"] == ",".join(DanbooruPost.default_includes())
+    assert parse_only("id,uploader[id,name],tag_string") == ["id", "uploader", "tag_string"]
+
+
+def test_projected_results_are_partial_models() -> None:
+    session = Danbooru()
+    response = make_response(f"{session.base_url}/posts.json?only=id,tag_string", [{"id": 1, "tag_string": "1girl solo"}])
+
+    post = session._parse_response(response, "posts")[0]
+
+    assert isinstance(post, DanbooruPost)
+    assert type(post).__name__ == "DanbooruPost"
+    assert post.tags == ["1girl", "solo"]
+    with pytest.raises(WrongIncludeCallError):
+        _ = post.created_at
+
+
+def test_partial_and_full_models_share_identity() -> None:
+    session = Danbooru()
+    full_row = {"id": 1, "tag_string": "solo", "created_at": "2024-01-01T00:00:00Z", "updated_at": "2024-01-01T00:00:00Z"}
+    full = session._parse_response(make_response(f"{session.base_url}/posts.json", [full_row, {**full_row, "id": 2}]), "posts")
+    partial = session._parse_response(make_response(f"{session.base_url}/posts.json?only=id,tag_string", [{"id": 1, "tag_string": "solo"}]), "posts")
+
+    assert partial[0] == full[0]
+    assert len({*full, *partial}) == 2
+
+
+def test_rows_without_ids_stay_distinct() -> None:
+    session = Danbooru()
+    response = make_response(f"{session.base_url}/posts.json?only=tag_string", [{"tag_string": "solo"}, {"tag_string": "solo"}])
+
+    first, second = session._parse_response(response, "posts")
+
+    assert first != second
+    assert first == first  # noqa: PLR0124
+    assert len({first, second}) == 2
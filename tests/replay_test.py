@@ -0,0 +1,78 @@
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+from pyrate_limiter import Duration, Limiter, Rate
+
+from benchmarks.fixtures import default_fixtures
+from benchmarks.stub_server import StubServer
+from danbooru.danbooru import Danbooru
+from danbooru.exceptions import ReplayMissError
+from danbooru.models.post import DanbooruPost
+from danbooru.replay import record, replay, request_key
+
+
+def test_request_key() -> None:
+    assert request_key("get", "http://localhost/posts/?tags=solo&limit=2") == "GET http://localhost/posts?limit=2&tags=solo"
+    assert request_key("POST", "http://localhost/posts", b'{"a": 1}') == 'POST http://localhost/posts {"a": 1}'
+
+
+def test_record_and_replay(tmp_path: Path) -> None:
+    archive = tmp_path / "crawl.jsonl.gz"
+    with StubServer(default_fixtures(rows=50)) as server:
+        session = Danbooru(base_url=server.base_url, limiter=Limiter(Rate(1000, Duration.SECOND)))
+        with record(session, archive):
+            recorded = [post.id for post in DanbooruPost.get_all(limit=20, session=session)]
+            recorded_post = DanbooruPost.get_by_id(7, session=session)
+
+    session = Danbooru(base_url=server.base_url)
+    with replay(session, archive):
+        assert [post.id for post in DanbooruPost.get_all(limit=20, session=session)] == recorded == list(range(50, 0, -1))
+        assert DanbooruPost.get_by_id(7, session=session).md5 == recorded_post.md5
+
+        with pytest.raises(ReplayMissError):
+            DanbooruPost.get_by_id(8, session=session)
+
+
+def test_replay_restores_the_session(tmp_path: Path) -> None:
+    archive = tmp_path / "crawl.jsonl.gz"
+    session = Danbooru(base_url="http://localhost")
+    adapter, scheduler = session._session.get_adapter("http://"), session.scheduler
+    with record(session, archive):
+        pass
+
+    with replay(session, archive) as replay_adapter:
+        assert session._session.get_adapter("http://") is replay_adapter
+        assert session._cache_session.get_adapter("https://") is replay_adapter
+
+    assert session._session.get_adapter("http://") is adapter
+    assert session._cache_session.get_adapter("https://") is not replay_adapter
+    assert session.scheduler is scheduler
+
+
+def test_content_encoding_is_dropped(tmp_path: Path) -> None:
+    archive = tmp_path / "crawl.jsonl.gz"
+    entry = {"key": "GET http://localhost/posts.json", "status": 200, "reason": "OK", "body": "[]",
+             "headers": {"Content-Type": "application/json", "Content-Encoding": "gzip"}}
+    with gzip.open(archive, "wt", encoding="utf-8") as file:
+        file.write(json.dumps(entry) + "\n")
+
+    session = Danbooru(base_url="http://localhost")
+    with replay(session, archive):
+        response = session._session.get("http://localhost/posts.json")
+
+    assert response.json() == []
+    assert "Content-Encoding" not in response.headers
+
+
+def test_lenient_replay(tmp_path: Path) -> None:
+    archive = tmp_path / "empty.jsonl.gz"
+    session = Danbooru(base_url="http://localhost")
+    with record(session, archive):
+        pass
+
+    with replay(session, archive, strict=False):
+        response = session._session.get("http://localhost/posts.json")
+    assert response.status_code == 404
+    assert response.reason == "Not Recorded"
@@ -0,0 +1,81 @@
+import json
+
+import numpy as np
+import pytest
+from requests import PreparedRequest, Response
+
+from danbooru.danbooru import Danbooru
+from danbooru.results import DanbooruResults, TagMatrix
+
+ROWS = [
+    {"id": 3, "created_at": "2024-01-01T05:00:00.000-05:00", "score": 10, "approver_id": 1, "is_deleted": False, "rating": "g",
+     "tag_string": "1girl solo"},
+    {"id": 2, "created_at": "2024-01-02T00:00:00.000Z", "score": -1, "approver_id": None, "is_deleted": True, "rating": "s",
+     "tag_string": "1boy solo"},
+    {"id": 1, "created_at": "2024-01-03T00:00:00.000Z", "score": 0, "approver_id": 2, "is_deleted": False, "rating": None,
+     "tag_string": ""},
+]
+
+
+def make_results() -> DanbooruResults:
+    session = Danbooru()
+    request = PreparedRequest()
+    request.prepare(method="GET", url=f"{session.base_url}/posts.json?only=id,created_at,score,approver_id,is_deleted,rating,tag_string")
+    response = Response()
+    response.status_code = 200
+    response._content = json.dumps(ROWS).encode()
+    response.request = request
+    return session._parse_response(response, "posts")
+
+
+def test_to_arrays() -> None:
+    arrays = make_results().to_arrays()
+
+    assert arrays["id"].dtype == np.int64
+    assert arrays["score"].tolist() == [10, -1, 0]
+    assert arrays["is_deleted"].dtype == np.bool_
+    assert arrays["rating"].tolist() == ["g", "s", None]
+
+    assert arrays["approver_id"].dtype == np.float64  # promoted to hold the missing approver
+    assert np.isnan(arrays["approver_id"][1])
+
+    assert arrays["created_at"].dtype == np.dtype("datetime64[ms]")
+    assert arrays["created_at"][0] == np.datetime64("2024-01-01T10:00:00")  # converted to utc
+
+    assert list(make_results().to_arrays("id", "score")) == ["id", "score", "tag_string"]
+    assert list(make_results().to_arrays("id", tags="")) == ["id"]
+
+
+def test_tag_matrix() -> None:
+    matrix = make_results().to_arrays()["tag_string"]
+
+    assert isinstance(matrix, TagMatrix)
+    assert matrix.shape == (3, 3)
+    assert matrix.vocabulary.tolist() == ["1girl", "solo", "1boy"]
+    assert matrix.indptr.tolist() == [0, 2, 4, 4]
+    assert matrix.indices.tolist() == [0, 1, 2, 1]
+    assert matrix.tag_counts().tolist() == [1, 2, 1]
+    assert matrix.rows_with("solo").tolist() == [0, 1]
+    assert matrix.rows_with("missing").tolist() == []
+
+    assert TagMatrix.from_rows([["a", "b"], None, "b"]).indptr.tolist() == [0, 2, 2, 3]
+
+
+def test_to_frame() -> None:
+    pd = pytest.importorskip("pandas")
+
+    frame = make_results().to_frame("id", "approver_id", "tag_string")
+
+    assert isinstance(frame, pd.DataFrame)
+    assert frame.shape == (3, 3)
+    assert frame["approver_id"].isna().tolist() == [False, True, False]
+    assert frame["tag_string"].tolist() == ["1girl solo", "1boy solo", ""]
+
+
+def test_tag_matrix_to_scipy() -> None:
+    pytest.importorskip("scipy")
+
+    matrix = make_results().to_arrays()["tag_string"].to_scipy()  # type: ignore[union-attr]
+
+    assert matrix.shape == (3, 3)
+    assert matrix.toarray().tolist() == [[1, 1, 0], [0, 1, 1], [0, 0, 0]]
@@ -0,0 +1,87 @@
+import threading
+import time
+
+import pytest
+
+from danbooru.deadline import deadline
+from danbooru.exceptions import DeadlineExceededError
+from danbooru.scheduler import Priority, RequestScheduler
+
+
+class BlockingLimiter:
+    def __init__(self):
+        """Record which thread each request was granted to, and hold the first one until `release` is set."""
+        self.granted: list[str] = []
+        self.release = threading.Event()
+
+    def try_acquire(self, name: str, weight: int = 1) -> None:
+        self.granted.append(threading.current_thread().name)
+        if len(self.granted) == 1:
+            self.release.wait()
+
+
+def wait_for(condition) -> None:  # noqa: ANN001
+    started = time.monotonic()
+    while not condition():
+        assert time.monotonic() - started < 5
+        time.sleep(0.001)
+
+
+def start(scheduler: RequestScheduler, name: str, **kwargs) -> threading.Thread:
+    """Queue a request in a new thread, once the previous ones are queued."""
+    queued = scheduler.queued
+    thread = threading.Thread(target=scheduler.acquire, kwargs=kwargs, name=name, daemon=True)
+    thread.start()
+    wait_for(lambda: scheduler.queued > queued)
+    return thread
+
+
+@pytest.fixture
+def scheduler() -> RequestScheduler:
+    """A scheduler whose first request, by the `blocker` thread, holds up the others until the limiter is released."""
+    limiter = BlockingLimiter()
+    scheduler = RequestScheduler(limiter)
+    threading.Thread(target=scheduler.acquire, name="blocker", daemon=True).start()
+    wait_for(lambda: limiter.granted)
+    return scheduler
+
+
+def drain(scheduler: RequestScheduler, threads: list[threading.Thread]) -> list[str]:
+    scheduler.limiter.release.set()  # type: ignore[attr-defined]
+    for thread in threads:
+        thread.join(5)
+    return scheduler.limiter.granted[1:]  # type: ignore[attr-defined]
+
+
+def test_priority_order(scheduler: RequestScheduler) -> None:
+    threads = [start(scheduler, priority.name, priority=priority) for priority in reversed(Priority)]
+
+    assert drain(scheduler, threads) == ["INTERACTIVE", "DEFAULT", "BACKGROUND"]
+
+
+def test_flows_are_interleaved(scheduler: RequestScheduler) -> None:
+    threads = [start(scheduler, f"crawl_{n}", flow="crawl") for n in range(3)]
+    threads.append(start(scheduler, "export", flow="export"))
+
+    assert drain(scheduler, threads) == ["crawl_0", "export", "crawl_1", "crawl_2"]
+
+
+def test_deadline_removes_the_ticket(scheduler: RequestScheduler) -> None:
+    with deadline(0.05), pytest.raises(DeadlineExceededError):
+        scheduler.acquire()
+    assert scheduler.queued == 0
+
+    assert drain(scheduler, [start(scheduler, "next")]) == ["next"]
+
+
+def test_interrupt_removes_the_ticket(scheduler: RequestScheduler, monkeypatch: pytest.MonkeyPatch) -> None:
+    def interrupted_wait(timeout: float | None = None) -> bool:
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as patch:
+        patch.setattr(scheduler._condition, "wait", interrupted_wait)
+        with pytest.raises(KeyboardInterrupt):
+            scheduler.acquire()
+    assert scheduler.queued == 0
+
+    assert drain(scheduler, [start(scheduler, "next")]) == ["next"]
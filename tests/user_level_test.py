@@ -0,0 +1,31 @@
+import pytest
+
+from danbooru.user_level import UserLevel
+
+
+def test_levels_are_singletons() -> None:
+    assert UserLevel(20) is UserLevel.MEMBER
+    assert UserLevel("member") is UserLevel.MEMBER
+    assert UserLevel("MOD") is UserLevel.MODERATOR
+    assert UserLevel.parse({"number": 32, "name": "BUILDER"}) is UserLevel.BUILDER
+
+
+def test_level_comparisons() -> None:
+    assert UserLevel.GOLD > UserLevel.MEMBER
+    assert UserLevel.GOLD >= "gold"
+    assert UserLevel.GOLD < 31
+    assert UserLevel.GOLD == 30
+    assert UserLevel.GOLD == "Gold"
+    assert UserLevel.GOLD != "member"
+    assert hash(UserLevel.GOLD) == hash(30)
+
+    with pytest.raises(ValueError, match="not an acceptable value"):
+        _ = UserLevel.GOLD < "wizard"
+
+
+def test_level_lookups() -> None:
+    assert UserLevel.name_from_number(37) == "APPROVER"
+    assert UserLevel.number_from_name("contrib") == 35
+
+    with pytest.raises(ValueError, match="No level with number 21"):
+        UserLevel.name_from_number(21)
@@ -0,0 +1,31 @@
+from types import SimpleNamespace
+
+from danbooru.danbooru import Danbooru
+from danbooru.user_resolver import UserResolver
+
+USERS = {"albert": 1, "evazion": 2, "Some_User": 3}
+
+
+class FakeResolver(UserResolver):
+    def __init__(self, **kwargs):
+        super().__init__(session=Danbooru(), **kwargs)
+        self.requests: list[tuple[str, ...]] = []
+
+    def _fetch_name_chunk(self, names):  # noqa: ANN001, ANN202
+        self.requests.append(names)
+        return [SimpleNamespace(id=user_id, name=name) for name, user_id in USERS.items() if name.lower() in names]
+
+
+def test_names_are_batched_and_cached() -> None:
+    resolver = FakeResolver()
+    resolver.NAME_CHUNK_SIZE = 2
+
+    users = resolver.by_names(["albert", "Evazion", "some user", "nobody"])
+    assert {name: user and user.id for name, user in users.items()} == {"albert": 1, "Evazion": 2, "some user": 3, "nobody": None}
+    assert len(resolver.requests) == 2
+
+    users = resolver.by_names(["ALBERT", "Some_User", "nobody"])
+    assert {name: user and user.id for name, user in users.items()} == {"ALBERT": 1, "Some_User": 3, "nobody": None}
+    assert len(resolver.requests) == 2
+
+    assert resolver.by_ids([2])[2].name == "evazion"
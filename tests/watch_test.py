@@ -0,0 +1,72 @@
+import asyncio
+from collections.abc import Generator
+
+import pytest
+from pyrate_limiter import Duration, Limiter, Rate
+
+from benchmarks.fixtures import make_posts
+from benchmarks.stub_server import StubServer
+from danbooru.danbooru import Danbooru
+from danbooru.models.post import DanbooruPost
+from danbooru.watch import AdaptiveInterval, ChangeFeed
+
+
+@pytest.fixture
+def server() -> Generator[StubServer, None, None]:
+    """Ten posts, and an eleventh uploaded right after the first request without a cursor."""
+    posts = make_posts(11)
+    with StubServer({"posts": posts[:10]}) as server:
+        server.pages = []  # type: ignore[attr-defined]
+        respond = server.respond
+
+        def uploading_respond(endpoint: str, params: dict[str, str]) -> tuple[int, list | dict]:
+            server.pages.append(params.get("page"))  # type: ignore[attr-defined]
+            status, body = respond(endpoint, params)
+            if "page" not in params and len(server.fixtures["posts"]) == 10:
+                server.fixtures["posts"].insert(0, posts[10])
+            return status, body
+
+        server.respond = uploading_respond  # type: ignore[method-assign]
+        yield server
+
+
+@pytest.fixture
+def feed(server: StubServer) -> ChangeFeed:
+    session = Danbooru(base_url=server.base_url, limiter=Limiter(Rate(1000, Duration.SECOND)))
+    return ChangeFeed(session=session, limit=3, min_interval=0.0, max_interval=0.01)
+
+
+def test_adaptive_interval() -> None:
+    interval = AdaptiveInterval(minimum=5, maximum=20)
+
+    assert interval.update(0, full=False) == 7.5
+    assert interval.update(0, full=False) == 11.25
+    assert interval.update(0, full=False) == 16.875
+    assert interval.update(0, full=False) == 20
+    assert interval.update(4, full=False) == 10
+    assert interval.update(4, full=False) == 5
+    assert interval.update(3, full=True) == 0
+    assert interval.update(0, full=False) == 5
+
+
+def test_cursor_advances(server: StubServer, feed: ChangeFeed) -> None:
+    seen = []
+    for post in feed.add(DanbooruPost, since=4):
+        seen.append(post.id)
+        if post.id == 10:
+            feed.stop()
+
+    assert seen == [5, 6, 7, 8, 9, 10]
+    assert server.pages == ["a4", "a7"]  # type: ignore[attr-defined]
+
+
+def test_async_feed_starts_at_the_latest_row(server: StubServer, feed: ChangeFeed) -> None:
+    async def watch() -> list[int]:
+        seen = []
+        async for post in feed.add(DanbooruPost):
+            seen.append(post.id)
+            feed.stop()
+        return seen
+
+    assert asyncio.run(watch()) == [11]
+    assert server.pages[:2] == [None, "a10"]  # type: ignore[attr-defined]
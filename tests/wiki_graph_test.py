@@ -0,0 +1,45 @@
+from pathlib import Path
+
+from danbooru.wiki_graph import WikiLinkIndex
+
+
+def make_index() -> WikiLinkIndex:
+    index = WikiLinkIndex()
+    index.set_page(1, "hatsune_miku", "See [[vocaloid]] and [[Megurine Luka|Luka]].")
+    index.set_page(2, "megurine_luka", "Also [[hatsune_miku]].")
+    index.set_page(3, "vocaloid", "A series. [[missing tag]]")
+    index.set_page(4, "lonely_page", "Nobody links here. [[vocaloid]]")
+    return index
+
+
+def test_forward_and_reverse_links() -> None:
+    index = make_index()
+
+    assert index.links_from("hatsune_miku") == ["vocaloid", "megurine_luka"]
+    assert index.links_to("vocaloid") == ["hatsune_miku", "lonely_page"]
+    assert index.dead_links() == {"vocaloid": ["missing_tag"]}
+    assert index.orphans() == ["lonely_page"]
+
+
+def test_rename_and_delete() -> None:
+    index = make_index()
+
+    index.set_page(4, "popular_page", "[[vocaloid]]")
+    assert "lonely_page" not in index
+    assert index.links_to("vocaloid") == ["hatsune_miku", "popular_page"]
+
+    index.set_page(3, "vocaloid", "", is_deleted=True)
+    assert index.dead_links() == {"hatsune_miku": ["vocaloid"], "popular_page": ["vocaloid"]}
+
+
+def test_save_and_load(tmp_path: Path) -> None:
+    index = make_index()
+    index.last_version_id = 123
+    index.save(tmp_path / "index.json.gz")
+
+    loaded = WikiLinkIndex.load(tmp_path / "index.json.gz")
+
+    assert loaded.last_version_id == 123
+    assert loaded.links_to("vocaloid") == index.links_to("vocaloid")
+    assert loaded.orphans() == index.orphans()
+    assert len(loaded) == 4